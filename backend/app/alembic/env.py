@@ -0,0 +1,41 @@
+import asyncio
+from sqlalchemy.engine import Connection
+from alembic import context
+from app.db import Base, engine
+import app.models  # noqa: F401  (registers tables on Base.metadata)
+
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # the FTS5 index and its shadow tables are managed by raw SQL in the baseline
+    return not (type_ == "table" and name.startswith("product_catalog_fts"))
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+# The app passes its own connection (services/migrations.run_migrations);
+# the `alembic` CLI falls back to the app engine from DATABASE_URL.
+connection = config.attributes.get("connection")
+if connection is not None:
+    do_run_migrations(connection)
+else:
+    asyncio.run(run_async_migrations())
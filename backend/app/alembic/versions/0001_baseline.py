@@ -0,0 +1,186 @@
+"""baseline schema
+
+Creates the schema as it stood before versioned migrations. Databases created by the
+old create_all startup only get the tables and columns they are missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables() -> dict:
+    return {
+        "keyword": lambda: op.create_table(
+            "keyword",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("text", sa.String(255), nullable=False, index=True),
+            sa.Column("date_range", sa.String(32), nullable=True),
+            sa.Column("score", sa.Float, nullable=True),
+            sa.Column("category", sa.String(64), nullable=True),
+            sa.Column("status", sa.String(32), nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+            sa.UniqueConstraint("text", "date_range", name="uq_keyword_text_date"),
+        ),
+        "product_candidate": lambda: op.create_table(
+            "product_candidate",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("keyword_id", sa.Integer, sa.ForeignKey("keyword.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("title_guess", sa.String(255), nullable=False),
+            sa.Column("brand", sa.String(128), nullable=True),
+            sa.Column("model", sa.String(128), nullable=True),
+            sa.Column("price_band", sa.String(64), nullable=True),
+            sa.Column("why", sa.Text, nullable=True),
+            sa.Column("image_hint", sa.String(255), nullable=True),
+            sa.Column("dedupe_key", sa.String(255), nullable=True, index=True),
+            sa.Column("status", sa.String(32), nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+        ),
+        "affiliate_map": lambda: op.create_table(
+            "affiliate_map",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("product_candidate_id", sa.Integer, sa.ForeignKey("product_candidate.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("affiliate_url", sa.Text, nullable=False),
+            sa.Column("affiliate_html", sa.Text, nullable=True),
+            sa.Column("mapped_by", sa.String(64), nullable=True),
+            sa.Column("mapped_at", sa.DateTime, nullable=False),
+        ),
+        "post": lambda: op.create_table(
+            "post",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("keyword_id", sa.Integer, sa.ForeignKey("keyword.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("product_candidate_id", sa.Integer, sa.ForeignKey("product_candidate.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("title", sa.String(255), nullable=True),
+            sa.Column("body_md", sa.Text, nullable=True),
+            sa.Column("tags", sa.Text, nullable=True),
+            sa.Column("images", sa.Text, nullable=True),
+            sa.Column("status", sa.String(32), nullable=False),
+            sa.Column("scheduled_at", sa.DateTime, nullable=True),
+            sa.Column("published_at", sa.DateTime, nullable=True),
+            sa.Column("naver_post_id", sa.String(128), nullable=True),
+            sa.Column("template_id", sa.String(16), nullable=True),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+            sa.Column("meta_json", sa.Text, nullable=True),
+        ),
+        "metrics": lambda: op.create_table(
+            "metrics",
+            sa.Column("post_id", sa.Integer, sa.ForeignKey("post.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("impressions", sa.Integer, nullable=True),
+            sa.Column("clicks", sa.Integer, nullable=True),
+            sa.Column("ctr", sa.Float, nullable=True),
+            sa.Column("revenue", sa.Float, nullable=True),
+            sa.Column("template_id", sa.String(16), nullable=True),
+        ),
+        "budget": lambda: op.create_table(
+            "budget",
+            sa.Column("date", sa.String(10), primary_key=True),
+            sa.Column("token_used", sa.Integer, nullable=False),
+            sa.Column("usd_spent", sa.Float, nullable=False),
+            sa.Column("cap", sa.Float, nullable=False),
+        ),
+        "naver_token": lambda: op.create_table(
+            "naver_token",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("access_token", sa.Text, nullable=True),
+            sa.Column("refresh_token", sa.Text, nullable=True),
+            sa.Column("token_type", sa.String(32), nullable=True),
+            sa.Column("expires_at", sa.DateTime, nullable=True),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+        ),
+        "app_config": lambda: op.create_table(
+            "app_config",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("value", sa.Text, nullable=True),
+        ),
+        "llm_cache": lambda: op.create_table(
+            "llm_cache",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("provider", sa.String(16), nullable=False),
+            sa.Column("model", sa.String(128), nullable=False),
+            sa.Column("response", sa.Text, nullable=False),
+            sa.Column("total_tokens", sa.Integer, nullable=True),
+            sa.Column("hits", sa.Integer, nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+            sa.Column("last_used_at", sa.DateTime, nullable=False, index=True),
+        ),
+        "product_spec_cache": lambda: op.create_table(
+            "product_spec_cache",
+            sa.Column("url", sa.String(512), primary_key=True),
+            sa.Column("status", sa.String(16), nullable=False),
+            sa.Column("data_json", sa.Text, nullable=True),
+            sa.Column("etag", sa.String(255), nullable=True),
+            sa.Column("last_modified", sa.String(64), nullable=True),
+            sa.Column("fetched_at", sa.DateTime, nullable=False),
+            sa.Column("expires_at", sa.DateTime, nullable=False, index=True),
+        ),
+        "search_result_cache": lambda: op.create_table(
+            "search_result_cache",
+            sa.Column("query", sa.String(255), primary_key=True),
+            sa.Column("product_url", sa.Text, nullable=True),
+            sa.Column("fetched_at", sa.DateTime, nullable=False),
+            sa.Column("expires_at", sa.DateTime, nullable=False, index=True),
+        ),
+        "product_catalog": lambda: op.create_table(
+            "product_catalog",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("url", sa.String(512), nullable=False, unique=True),
+            sa.Column("title", sa.Text, nullable=True),
+            sa.Column("brand", sa.String(128), nullable=True),
+            sa.Column("model", sa.String(128), nullable=True),
+            sa.Column("source", sa.String(16), nullable=False),
+            sa.Column("updated_at", sa.DateTime, nullable=False),
+        ),
+    }
+
+
+# columns that the old PRAGMA-based ensure_* helpers added to existing tables
+_LATE_COLUMNS = [
+    ("affiliate_map", sa.Column("affiliate_html", sa.Text, nullable=True)),
+    ("post", sa.Column("meta_json", sa.Text, nullable=True)),
+]
+
+_FTS = [
+    "CREATE VIRTUAL TABLE product_catalog_fts USING fts5("
+    "title, brand, model, content='product_catalog', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER product_catalog_ai AFTER INSERT ON product_catalog BEGIN "
+    "INSERT INTO product_catalog_fts(rowid, title, brand, model) VALUES (new.id, new.title, new.brand, new.model); END",
+    "CREATE TRIGGER product_catalog_ad AFTER DELETE ON product_catalog BEGIN "
+    "INSERT INTO product_catalog_fts(product_catalog_fts, rowid, title, brand, model) VALUES ('delete', old.id, old.title, old.brand, old.model); END",
+    "CREATE TRIGGER product_catalog_au AFTER UPDATE ON product_catalog BEGIN "
+    "INSERT INTO product_catalog_fts(product_catalog_fts, rowid, title, brand, model) VALUES ('delete', old.id, old.title, old.brand, old.model); "
+    "INSERT INTO product_catalog_fts(rowid, title, brand, model) VALUES (new.id, new.title, new.brand, new.model); END",
+    # index rows that existed before the FTS table
+    "INSERT INTO product_catalog_fts(product_catalog_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    existing = set(insp.get_table_names())
+    for name, create in _tables().items():
+        if name not in existing:
+            create()
+    for table, column in _LATE_COLUMNS:
+        if table in existing and column.name not in {c["name"] for c in insp.get_columns(table)}:
+            op.add_column(table, column)
+    if "product_catalog_fts" not in existing:
+        for stmt in _FTS:
+            op.execute(stmt)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS product_catalog_fts")
+    for name in reversed(list(_tables())):
+        op.drop_table(name)
@@ -0,0 +1,46 @@
+"""hot-path indexes
+
+Chosen from EXPLAIN QUERY PLAN of the router and scheduler queries:
+
+- keyword (date_range, text): fetch/list by day, delete by day, dedup GROUP BY text
+- product_candidate (keyword_id, dedupe_key): per-keyword dedupe lookups (covering)
+- product_candidate (status): pending/status lists; rowid order serves ORDER BY id DESC
+- affiliate_map (product_candidate_id): draft, publish and compare lookups
+- post (status, scheduled_at): scheduler tick for due posts
+- post (keyword_id): per-day deletes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_keyword_date_range_text", "keyword", ["date_range", "text"]),
+    ("ix_product_candidate_keyword_id_dedupe_key", "product_candidate", ["keyword_id", "dedupe_key"]),
+    ("ix_product_candidate_status", "product_candidate", ["status"]),
+    ("ix_affiliate_map_product_candidate_id", "affiliate_map", ["product_candidate_id"]),
+    ("ix_post_status_scheduled_at", "post", ["status", "scheduled_at"]),
+    ("ix_post_keyword_id", "post", ["keyword_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
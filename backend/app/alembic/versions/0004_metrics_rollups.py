@@ -0,0 +1,72 @@
+"""post rollups and metrics time series
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEED_SQL = [
+    "INSERT INTO post_status_count(status, count) SELECT status, COUNT(*) FROM post GROUP BY status",
+    "INSERT INTO post_rollup_daily(day, dimension, value, count) "
+    "SELECT day, dimension, value, COUNT(*) FROM ("
+    "  SELECT date(p.created_at) AS day, 'status' AS dimension, 'draft' AS value FROM post p"
+    "  UNION ALL SELECT date(p.published_at), 'status', p.status FROM post p WHERE p.status IN ('published', 'failed') AND p.published_at IS NOT NULL"
+    "  UNION ALL SELECT date(p.created_at), 'template', COALESCE(p.template_id, 'none') FROM post p"
+    "  UNION ALL SELECT date(p.created_at), 'category', COALESCE(k.category, 'none') FROM post p LEFT JOIN keyword k ON k.id = p.keyword_id"
+    "  UNION ALL SELECT date(p.created_at), 'keyword_date', COALESCE(k.date_range, 'none') FROM post p LEFT JOIN keyword k ON k.id = p.keyword_id"
+    ") WHERE day IS NOT NULL GROUP BY day, dimension, value",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_rollup_daily",
+        sa.Column("day", sa.String(10), primary_key=True),
+        sa.Column("dimension", sa.String(16), primary_key=True),
+        sa.Column("value", sa.String(64), primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "post_status_count",
+        sa.Column("status", sa.String(32), primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "post_metric_daily",
+        sa.Column("post_id", sa.Integer, sa.ForeignKey("post.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.String(10), primary_key=True, index=True),
+        sa.Column("impressions", sa.Integer, nullable=False),
+        sa.Column("clicks", sa.Integer, nullable=False),
+        sa.Column("revenue", sa.Float, nullable=False),
+    )
+    op.create_table(
+        "metric_rollup_daily",
+        sa.Column("day", sa.String(10), primary_key=True),
+        sa.Column("impressions", sa.Integer, nullable=False),
+        sa.Column("clicks", sa.Integer, nullable=False),
+        sa.Column("revenue", sa.Float, nullable=False),
+        sa.Column("posts", sa.Integer, nullable=False),
+    )
+    # seed the rollups from existing posts (same rules as services/rollups.rebuild_post_rollups)
+    for stmt in SEED_SQL:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    op.drop_table("metric_rollup_daily")
+    op.drop_table("post_metric_daily")
+    op.drop_table("post_status_count")
+    op.drop_table("post_rollup_daily")
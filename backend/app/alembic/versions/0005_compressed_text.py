@@ -0,0 +1,111 @@
+"""compressed post text and deduplicated affiliate html
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH = 1000
+
+# The stored format as of this revision (app.utils.compress may change later; this must not):
+# values under 256 bytes, or that don't shrink, stay TEXT, larger ones are b"z" + zlib level 6.
+MIN_COMPRESS_BYTES = 256
+ZLIB_LEVEL = 6
+ZLIB_TAG = b"z"
+
+
+def pack_text(value):
+    if value is None:
+        return None
+    raw = value.encode("utf-8")
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return value
+    packed = ZLIB_TAG + zlib.compress(raw, ZLIB_LEVEL)
+    return packed if len(packed) < len(raw) else value
+
+
+def unpack_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value[:1] == ZLIB_TAG:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    raise ValueError(f"unknown compressed text format {value[:1]!r}")
+
+
+def content_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _batches(conn, sql: str):
+    """Yield id-ordered batches of rows; `sql` selects `id` first and takes :after/:n."""
+    after = 0
+    while True:
+        rows = conn.execute(sa.text(sql), {"after": after, "n": BATCH}).all()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.create_table(
+        "affiliate_html",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("html", sa.Text, nullable=False),
+    )
+    with op.batch_alter_table("affiliate_map") as batch:
+        batch.add_column(sa.Column("html_hash", sa.String(64), sa.ForeignKey("affiliate_html.hash", name="fk_affiliate_map_html_hash"), nullable=True))
+        batch.create_index("ix_affiliate_map_html_hash", ["html_hash"])
+
+    # move snippets into affiliate_html, one row per distinct content
+    for rows in _batches(conn, "SELECT id, affiliate_html FROM affiliate_map WHERE affiliate_html IS NOT NULL AND affiliate_html != '' AND id > :after ORDER BY id LIMIT :n"):
+        links, blobs = [], {}
+        for map_id, html in rows:
+            digest = content_hash(html)
+            blobs.setdefault(digest, pack_text(html))
+            links.append({"h": digest, "id": map_id})
+        conn.execute(sa.text("INSERT OR IGNORE INTO affiliate_html(hash, html) VALUES (:h, :v)"), [{"h": h, "v": v} for h, v in blobs.items()])
+        conn.execute(sa.text("UPDATE affiliate_map SET html_hash = :h WHERE id = :id"), links)
+    with op.batch_alter_table("affiliate_map") as batch:
+        batch.drop_column("affiliate_html")
+
+    # rewrite post text in the compressed form (rows already packed read back unchanged)
+    for rows in _batches(conn, "SELECT id, body_md, meta_json FROM post WHERE id > :after ORDER BY id LIMIT :n"):
+        conn.execute(
+            sa.text("UPDATE post SET body_md = :b, meta_json = :m WHERE id = :id"),
+            [{"id": i, "b": pack_text(unpack_text(b)), "m": pack_text(unpack_text(m))} for i, b, m in rows],
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for rows in _batches(conn, "SELECT id, body_md, meta_json FROM post WHERE id > :after ORDER BY id LIMIT :n"):
+        conn.execute(
+            sa.text("UPDATE post SET body_md = :b, meta_json = :m WHERE id = :id"),
+            [{"id": i, "b": unpack_text(b), "m": unpack_text(m)} for i, b, m in rows],
+        )
+    with op.batch_alter_table("affiliate_map") as batch:
+        batch.add_column(sa.Column("affiliate_html", sa.Text, nullable=True))
+    for rows in _batches(conn, "SELECT am.id, ah.html FROM affiliate_map am JOIN affiliate_html ah ON ah.hash = am.html_hash WHERE am.id > :after ORDER BY am.id LIMIT :n"):
+        conn.execute(sa.text("UPDATE affiliate_map SET affiliate_html = :v WHERE id = :id"), [{"id": i, "v": unpack_text(v)} for i, v in rows])
+    with op.batch_alter_table("affiliate_map") as batch:
+        batch.drop_index("ix_affiliate_map_html_hash")
+        batch.drop_column("html_hash")
+    op.drop_table("affiliate_html")
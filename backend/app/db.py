@@ -1,10 +1,52 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.settings import settings
 
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+_url = make_url(settings.DATABASE_URL)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+_is_file_db = _is_sqlite and _url.database not in (None, "", ":memory:")
+
+
+def _sqlite_pragmas(read_only: bool = False):
+    """Per-connection SQLite profile (SQLITE_* settings); WAL lets readers run alongside a writer."""
+    def on_connect(dbapi_connection, connection_record):
+        cur = dbapi_connection.cursor()
+        if not read_only:
+            # must precede the first write; existing files only switch from NONE after a VACUUM
+            cur.execute(f"PRAGMA auto_vacuum={settings.SQLITE_AUTO_VACUUM}")
+        if settings.SQLITE_WAL and not read_only:
+            cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cur.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+        cur.close()
+    return on_connect
+
+
+def _make_engine(pool_size: int, max_overflow: int, read_only: bool = False) -> AsyncEngine:
+    kwargs = {}
+    if _is_file_db:
+        # aiosqlite defaults to NullPool (a new connection and thread per session)
+        kwargs = dict(poolclass=AsyncAdaptedQueuePool, pool_size=pool_size, max_overflow=max_overflow)
+    eng = create_async_engine(settings.DATABASE_URL, echo=False, future=True, **kwargs)
+    if _is_sqlite:
+        event.listen(eng.sync_engine, "connect", _sqlite_pragmas(read_only))
+    return eng
+
+
+engine = _make_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+# Read-only pool for list/metrics endpoints; an in-memory database can't be shared, so it reuses `engine`.
+read_engine = _make_engine(settings.DB_READ_POOL_SIZE, 0, read_only=True) if _is_file_db else engine
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
 
 
@@ -12,3 +54,7 @@ async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
+
+async def get_read_session() -> AsyncSession:
+    async with ReadSessionLocal() as session:
+        yield session
@@ -5,8 +5,14 @@ from app.routers import keywords, products, affiliate, posts, metrics, auth
 from app.routers import admin
 from app.routers import diagnostics
 from app.services.scheduler import init_scheduler
-from app.db import engine, Base
-from app.services.migrations import ensure_affiliate_html_column, ensure_post_meta_json_column
+from app.services.migrations import run_migrations
+from app.services.openai_client import close_client as close_openai_client
+from app.services.http_clients import init_http_clients, close_http_clients
+from app.services.html_extract import shutdown_parsers
+from app.services.budget import flush_usage
+from app.services.llm_cache import flush_hits
+from app.services.maintenance import shutdown_jobs
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 app = FastAPI(title="Coupang Partners Orchestrator", version="0.1.0")
@@ -17,6 +23,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # list endpoints return their keyset cursor in this header; cross-origin JS can only read it if exposed
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -32,13 +40,21 @@ app.include_router(diagnostics.router, prefix="/api/diagnostics", tags=["diagnos
 
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    await ensure_affiliate_html_column()
-    await ensure_post_meta_json_column()
+    await run_migrations()
+    await init_http_clients()
     await init_scheduler(app)
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await shutdown_jobs()
+    await flush_usage()
+    await flush_hits()
+    await close_openai_client()
+    await close_http_clients()
+    shutdown_parsers()
+
+
 @app.get("/api/health")
 def health():
     return {"ok": True}
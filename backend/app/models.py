@@ -1,26 +1,31 @@
 import datetime as dt
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Boolean, Float, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Boolean, Float, UniqueConstraint, Index, select
+from sqlalchemy.orm import Mapped, mapped_column, relationship, column_property
 from app.db import Base
+from app.utils.compress import CompressedText
 
 
 class Keyword(Base):
     __tablename__ = "keyword"
     __table_args__ = (
         UniqueConstraint("text", "date_range", name="uq_keyword_text_date"),
+        Index("ix_keyword_date_range_text", "date_range", "text"),
     )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     text: Mapped[str] = mapped_column(String(255), index=True)
     date_range: Mapped[str | None] = mapped_column(String(32), nullable=True)
     score: Mapped[float | None] = mapped_column(Float, nullable=True)
     category: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    status: Mapped[str] = mapped_column(String(32), default="new")
+    status: Mapped[str] = mapped_column(String(32), default="new", index=True)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
     candidates: Mapped[list["ProductCandidate"]] = relationship(back_populates="keyword")
 
 
 class ProductCandidate(Base):
     __tablename__ = "product_candidate"
+    __table_args__ = (
+        Index("ix_product_candidate_keyword_id_dedupe_key", "keyword_id", "dedupe_key"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     keyword_id: Mapped[int] = mapped_column(ForeignKey("keyword.id", ondelete="CASCADE"))
     title_guess: Mapped[str] = mapped_column(String(255))
@@ -30,18 +35,31 @@ class ProductCandidate(Base):
     why: Mapped[str | None] = mapped_column(Text)
     image_hint: Mapped[str | None] = mapped_column(String(255))
     dedupe_key: Mapped[str | None] = mapped_column(String(255), index=True)
-    status: Mapped[str] = mapped_column(String(32), default="pending")
+    status: Mapped[str] = mapped_column(String(32), default="pending", index=True)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
     keyword: Mapped[Keyword] = relationship(back_populates="candidates")
     affiliate_map: Mapped[list["AffiliateMap"]] = relationship(back_populates="candidate")
 
 
+# affiliate widget snippets, stored once per distinct content (sha256 of the HTML)
+class AffiliateHtml(Base):
+    __tablename__ = "affiliate_html"
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    html: Mapped[str] = mapped_column(CompressedText)
+
+
 class AffiliateMap(Base):
     __tablename__ = "affiliate_map"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    product_candidate_id: Mapped[int] = mapped_column(ForeignKey("product_candidate.id", ondelete="CASCADE"))
+    product_candidate_id: Mapped[int] = mapped_column(ForeignKey("product_candidate.id", ondelete="CASCADE"), index=True)
     affiliate_url: Mapped[str] = mapped_column(Text)
-    affiliate_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    html_hash: Mapped[str | None] = mapped_column(ForeignKey("affiliate_html.hash"), nullable=True, index=True)
+    # read-only and deferred: load with options(undefer(AffiliateMap.affiliate_html));
+    # write through services/affiliate_html.store
+    affiliate_html: Mapped[str | None] = column_property(
+        select(AffiliateHtml.html).where(AffiliateHtml.hash == html_hash).correlate_except(AffiliateHtml).scalar_subquery(),
+        deferred=True,
+    )
     mapped_by: Mapped[str | None] = mapped_column(String(64))
     mapped_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
     candidate: Mapped[ProductCandidate] = relationship(back_populates="affiliate_map")
@@ -49,20 +67,24 @@ class AffiliateMap(Base):
 
 class Post(Base):
     __tablename__ = "post"
+    __table_args__ = (
+        Index("ix_post_status_scheduled_at", "status", "scheduled_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    keyword_id: Mapped[int] = mapped_column(ForeignKey("keyword.id", ondelete="SET NULL"), nullable=True)
+    keyword_id: Mapped[int] = mapped_column(ForeignKey("keyword.id", ondelete="SET NULL"), nullable=True, index=True)
     product_candidate_id: Mapped[int] = mapped_column(ForeignKey("product_candidate.id", ondelete="SET NULL"), nullable=True)
     title: Mapped[str | None] = mapped_column(String(255))
-    body_md: Mapped[str | None] = mapped_column(Text)
+    # large text is compressed and deferred; list/scheduler queries never read it
+    body_md: Mapped[str | None] = mapped_column(CompressedText, deferred=True)
     tags: Mapped[str | None] = mapped_column(Text)
     images: Mapped[str | None] = mapped_column(Text)
-    status: Mapped[str] = mapped_column(String(32), default="draft")
+    status: Mapped[str] = mapped_column(String(32), default="draft", index=True)
     scheduled_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
     published_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
     naver_post_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
     template_id: Mapped[str | None] = mapped_column(String(16))
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
-    meta_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    meta_json: Mapped[str | None] = mapped_column(CompressedText, nullable=True, deferred=True)
 
 
 class Metrics(Base):
@@ -75,12 +97,16 @@ class Metrics(Base):
     template_id: Mapped[str | None] = mapped_column(String(16))
 
 
+# daily USD cap for days without a budget row of their own
+DEFAULT_DAILY_CAP = 20.0
+
+
 class Budget(Base):
     __tablename__ = "budget"
     date: Mapped[str] = mapped_column(String(10), primary_key=True)
     token_used: Mapped[int] = mapped_column(Integer, default=0)
     usd_spent: Mapped[float] = mapped_column(Float, default=0.0)
-    cap: Mapped[float] = mapped_column(Float, default=20.0)
+    cap: Mapped[float] = mapped_column(Float, default=DEFAULT_DAILY_CAP)
 
 
 class NaverToken(Base):
@@ -97,3 +123,80 @@ class AppConfig(Base):
     __tablename__ = "app_config"
     key: Mapped[str] = mapped_column(String(64), primary_key=True)
     value: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(16))
+    model: Mapped[str] = mapped_column(String(128))
+    response: Mapped[str] = mapped_column(Text)
+    total_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    last_used_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow, index=True)
+
+
+class ProductSpecCache(Base):
+    __tablename__ = "product_spec_cache"
+    url: Mapped[str] = mapped_column(String(512), primary_key=True)  # canonical product URL
+    status: Mapped[str] = mapped_column(String(16), default="ok")  # 'ok' | 'miss'
+    data_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    fetched_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    expires_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow, index=True)
+
+
+class SearchResultCache(Base):
+    __tablename__ = "search_result_cache"
+    query: Mapped[str] = mapped_column(String(255), primary_key=True)  # normalized search query
+    product_url: Mapped[str | None] = mapped_column(Text, nullable=True)  # NULL = cached "no result"
+    fetched_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    expires_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow, index=True)
+
+
+class CatalogProduct(Base):
+    __tablename__ = "product_catalog"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    url: Mapped[str] = mapped_column(String(512), unique=True)  # canonical product URL
+    title: Mapped[str | None] = mapped_column(Text, nullable=True)
+    brand: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    model: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    source: Mapped[str] = mapped_column(String(16))  # 'spec' | 'search' | 'affiliate'
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow)
+
+
+# posts entering a status, and posts created per template/category/keyword date, per UTC day
+class PostRollupDaily(Base):
+    __tablename__ = "post_rollup_daily"
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(16), primary_key=True)  # 'status' | 'template' | 'category' | 'keyword_date'
+    value: Mapped[str] = mapped_column(String(64), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+# current number of posts per status
+class PostStatusCount(Base):
+    __tablename__ = "post_status_count"
+    status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class PostMetricDaily(Base):
+    __tablename__ = "post_metric_daily"
+    post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[str] = mapped_column(String(10), primary_key=True, index=True)
+    impressions: Mapped[int] = mapped_column(Integer, default=0)
+    clicks: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[float] = mapped_column(Float, default=0.0)
+
+
+# PostMetricDaily summed per day, kept in step by ingest
+class MetricRollupDaily(Base):
+    __tablename__ = "metric_rollup_daily"
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    impressions: Mapped[int] = mapped_column(Integer, default=0)
+    clicks: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[float] = mapped_column(Float, default=0.0)
+    posts: Mapped[int] = mapped_column(Integer, default=0)
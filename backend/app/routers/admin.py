@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from app.db import get_session, engine, Base
-from app.services.config import get_ai_config_dict, set_ai_config_dict
+from app.services import spec_cache, catalog, rollups, maintenance
+from app.services.migrations import run_migrations
+from app.services.config import get_ai_config_dict, set_ai_config_dict, invalidate_ai_config_cache
 
 
 router = APIRouter()
@@ -11,49 +12,81 @@ router = APIRouter()
 @router.post("/reset-db")
 async def reset_db():
     async with engine.begin() as conn:
+        # the FTS index and the version row aren't part of the metadata
+        await conn.exec_driver_sql("DROP TABLE IF EXISTS product_catalog_fts")
+        await conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
         await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations()
+    invalidate_ai_config_cache()
     return {"ok": True, "message": "database dropped and recreated"}
 
 
-@router.delete("/keywords")
-async def delete_keywords(date: str | None = Query(None, description="YYYY-MM-DD; if omitted, delete all"), session: AsyncSession = Depends(get_session)):
+@router.delete("/keywords", status_code=202)
+async def delete_keywords(
+    date: str | None = Query(None, description="YYYY-MM-DD; if omitted, delete all"),
+    vacuum: bool = Query(False, description="incremental VACUUM afterwards"),
+):
+    # runs in the background in short chunked transactions; poll /jobs/{id} for progress
+    job = maintenance.start_purge_keywords(date, vacuum=vacuum)
     if date:
-        # Manual cascade deletes for SQLite safety
-        await session.execute(text(
-            "DELETE FROM affiliate_map WHERE product_candidate_id IN ("
-            "  SELECT pc.id FROM product_candidate pc JOIN keyword k ON pc.keyword_id = k.id WHERE k.date_range = :d)"
-        ), {"d": date})
-        await session.execute(text(
-            "DELETE FROM post WHERE keyword_id IN (SELECT id FROM keyword WHERE date_range = :d)"
-        ), {"d": date})
-        await session.execute(text(
-            "DELETE FROM product_candidate WHERE keyword_id IN (SELECT id FROM keyword WHERE date_range = :d)"
-        ), {"d": date})
-        res = await session.execute(text("DELETE FROM keyword WHERE date_range = :d"), {"d": date})
-        await session.commit()
-        return {"ok": True, "deleted_date": date}
-    else:
-        # Full wipe of keyword-related tables
-        await session.execute(text("DELETE FROM affiliate_map"))
-        await session.execute(text("DELETE FROM post"))
-        await session.execute(text("DELETE FROM product_candidate"))
-        await session.execute(text("DELETE FROM keyword"))
-        await session.commit()
-        return {"ok": True, "deleted": "all keywords & related"}
-
-
-@router.post("/dedup-keywords")
-async def dedup_keywords(date: str = Query(..., description="YYYY-MM-DD"), session: AsyncSession = Depends(get_session)):
+        return {"ok": True, "deleted_date": date, "job": job.to_dict()}
+    return {"ok": True, "deleted": "all keywords & related", "job": job.to_dict()}
+
+
+@router.post("/dedup-keywords", status_code=202)
+async def dedup_keywords(
+    date: str = Query(..., description="YYYY-MM-DD"),
+    vacuum: bool = Query(False, description="incremental VACUUM afterwards"),
+):
     # Keep the latest row per text for the date, delete others
-    # SQLite-compatible multi-step approach.
-    await session.execute(text(
-        "DELETE FROM keyword WHERE date_range = :d AND id NOT IN ("
-        "  SELECT MAX(id) FROM keyword WHERE date_range = :d GROUP BY text"
-        ")"
-    ), {"d": date})
+    job = maintenance.start_dedup_keywords(date, vacuum=vacuum)
+    return {"ok": True, "deduped_date": date, "job": job.to_dict()}
+
+
+@router.get("/jobs")
+async def jobs_list():
+    return maintenance.list_jobs()
+
+
+@router.get("/jobs/{job_id}")
+async def job_get(job_id: int):
+    job = maintenance.get_job(job_id)
+    if not job:
+        raise HTTPException(404, "job not found")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def job_cancel(job_id: int):
+    job = maintenance.cancel_job(job_id)
+    if not job:
+        raise HTTPException(404, "job not found")
+    return job.to_dict()
+
+
+@router.get("/spec-cache")
+async def spec_cache_list(url: str | None = Query(None, description="canonical product URL; includes cached data"), limit: int = Query(100, le=1000)):
+    return await spec_cache.list_entries(limit=limit, url=url)
+
+
+@router.delete("/spec-cache")
+async def spec_cache_purge(url: str | None = Query(None, description="canonical product URL; if omitted, purge all"), expired_only: bool = False):
+    deleted = await spec_cache.purge(url=url, expired_only=expired_only)
+    return {"ok": True, "deleted": deleted}
+
+
+@router.post("/catalog/backfill")
+async def catalog_backfill():
+    """Add affiliate-mapped and cached spec pages to the local product catalog."""
+    return {"ok": True, "recorded": await catalog.backfill()}
+
+
+@router.post("/rollups/rebuild")
+async def rollups_rebuild(session: AsyncSession = Depends(get_session)):
+    """Recompute post counters from the post table (e.g. after manual edits to the DB)."""
+    await rollups.rebuild_post_rollups(session)
     await session.commit()
-    return {"ok": True, "deduped_date": date}
+    return {"ok": True}
 
 
 @router.get("/ai-config")
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.db import get_session
-from app.models import AffiliateMap, ProductCandidate
+from app.db import get_session, get_read_session
+from app.models import AffiliateMap, ProductCandidate, Keyword
 from app.schemas import AffiliateMapCreate
+from app.services import catalog, affiliate_html
 from app.utils.urls import build_coupang_search_url
+from app.utils.pagination import keyset, set_next_cursor
 
 
 router = APIRouter()
@@ -15,19 +17,33 @@ async def map_affiliate(payload: AffiliateMapCreate, session: AsyncSession = Dep
     pc = await session.get(ProductCandidate, payload.product_id)
     if not pc:
         raise HTTPException(404, "product not found")
-    am = AffiliateMap(product_candidate_id=pc.id, affiliate_url=payload.url, affiliate_html=payload.html)
+    am = AffiliateMap(product_candidate_id=pc.id, affiliate_url=payload.url, html_hash=await affiliate_html.store(session, payload.html))
     pc.status = "mapped"
     session.add(am)
     await session.commit()
+    await catalog.record(payload.url, source="affiliate", title=pc.title_guess, brand=pc.brand, model=pc.model)
     return {"ok": True, "id": am.id}
 
 
 @router.get("/pending")
-async def pending(session: AsyncSession = Depends(get_session)):
-    q = select(ProductCandidate).where(ProductCandidate.status == "pending").order_by(ProductCandidate.id.desc())
-    res = await session.execute(q)
+async def pending(
+    response: Response,
+    keyword_id: int | None = None,
+    date: str | None = Query(None, description="keyword date_range (YYYY-MM-DD)"),
+    after_id: int | None = Query(None, description="cursor from the X-Next-After-Id header"),
+    limit: int = Query(200, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # only the columns the list shows
+    q = select(ProductCandidate.id, ProductCandidate.keyword_id, ProductCandidate.title_guess, ProductCandidate.brand, ProductCandidate.model)
+    q = q.where(ProductCandidate.status == "pending")
+    if keyword_id is not None:
+        q = q.where(ProductCandidate.keyword_id == keyword_id)
+    if date:
+        q = q.where(ProductCandidate.keyword_id.in_(select(Keyword.id).where(Keyword.date_range == date)))
+    res = await session.execute(keyset(q, ProductCandidate.id, after_id, limit))
     items = []
-    for pc in res.scalars():
+    for pc in res.all():
         items.append({
             "id": pc.id,
             "keyword_id": pc.keyword_id,
@@ -36,4 +52,5 @@ async def pending(session: AsyncSession = Depends(get_session)):
             "model": pc.model,
             "coupang_url": build_coupang_search_url(pc.title_guess, pc.brand, pc.model, None),
         })
+    set_next_cursor(response, [it["id"] for it in items], limit)
     return items
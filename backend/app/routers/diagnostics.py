@@ -24,3 +24,52 @@ async def ai_status():
     except Exception as e:
         info.update({"ok": False, "reason": f"AI error: {e}"})
     return info
+
+
+@router.get("/llm-cache")
+async def llm_cache_status():
+    from app.services.llm_cache import cache_stats
+    return await cache_stats()
+
+
+@router.delete("/llm-cache")
+async def llm_cache_purge():
+    from app.services.llm_cache import purge_cache
+    return {"ok": True, "deleted": await purge_cache()}
+
+
+@router.get("/rate-limits")
+async def rate_limit_status():
+    from app.services.rate_limit import governor_stats
+    return {"governors": governor_stats()}
+
+
+@router.get("/latency")
+async def latency_status():
+    from app.services.hedging import latency
+    return {"providers": latency.stats()}
+
+
+@router.get("/url-resolution")
+async def url_resolution_status():
+    from app.services.product_scout import resolve_stats
+    runs = resolve_stats["runs"] or 1
+    return {**resolve_stats, "avg_s": round(resolve_stats["total_s"] / runs, 3)}
+
+
+@router.get("/search-cache")
+async def search_cache_status():
+    from app.services.coupang import search_cache_stats
+    return await search_cache_stats()
+
+
+@router.get("/crawl")
+async def crawl_status():
+    from app.services.crawler import crawl_stats
+    return crawl_stats()
+
+
+@router.get("/catalog")
+async def catalog_status():
+    from app.services.catalog import catalog_summary
+    return await catalog_summary()
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db import get_session
+from app.db import get_session, get_read_session
 from app.models import Keyword
 from app.schemas import KeywordCreate, KeywordOut
 from app.services.datalab import fetch_trending_keywords
+from app.services.bulk_write import upsert_keywords
+from app.utils.pagination import keyset, set_next_cursor
 
 
 router = APIRouter()
@@ -16,42 +18,27 @@ async def fetch_keywords(session: AsyncSession = Depends(get_session)):
     if not items:
         return []
     day = items[0].get("date_range")
-
-    # Load existing keywords for this day to deduplicate
-    existing_res = await session.execute(
-        select(Keyword).where(Keyword.date_range == day)
-    )
-    existing = {k.text: k for k in existing_res.scalars()}
-
-    for i in items:
-        text = i["text"]
-        if text in existing:
-            # Optional: refresh score/category/status idempotently
-            k = existing[text]
-            k.score = i.get("score", k.score)
-            k.category = i.get("category", k.category)
-            k.status = k.status or "collected"
-        else:
-            kw = Keyword(
-                text=text,
-                date_range=day,
-                score=i.get("score"),
-                category=i.get("category"),
-                status="collected",
-            )
-            session.add(kw)
-            existing[text] = kw
-
+    # one upsert per chunk; existing keywords for the day are refreshed, not duplicated
+    kws = await upsert_keywords(session, items, day)
     await session.commit()
-
-    # Return the deduped list for the day (stable across repeated calls)
-    res = await session.execute(
-        select(Keyword).where(Keyword.date_range == day).order_by(Keyword.id.desc())
-    )
-    return list(res.scalars())
+    return sorted(kws, key=lambda k: k.id, reverse=True)
 
 
 @router.get("", response_model=list[KeywordOut])
-async def list_keywords(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(Keyword).order_by(Keyword.id.desc()).limit(200))
-    return list(res.scalars())
+async def list_keywords(
+    response: Response,
+    date: str | None = Query(None, description="YYYY-MM-DD (date_range)"),
+    status: str | None = None,
+    after_id: int | None = Query(None, description="cursor from the X-Next-After-Id header"),
+    limit: int = Query(200, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+):
+    q = select(Keyword)
+    if date:
+        q = q.where(Keyword.date_range == date)
+    if status:
+        q = q.where(Keyword.status == status)
+    res = await session.execute(keyset(q, Keyword.id, after_id, limit))
+    items = list(res.scalars())
+    set_next_cursor(response, [k.id for k in items], limit)
+    return items
@@ -1,25 +1,76 @@
-from fastapi import APIRouter, Depends
+import datetime as dt
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.db import get_session
-from app.models import Metrics, Post, Budget
+from sqlalchemy import select
+from app.db import get_session, get_read_session
+from app.models import Budget, DEFAULT_DAILY_CAP
+from app.schemas import MetricIngest
+from app.services import rollups
+from app.services.budget import unflushed_usage
 
 
 router = APIRouter()
 
 
+def _day(value: str | None, name: str) -> str | None:
+    if value is None:
+        return None
+    try:
+        return dt.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(400, f"{name} must be YYYY-MM-DD")
+
+
 @router.get("/posts")
-async def metrics_posts(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(func.count(Post.id)))
-    total_posts = res.scalar() or 0
-    res = await session.execute(select(func.count(Post.id)).where(Post.status == "published"))
-    published = res.scalar() or 0
-    return {"total": total_posts, "published": published}
+async def metrics_posts(
+    from_: str | None = Query(None, alias="from", description="YYYY-MM-DD; with `to`, adds per-day breakdowns"),
+    to: str | None = Query(None, description="YYYY-MM-DD"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # served from the rollup tables; no scan of the post table
+    return await rollups.post_summary(session, _day(from_, "from"), _day(to, "to"))
+
+
+@router.get("/daily")
+async def metrics_daily(
+    from_: str | None = Query(None, alias="from", description="YYYY-MM-DD"),
+    to: str | None = Query(None, description="YYYY-MM-DD"),
+    post_id: int | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    return {"daily": await rollups.metric_series(session, _day(from_, "from"), _day(to, "to"), post_id)}
+
+
+@router.post("/ingest")
+async def metrics_ingest(payload: MetricIngest, session: AsyncSession = Depends(get_session)):
+    items = [it.model_dump() for it in payload.items]
+    for it in items:
+        it["day"] = _day(it["day"], "day")
+    n, unknown = await rollups.ingest_metrics(session, items)
+    await session.commit()
+    # items for unknown posts are skipped, not written
+    return {"ok": True, "upserted": n, "unknown_post_ids": unknown}
 
 
 @router.get("/budget")
-async def metrics_budget(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(Budget))
+async def metrics_budget(
+    from_: str | None = Query(None, alias="from", description="YYYY-MM-DD; defaults to 30 days ago"),
+    to: str | None = Query(None, description="YYYY-MM-DD"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    date_from = _day(from_, "from") or (dt.date.today() - dt.timedelta(days=30)).isoformat()
+    date_to = _day(to, "to")
+    q = select(Budget).where(Budget.date >= date_from)
+    if date_to:
+        q = q.where(Budget.date <= date_to)
+    res = await session.execute(q.order_by(Budget.date))
     rows = [dict(date=b.date, token_used=b.token_used, usd_spent=b.usd_spent, cap=b.cap) for b in res.scalars()]
+    # include usage recorded in-process but not flushed yet
+    unflushed = {d: u for d, u in unflushed_usage().items() if d >= date_from and (not date_to or d <= date_to)}
+    for r in rows:
+        extra = unflushed.pop(r["date"], None)
+        if extra:
+            r["token_used"] += extra["token_used"]
+            r["usd_spent"] += extra["usd_spent"]
+    rows += [dict(date=d, cap=DEFAULT_DAILY_CAP, **u) for d, u in sorted(unflushed.items())]
     return {"daily": rows}
-
@@ -1,31 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime
-from app.db import get_session
+from sqlalchemy.orm import undefer
+from datetime import datetime, timedelta
+from loguru import logger
+from app.db import get_session, get_read_session, AsyncSessionLocal
+from app.settings import settings
 from app.models import Post, ProductCandidate, AffiliateMap, Keyword
 from app.schemas import PostDraftCreate, PostPublish, PostOut, PostDraftCompare
-from app.services.post_writer import generate_post_markdown
+from app.services.post_writer import generate_post_markdown, stream_post_markdown
 from app.services.publisher import schedule_post, publish_now
+from app.services import rollups
 from app.utils.errors import AIError
 from app.services.specs import fetch_coupang_product_specs, build_spec_table
 from app.services.analyzer import analyze_alignment
+from app.utils.pagination import keyset, set_next_cursor
 
 
 router = APIRouter()
 
 
-@router.post("/draft")
-async def create_draft(payload: PostDraftCreate, session: AsyncSession = Depends(get_session)):
-    pc = await session.get(ProductCandidate, payload.product_id)
+async def _load_draft_source(session: AsyncSession, product_id: int):
+    pc = await session.get(ProductCandidate, product_id)
     if not pc:
         raise HTTPException(404, "product not found")
     # check affiliate
-    amap = await session.execute(select(AffiliateMap).where(AffiliateMap.product_candidate_id == pc.id))
+    amap = await session.execute(select(AffiliateMap).where(AffiliateMap.product_candidate_id == pc.id).options(undefer(AffiliateMap.affiliate_html)))
     amap = amap.scalars().first()
     if not amap:
         raise HTTPException(400, "affiliate mapping required")
     kw = await session.get(Keyword, pc.keyword_id)
+    return pc, amap, kw
+
+
+async def _draft_template_input(pc: ProductCandidate, amap: AffiliateMap, kw: Keyword | None, payload: PostDraftCreate) -> tuple[dict, dict]:
     # enrich single-product with basic spec table if available
     spec_table_md = None
     sources = []
@@ -44,26 +55,89 @@ async def create_draft(payload: PostDraftCreate, session: AsyncSession = Depends
         affiliate_url=amap.affiliate_url, affiliate_html=amap.affiliate_html,
         keyword=(kw.text if kw else ""),
     )
+    template_input = {**alignment, **(payload.template_input or {}), **({"spec_table_md": spec_table_md, "sources": sources} if spec_table_md else {})}
+    return template_input, alignment
+
+
+def _draft_post(pc: ProductCandidate, alignment: dict, result: tuple) -> Post:
+    md, title, tags, images, template_id = result
+    return Post(keyword_id=pc.keyword_id, product_candidate_id=pc.id, title=title, body_md=md, tags=",".join(tags), images=",".join(images), status="draft", template_id=template_id, meta_json=json.dumps({"alignment": alignment}, ensure_ascii=False))
+
+
+@router.post("/draft")
+async def create_draft(payload: PostDraftCreate, session: AsyncSession = Depends(get_session)):
+    pc, amap, kw = await _load_draft_source(session, payload.product_id)
+    template_input, alignment = await _draft_template_input(pc, amap, kw, payload)
     try:
-        md, title, tags, images, template_id = await generate_post_markdown(
+        result = await generate_post_markdown(
             keyword=kw.text if kw else "",
             candidate=pc,
             affiliate_url=amap.affiliate_url,
             affiliate_html=amap.affiliate_html,
             template_type=payload.template_type or "A",
-            template_input={**alignment, **(payload.template_input or {}), **({"spec_table_md": spec_table_md, "sources": sources} if spec_table_md else {})},
+            template_input=template_input,
         )
     except AIError as e:
         status = 400 if e.code == 'config_error' else 502
         raise HTTPException(status_code=status, detail=e.to_dict())
-    import json
-    post = Post(keyword_id=pc.keyword_id, product_candidate_id=pc.id, title=title, body_md=md, tags=",".join(tags), images=",".join(images), status="draft", template_id=template_id, meta_json=json.dumps({"alignment": alignment}, ensure_ascii=False))
+    post = _draft_post(pc, alignment, result)
     session.add(post)
+    await rollups.post_created(session, post, kw)
     await session.commit()
     await session.refresh(post)
     return {"id": post.id, "title": post.title}
 
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/draft/stream")
+async def create_draft_stream(payload: PostDraftCreate, session: AsyncSession = Depends(get_session)):
+    """Server-Sent Events variant of /draft.
+
+    Events: 'status' (progress), 'chunk' ({"text"} markdown deltas), 'final' ({"id","title","body_md"}
+    after disclosure/alignment post-processing; body may differ from the concatenated chunks), 'error'.
+    """
+    # validate up front so missing product/mapping are still plain 404/400 responses
+    pc, amap, kw = await _load_draft_source(session, payload.product_id)
+
+    async def events():
+        yield _sse("status", {"stage": "preparing"})
+        try:
+            template_input, alignment = await _draft_template_input(pc, amap, kw, payload)
+            yield _sse("status", {"stage": "writing"})
+            result = None
+            async for kind, value in stream_post_markdown(
+                keyword=kw.text if kw else "",
+                candidate=pc,
+                affiliate_url=amap.affiliate_url,
+                affiliate_html=amap.affiliate_html,
+                template_type=payload.template_type or "A",
+                template_input=template_input,
+            ):
+                if kind == "chunk":
+                    yield _sse("chunk", {"text": value})
+                else:
+                    result = value
+                    yield _sse("status", {"stage": "saving"})
+        except AIError as e:
+            yield _sse("error", e.to_dict())
+            return
+        except Exception as e:
+            yield _sse("error", {"error": "draft_error", "reason": str(e)})
+            return
+        # the request-scoped session may already be closed once the response starts streaming
+        async with AsyncSessionLocal() as s:
+            post = _draft_post(pc, alignment, result)
+            s.add(post)
+            await rollups.post_created(s, post, kw)
+            await s.commit()
+        yield _sse("final", {"id": post.id, "title": post.title, "body_md": post.body_md})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.post("/publish")
 async def publish(payload: PostPublish, session: AsyncSession = Depends(get_session)):
     post = await session.get(Post, payload.post_id)
@@ -77,45 +151,117 @@ async def publish(payload: PostPublish, session: AsyncSession = Depends(get_sess
     return {"ok": True}
 
 
+_POST_SUMMARY_COLUMNS = (
+    Post.id, Post.title, Post.status, Post.scheduled_at, Post.published_at,
+    Post.keyword_id, Post.product_candidate_id, Post.template_id, Post.created_at,
+)
+
+
+def _post_out(row, body_md: str | None = None) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "body_md": body_md,
+        "status": row.status,
+        "scheduled_at": row.scheduled_at.isoformat() if row.scheduled_at else None,
+        "published_at": row.published_at.isoformat() if row.published_at else None,
+        "keyword_id": row.keyword_id,
+        "product_candidate_id": row.product_candidate_id,
+        "template_id": row.template_id,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
 @router.get("", response_model=list[PostOut])
-async def list_posts(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(Post).order_by(Post.id.desc()).limit(200))
-    return list(res.scalars())
+async def list_posts(
+    response: Response,
+    status: str | None = None,
+    keyword_id: int | None = None,
+    date: str | None = Query(None, description="created on (YYYY-MM-DD, UTC)"),
+    include_body: bool = False,
+    after_id: int | None = Query(None, description="cursor from the X-Next-After-Id header"),
+    limit: int = Query(200, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+):
+    cols = _POST_SUMMARY_COLUMNS + ((Post.body_md,) if include_body else ())
+    q = select(*cols)
+    if status:
+        q = q.where(Post.status == status)
+    if keyword_id is not None:
+        q = q.where(Post.keyword_id == keyword_id)
+    if date:
+        try:
+            day = datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(400, "date must be YYYY-MM-DD")
+        q = q.where(Post.created_at >= day, Post.created_at < day + timedelta(days=1))
+    rows = (await session.execute(keyset(q, Post.id, after_id, limit))).all()
+    set_next_cursor(response, [r.id for r in rows], limit)
+    return [_post_out(r, r.body_md if include_body else None) for r in rows]
+
+
+@router.get("/{post_id}", response_model=PostOut)
+async def get_post(post_id: int, session: AsyncSession = Depends(get_read_session)):
+    row = (await session.execute(select(*_POST_SUMMARY_COLUMNS, Post.body_md).where(Post.id == post_id))).first()
+    if not row:
+        raise HTTPException(404, "post not found")
+    return _post_out(row, row.body_md)
+
+
+async def _compare_specs(amaps: list[AffiliateMap | None]) -> list[dict]:
+    """Spec data per map (empty when unavailable), fetched concurrently.
+
+    Pages still pending after COMPARE_SPEC_DEADLINE are dropped from the table.
+    """
+    async def fetch(amap: AffiliateMap | None) -> dict:
+        if not (amap and amap.affiliate_url and 'coupang.com' in amap.affiliate_url):
+            return {}
+        try:
+            return await fetch_coupang_product_specs(amap.affiliate_url)
+        except Exception:
+            return {}
+
+    tasks = [asyncio.ensure_future(fetch(a)) for a in amaps]
+    _, pending = await asyncio.wait(tasks, timeout=settings.COMPARE_SPEC_DEADLINE)
+    for t in pending:
+        t.cancel()
+    if pending:
+        logger.warning("Compare draft: {} spec fetches missed the {}s deadline", len(pending), settings.COMPARE_SPEC_DEADLINE)
+    return [t.result() if t.done() and not t.cancelled() else {} for t in tasks]
 
 
 @router.post("/draft/compare")
 async def create_compare_draft(payload: PostDraftCompare, session: AsyncSession = Depends(get_session)):
     if not payload.product_ids or len(payload.product_ids) < 2:
         raise HTTPException(400, "at least 2 product_ids required")
-    # gather candidates (first 4)
-    pcs: list[ProductCandidate] = []
-    for pid in payload.product_ids[:4]:
-        pc = await session.get(ProductCandidate, pid)
-        if pc:
-            pcs.append(pc)
-    if len(pcs) < 2:
+    # gather candidates and their affiliate maps in one query, in request order
+    ids = list(dict.fromkeys(payload.product_ids))[: settings.COMPARE_MAX_PRODUCTS]
+    res = await session.execute(
+        select(ProductCandidate, AffiliateMap)
+        .outerjoin(AffiliateMap, AffiliateMap.product_candidate_id == ProductCandidate.id)
+        .where(ProductCandidate.id.in_(ids))
+        .order_by(AffiliateMap.id)
+        .options(undefer(AffiliateMap.affiliate_html))
+    )
+    found: dict[int, tuple[ProductCandidate, AffiliateMap | None]] = {}
+    for pc, amap in res.all():
+        found.setdefault(pc.id, (pc, amap))
+    pairs = [found[i] for i in ids if i in found]
+    if len(pairs) < 2:
         raise HTTPException(400, "not enough valid products")
-    # build spec table
+    pcs = [pc for pc, _ in pairs]
+    # build spec table; pages are fetched concurrently under one deadline
+    specs = await _compare_specs([amap for _, amap in pairs])
     rows = []
     sources = []
-    for pc in pcs:
-        amap = await session.execute(select(AffiliateMap).where(AffiliateMap.product_candidate_id == pc.id))
-        amap = amap.scalars().first()
-        spec = {}
-        if amap and amap.affiliate_url and 'coupang.com' in amap.affiliate_url:
-            try:
-                data = await fetch_coupang_product_specs(amap.affiliate_url)
-                spec = data.get('specs', {})
-                if data.get('source_url'):
-                    sources.append(data.get('source_url'))
-            except Exception:
-                pass
-        rows.append({ 'name': pc.title_guess or f"{pc.brand or ''} {pc.model or ''}", 'specs': spec, 'feature': pc.why or '' })
+    for (pc, _), data in zip(pairs, specs):
+        if data.get('source_url'):
+            sources.append(data.get('source_url'))
+        rows.append({ 'name': pc.title_guess or f"{pc.brand or ''} {pc.model or ''}", 'specs': data.get('specs', {}), 'feature': pc.why or '' })
     spec_table_md = build_spec_table(rows)
     # pick keyword from first candidate
     kw = await session.get(Keyword, pcs[0].keyword_id)
-    first_map = await session.execute(select(AffiliateMap).where(AffiliateMap.product_candidate_id == pcs[0].id))
-    first_map = first_map.scalars().first()
+    first_map = pairs[0][1]
     try:
         md, title, tags, images, template_id = await generate_post_markdown(
             keyword=kw.text if kw else "",
@@ -130,6 +276,7 @@ async def create_compare_draft(payload: PostDraftCompare, session: AsyncSession
         raise HTTPException(status_code=status, detail=e.to_dict())
     post = Post(keyword_id=pcs[0].keyword_id, product_candidate_id=pcs[0].id, title=title, body_md=md, tags=",".join(tags), images=",".join(images), status="draft", template_id=template_id)
     session.add(post)
+    await rollups.post_created(session, post, kw)
     await session.commit()
     await session.refresh(post)
     return {"id": post.id, "title": post.title}
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db import get_session
+from app.db import get_session, get_read_session
 from app.models import ProductCandidate, Keyword
-from app.schemas import ProductCandidateOut
-from app.services.product_scout import recommend_products
+from app.schemas import ProductCandidateOut, ProductRecommendBulk, ProductRecommendBulkOut
+from app.services.product_scout import recommend_products, recommend_products_bulk
+from app.services.bulk_write import insert_candidates
 from app.utils.errors import AIError
 from app.utils.urls import build_coupang_search_url
+from app.utils.pagination import keyset, set_next_cursor
 
 
 router = APIRouter()
 
 
+async def _add_candidates(session: AsyncSession, kw: Keyword, data: list[dict]) -> list[ProductCandidate]:
+    created = await insert_candidates(session, kw.id, data)
+    for pc, d in zip(created, data):
+        # attach non-persisted field 'coupang_url' for response convenience
+        pc.coupang_url = d.get("coupang_url") or build_coupang_search_url(pc.title_guess, pc.brand, pc.model, kw.text)
+    return created
+
+
 @router.post("/recommend/{keyword_id}", response_model=list[ProductCandidateOut])
 async def recommend(keyword_id: int, session: AsyncSession = Depends(get_session)):
     kw = await session.get(Keyword, keyword_id)
@@ -25,36 +35,71 @@ async def recommend(keyword_id: int, session: AsyncSession = Depends(get_session
     except AIError as e:
         status = 400 if e.code == 'config_error' else 502
         raise HTTPException(status_code=status, detail=e.to_dict())
-    created = []
-    for d in data:
-        pc = ProductCandidate(
-            keyword_id=kw.id,
-            title_guess=d.get("title_guess") or d.get("title"),
-            brand=d.get("brand"),
-            model=d.get("model"),
-            price_band=d.get("price_band"),
-            why=d.get("why"),
-            image_hint=d.get("image_hint"),
-            dedupe_key=d.get("dedupe_key"),
-        )
-        session.add(pc)
-        # attach non-persisted field 'coupang_url' for response convenience
-        pc.coupang_url = d.get("coupang_url") or build_coupang_search_url(pc.title_guess, pc.brand, pc.model, kw.text)
-        created.append(pc)
+    created = await _add_candidates(session, kw, data)
     await session.commit()
-    for pc in created:
-        await session.refresh(pc)
     return created
 
 
+@router.post("/recommend", response_model=list[ProductRecommendBulkOut])
+async def recommend_bulk(payload: ProductRecommendBulk, session: AsyncSession = Depends(get_session)):
+    ids = list(dict.fromkeys(payload.keyword_ids))
+    if not ids:
+        raise HTTPException(400, "keyword_ids required")
+    res = await session.execute(select(Keyword).where(Keyword.id.in_(ids)))
+    kws = {k.id: k for k in res.scalars()}
+    if not kws:
+        raise HTTPException(404, "keywords not found")
+    res = await session.execute(
+        select(ProductCandidate.keyword_id, ProductCandidate.dedupe_key)
+        .where(ProductCandidate.keyword_id.in_(list(kws)), ProductCandidate.dedupe_key.is_not(None))
+    )
+    dedup_keys: dict[int, list[str]] = {}
+    for kid, key in res.all():
+        if key:
+            dedup_keys.setdefault(kid, []).append(key)
+    # keyword texts are unique per day, but a bulk request may mix days
+    by_text: dict[str, list[Keyword]] = {}
+    for k in kws.values():
+        by_text.setdefault(k.text, []).append(k)
+    results = await recommend_products_bulk(
+        [(text, sorted({d for k in group for d in dedup_keys.get(k.id, [])})) for text, group in by_text.items()]
+    )
+    out = []
+    for kid in ids:
+        kw = kws.get(kid)
+        if not kw:
+            out.append({"keyword_id": kid, "error": {"error": "not_found", "reason": "keyword not found"}})
+            continue
+        data = results.get(kw.text)
+        if isinstance(data, AIError):
+            out.append({"keyword_id": kid, "error": data.to_dict()})
+            continue
+        out.append({"keyword_id": kid, "candidates": await _add_candidates(session, kw, data or [])})
+    # single transaction for every keyword's candidates
+    await session.commit()
+    return out
+
+
 @router.get("", response_model=list[ProductCandidateOut])
-async def list_candidates(status: str | None = None, session: AsyncSession = Depends(get_session)):
+async def list_candidates(
+    response: Response,
+    status: str | None = None,
+    keyword_id: int | None = None,
+    date: str | None = Query(None, description="keyword date_range (YYYY-MM-DD)"),
+    after_id: int | None = Query(None, description="cursor from the X-Next-After-Id header"),
+    limit: int = Query(200, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+):
     q = select(ProductCandidate)
     if status:
         q = q.where(ProductCandidate.status == status)
-    q = q.order_by(ProductCandidate.id.desc()).limit(200)
-    res = await session.execute(q)
+    if keyword_id is not None:
+        q = q.where(ProductCandidate.keyword_id == keyword_id)
+    if date:
+        q = q.where(ProductCandidate.keyword_id.in_(select(Keyword.id).where(Keyword.date_range == date)))
+    res = await session.execute(keyset(q, ProductCandidate.id, after_id, limit))
     items = list(res.scalars())
+    set_next_cursor(response, [it.id for it in items], limit)
     # attach computed coupang_url
     for it in items:
         it.coupang_url = build_coupang_search_url(it.title_guess, it.brand, it.model, None)
@@ -49,6 +49,16 @@ class ProductCandidateOut(BaseModel):
         from_attributes = True
 
 
+class ProductRecommendBulk(BaseModel):
+    keyword_ids: List[int]
+
+
+class ProductRecommendBulkOut(BaseModel):
+    keyword_id: int
+    candidates: List[ProductCandidateOut] = []
+    error: Optional[Dict[str, Any]] = None
+
+
 class AffiliateMapCreate(BaseModel):
     product_id: int
     url: str
@@ -69,10 +79,14 @@ class PostPublish(BaseModel):
 class PostOut(BaseModel):
     id: int
     title: Optional[str]
-    body_md: Optional[str]
+    body_md: Optional[str] = None  # list endpoints include it only with include_body=true
     status: str
     scheduled_at: Optional[str]
     published_at: Optional[str]
+    keyword_id: Optional[int] = None
+    product_candidate_id: Optional[int] = None
+    template_id: Optional[str] = None
+    created_at: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -86,3 +100,15 @@ class PostDraftCompare(BaseModel):
 class MetricsQuery(BaseModel):
     from_: Optional[str] = None
     to: Optional[str] = None
+
+
+class MetricIngestItem(BaseModel):
+    post_id: int
+    day: str  # YYYY-MM-DD
+    impressions: int = 0
+    clicks: int = 0
+    revenue: float = 0.0
+
+
+class MetricIngest(BaseModel):
+    items: List[MetricIngestItem]
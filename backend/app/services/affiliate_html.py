@@ -0,0 +1,15 @@
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import AffiliateHtml
+from app.utils.compress import content_hash
+
+
+async def store(session: AsyncSession, html: str | None) -> str | None:
+    """Save an affiliate snippet once per distinct content and return its hash for
+    AffiliateMap.html_hash; the caller commits."""
+    if not html:
+        return None
+    digest = content_hash(html)
+    stmt = insert(AffiliateHtml).values(hash=digest, html=html).on_conflict_do_nothing(index_elements=[AffiliateHtml.hash])
+    await session.execute(stmt)
+    return digest
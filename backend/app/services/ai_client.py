@@ -1,8 +1,70 @@
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from app.settings import settings
-from app.services.openai_client import complete_chat as openai_complete
-from app.services.gemini_client import complete_chat_gemini
+from app.services.openai_client import complete_chat as openai_complete, stream_chat as openai_stream
+from app.services.gemini_client import complete_chat_gemini, stream_chat_gemini
 from app.services.config import get_ai_config_dict
+from app.services.llm_cache import cache_key, should_cache, get_cached, put_cached
+from app.services.rate_limit import get_governor
+from app.services.hedging import hedged, hedge_budget, latency
+from app.services import budget
+
+
+def _resolve(cfg: Dict[str, str], use: str | None, purpose: str) -> Tuple[str, str]:
+    provider = (use or cfg.get('ai_provider') or settings.AI_PROVIDER).lower()
+    if provider == 'gemini':
+        model = cfg.get('gemini_model_writer' if purpose == 'writer' else 'gemini_model_small') or (
+            settings.GEMINI_MODEL_WRITER if purpose == 'writer' else settings.GEMINI_MODEL_SMALL
+        )
+    else:
+        model = cfg.get('openai_model_writer' if purpose == 'writer' else 'openai_model_small') or (
+            settings.OPENAI_MODEL_WRITER if purpose == 'writer' else settings.OPENAI_MODEL_SMALL
+        )
+    return provider, model
+
+
+def _has_key(provider: str) -> bool:
+    return bool(settings.GEMINI_API_KEY if provider == 'gemini' else settings.OPENAI_API_KEY)
+
+
+def _raw_call(cfg, provider, model, messages, temperature, max_tokens, force_json):
+    if provider == 'gemini':
+        # Per request: do NOT enforce token limits on Gemini
+        async def call():
+            return await complete_chat_gemini(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=None,
+                force_json=force_json,
+                safety_mode=cfg.get('gemini_safety'),
+            )
+    else:
+        async def call():
+            return await openai_complete(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, force_json=force_json)
+    return call
+
+
+def _provider_call(cfg, provider, model, purpose, messages, temperature, max_tokens, force_json):
+    """Zero-arg coroutine factory for one provider: budget-reserved, rate-governed and latency-tracked.
+
+    The call returns (text, total_tokens, provider, model) with the model that actually answered,
+    which differs from `model` when the budget downgraded the call.
+    """
+    async def governed():
+        # may downgrade to the provider's small model (or raise) when the budget is tight
+        res = await budget.reserve(model=model, fallback_model=_resolve(cfg, provider, 'small')[1], messages=messages, max_tokens=max_tokens, purpose=purpose)
+        call = _raw_call(cfg, provider, res.model, messages, temperature, max_tokens, force_json)
+        started = time.monotonic()
+        try:
+            result = await get_governor(provider, res.model).run(call, est_tokens=res.prompt_tokens + res.completion_tokens)
+        except BaseException:
+            budget.release(res)
+            raise
+        latency.record(provider, purpose, time.monotonic() - started)
+        await budget.settle(res, result[1])
+        return result[0], result[1], provider, res.model
+    return governed
 
 
 async def complete_chat(
@@ -13,23 +75,71 @@ async def complete_chat(
     use: str | None = None,  # 'gpt' | 'gemini'
     purpose: str = 'small',  # 'small' | 'writer'
     force_json: bool = False,
+    cache: bool | None = None,  # None → per-purpose policy in llm_cache.should_cache
 ) -> Tuple[str, int | None]:
     cfg = await get_ai_config_dict()
-    provider = (use or cfg.get('ai_provider') or settings.AI_PROVIDER).lower()
-    if provider == 'gemini':
-        model = cfg.get('gemini_model_writer' if purpose == 'writer' else 'gemini_model_small') or (
-            settings.GEMINI_MODEL_WRITER if purpose == 'writer' else settings.GEMINI_MODEL_SMALL
-        )
-        # Per request: do NOT enforce token limits on Gemini
-        return await complete_chat_gemini(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=None,
-            force_json=force_json,
-        )
+    provider, model = _resolve(cfg, use, purpose)
+
+    use_cache = should_cache(purpose, temperature) if cache is None else (cache and settings.LLM_CACHE_ENABLED)
+    key = None
+    if use_cache:
+        key = cache_key(provider=provider, model=model, messages=messages, temperature=temperature, force_json=force_json)
+        hit = await get_cached(key)
+        if hit is not None:
+            # served from cache: no tokens spent
+            return hit[0], 0
+
+    routing = (cfg.get('ai_routing') or settings.AI_ROUTING or 'single').lower()
+    primary = _provider_call(cfg, provider, model, purpose, messages, temperature, max_tokens, force_json)
+    secondary = None
+    if routing == 'hedged' and use is None:
+        other = 'gemini' if provider != 'gemini' else 'gpt'
+        if _has_key(other):
+            other_model = _resolve(cfg, other, purpose)[1]
+            secondary = _provider_call(cfg, other, other_model, purpose, messages, temperature, max_tokens, force_json)
+    if secondary is None:
+        text, total, answered_provider, answered_model = await primary()
     else:
-        model = cfg.get('openai_model_writer' if purpose == 'writer' else 'openai_model_small') or (
-            settings.OPENAI_MODEL_WRITER if purpose == 'writer' else settings.OPENAI_MODEL_SMALL
-        )
-        return openai_complete(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, force_json=force_json)
+        text, total, answered_provider, answered_model = await hedged(primary, secondary, hedge_budget(provider, purpose), label=f"{purpose}:{provider}")
+
+    if key and text:
+        if (answered_provider, answered_model) != (provider, model):
+            # hedged to the other provider or downgraded by the budget: file the answer under
+            # the pair that produced it, never under the one that was asked for
+            key = cache_key(provider=answered_provider, model=answered_model, messages=messages, temperature=temperature, force_json=force_json)
+        await put_cached(key, provider=answered_provider, model=answered_model, response=text, total_tokens=total)
+    return text, total
+
+
+async def stream_chat(
+    *,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = 1.0,
+    max_tokens: int | None = None,
+    use: str | None = None,  # 'gpt' | 'gemini'
+    purpose: str = 'writer',
+    usage: Dict[str, Any] | None = None,
+) -> AsyncIterator[str]:
+    """Stream completion text deltas from the configured provider (never cached).
+
+    When the stream ends, usage['total_tokens'] holds the provider-reported count if available.
+    """
+    cfg = await get_ai_config_dict()
+    provider, model = _resolve(cfg, use, purpose)
+    res = await budget.reserve(model=model, fallback_model=_resolve(cfg, provider, 'small')[1], messages=messages, max_tokens=max_tokens, purpose=purpose)
+    model = res.model
+    try:
+        async with get_governor(provider, model).slot(est_tokens=res.prompt_tokens + res.completion_tokens) as slot_usage:
+            if provider == 'gemini':
+                # Per request: do NOT enforce token limits on Gemini
+                chunks = stream_chat_gemini(model=model, messages=messages, temperature=temperature, max_tokens=None, safety_mode=cfg.get('gemini_safety'), usage=slot_usage)
+            else:
+                chunks = openai_stream(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, usage=slot_usage)
+            async for chunk in chunks:
+                yield chunk
+    except BaseException:
+        budget.release(res)
+        raise
+    await budget.settle(res, slot_usage.get('total_tokens'))
+    if usage is not None and slot_usage.get('total_tokens') is not None:
+        usage['total_tokens'] = slot_usage['total_tokens']
@@ -1,34 +1,222 @@
+import asyncio
 import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, List
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models import Budget
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert
+from app.db import AsyncSessionLocal
+from app.models import Budget, DEFAULT_DAILY_CAP
+from app.settings import settings
 
 
-TOKEN_PER_1K_COST = {
-    "gpt-4o-mini": 0.15  # USD per 1K tokens approx (example)
+# USD per 1K tokens: (prompt, completion). Longest matching model-name prefix wins.
+MODEL_PRICES: Dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4.1-nano": (0.0001, 0.0004),
+    "gpt-4.1-mini": (0.0004, 0.0016),
+    "gpt-4.1": (0.002, 0.008),
+    "gemini-1.5-flash": (0.000075, 0.0003),
+    "gemini-1.5-pro": (0.00125, 0.005),
+    "gemini-2.0-flash": (0.0001, 0.0004),
 }
+DEFAULT_PRICE = (0.0025, 0.01)  # unknown models are priced conservatively
 
+# kept for callers that only know a total token count
+TOKEN_PER_1K_COST = {m: (p + c) / 2 for m, (p, c) in MODEL_PRICES.items()}
 
-async def add_usage(session: AsyncSession, tokens: int, usd: float | None = None):
+DEFAULT_COMPLETION_TOKENS = {"small": 800, "writer": 2000}
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def price_for(model: str | None) -> tuple[float, float]:
+    prices = {**MODEL_PRICES, **{k: tuple(v) for k, v in (settings.MODEL_PRICES or {}).items()}}
+    if not model:
+        return DEFAULT_PRICE
+    best = max((k for k in prices if model.startswith(k)), key=len, default=None)
+    return prices[best] if best else DEFAULT_PRICE
+
+
+def estimate_cost(model: str | None, prompt_tokens: int, completion_tokens: int) -> float:
+    p, c = price_for(model)
+    return prompt_tokens / 1000.0 * p + completion_tokens / 1000.0 * c
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    # ~2 chars/token is conservative for Korean-heavy prompts
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 2 + 8 * len(messages)
+
+
+@dataclass
+class Reservation:
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    usd: float
+    day: str
+
+
+# in-flight reservations not yet reconciled, by day (guarded by _lock)
+_reserved: Dict[str, float] = {}
+_lock = asyncio.Lock()
+
+
+# usage recorded in-process but not yet written to the budget table, by day: [tokens, usd].
+# flush_usage() moves a batch to _flushing while its UPSERT is in flight; reads count both.
+_pending: Dict[str, List[float]] = {}
+_flushing: List[Dict[str, List[float]]] = []
+_flush_lock = asyncio.Lock()
+# bumped whenever a flush commits, so reserve() can tell its table read went stale
+_flush_generation = 0
+
+
+def _unflushed_usd(day_prefix: str) -> float:
+    total = 0.0
+    for batch in (_pending, *_flushing):
+        total += sum(usd for day, (_, usd) in batch.items() if day.startswith(day_prefix))
+    return total
+
+
+def unflushed_usage() -> Dict[str, Dict[str, float]]:
+    out: Dict[str, Dict[str, float]] = {}
+    for batch in (_pending, *_flushing):
+        for day, (tokens, usd) in batch.items():
+            acc = out.setdefault(day, {"token_used": 0, "usd_spent": 0.0})
+            acc["token_used"] += int(tokens)
+            acc["usd_spent"] += usd
+    return out
+
+
+async def _stored_spent(session: AsyncSession, today: str) -> tuple[float, float, float]:
+    """(spent today, daily cap, spent this month) as written to the budget table."""
+    row = (await session.execute(select(Budget).where(Budget.date == today))).scalars().first()
+    month = (await session.execute(select(func.coalesce(func.sum(Budget.usd_spent), 0.0)).where(Budget.date.like(today[:7] + "-%")))).scalar() or 0.0
+    return (row.usd_spent if row else 0.0), (row.cap if row else DEFAULT_DAILY_CAP), float(month)
+
+
+async def _spent(session: AsyncSession, today: str) -> tuple[float, float, float]:
+    """(spent today, daily cap, spent this month), including usage not flushed yet."""
+    day_spent, cap, month_spent = await _stored_spent(session, today)
+    return day_spent + _unflushed_usd(today), cap, month_spent + _unflushed_usd(today[:7] + "-")
+
+
+async def reserve(*, model: str, fallback_model: str | None, messages: List[Dict[str, Any]], max_tokens: int | None, purpose: str) -> Reservation:
+    """Reserve the expected cost of a completion against the daily cap and the monthly max.
+
+    If it doesn't fit and OPENAI_HARD_STOP is set, downgrade to `fallback_model` when that fits,
+    otherwise raise BudgetExceeded. Without hard stop the overshoot is only logged.
+    """
     today = dt.date.today().isoformat()
-    res = await session.execute(select(Budget).where(Budget.date == today))
-    row = res.scalars().first()
-    if not row:
-        row = Budget(date=today, token_used=0, usd_spent=0.0)
-        session.add(row)
-    row.token_used += tokens
+    prompt_tokens = estimate_prompt_tokens(messages)
+    completion_tokens = max_tokens or DEFAULT_COMPLETION_TOKENS.get(purpose, 800)
+    while True:
+        # read the table outside the lock so concurrent calls don't queue on SQLite
+        generation = _flush_generation
+        async with AsyncSessionLocal() as session:
+            day_stored, cap, month_stored = await _stored_spent(session, today)
+        async with _lock:
+            if generation != _flush_generation:
+                # a flush moved usage from memory into the table after our read; read again
+                continue
+            day_spent = day_stored + _unflushed_usd(today)
+            month_spent = month_stored + _unflushed_usd(today[:7] + "-")
+            pending = _reserved.get(today, 0.0)
+            day_left = cap - day_spent - pending
+            month_left = settings.OPENAI_MONTHLY_MAX_USD - month_spent - pending
+            chosen = model
+            usd = estimate_cost(model, prompt_tokens, completion_tokens)
+            if usd > min(day_left, month_left):
+                if not settings.OPENAI_HARD_STOP:
+                    logger.warning("Budget overshoot allowed (hard stop off): {} needs ${:.4f}, ${:.4f} left", model, usd, min(day_left, month_left))
+                else:
+                    cheaper = estimate_cost(fallback_model, prompt_tokens, completion_tokens) if fallback_model and fallback_model != model else None
+                    if cheaper is None or cheaper > min(day_left, month_left):
+                        raise BudgetExceeded(
+                            f"budget_exceeded: {model} needs ~${usd:.4f}, ${max(0.0, day_left):.4f} left today, ${max(0.0, month_left):.4f} left this month"
+                        )
+                    logger.warning("Budget tight: downgrading {} → {}", model, fallback_model)
+                    chosen, usd = fallback_model, cheaper
+            _reserved[today] = pending + usd
+            return Reservation(model=chosen, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, usd=usd, day=today)
+
+
+def release(res: Reservation):
+    _reserved[res.day] = max(0.0, _reserved.get(res.day, 0.0) - res.usd)
+
+
+async def settle(res: Reservation, total_tokens: int | None):
+    """Swap the reservation for the actual usage (estimate if the provider reported none)."""
+    release(res)
+    if total_tokens is None:
+        prompt, completion = res.prompt_tokens, res.completion_tokens
+    else:
+        prompt = min(total_tokens, res.prompt_tokens)
+        completion = total_tokens - prompt
+    record_usage(prompt + completion, estimate_cost(res.model, prompt, completion))
+
+
+def record_usage(tokens: int, usd: float | None = None, model: str | None = None):
+    """Add usage to today's in-process total; flush_usage() writes it out."""
     if usd is None:
         # approximate
-        row.usd_spent += (tokens / 1000.0) * TOKEN_PER_1K_COST.get("gpt-4o-mini", 0.15)
-    else:
-        row.usd_spent += usd
-    await session.commit()
+        usd = (tokens / 1000.0) * sum(price_for(model or settings.OPENAI_MODEL_SMALL)) / 2
+    acc = _pending.setdefault(dt.date.today().isoformat(), [0, 0.0])
+    acc[0] += tokens
+    acc[1] += usd
+
+
+async def add_usage(session: AsyncSession | None, tokens: int, usd: float | None = None, model: str | None = None):
+    # kept for callers holding a session; usage is accumulated and written by flush_usage()
+    record_usage(tokens, usd, model)
+
+
+async def flush_usage() -> int:
+    """Write accumulated usage with one atomic UPSERT per day (token_used = token_used + ?).
+    Runs every BUDGET_FLUSH_INTERVAL seconds and at shutdown; failed batches are kept for the next run.
+    """
+    global _pending, _flush_generation
+    async with _flush_lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+        _flushing.append(batch)
+        try:
+            async with AsyncSessionLocal() as session:
+                for day, (tokens, usd) in batch.items():
+                    stmt = insert(Budget).values(date=day, token_used=int(tokens), usd_spent=usd)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[Budget.date],
+                        set_={
+                            "token_used": Budget.token_used + stmt.excluded.token_used,
+                            "usd_spent": Budget.usd_spent + stmt.excluded.usd_spent,
+                        },
+                    )
+                    await session.execute(stmt)
+                await session.commit()
+            _flush_generation += 1
+        except Exception as e:
+            logger.warning("Budget usage flush failed, will retry: {}", e)
+            for day, (tokens, usd) in batch.items():
+                acc = _pending.setdefault(day, [0, 0.0])
+                acc[0] += tokens
+                acc[1] += usd
+            return 0
+        finally:
+            _flushing.remove(batch)
+        return len(batch)
 
 
 async def can_spend(session: AsyncSession, expected_usd: float) -> bool:
     today = dt.date.today().isoformat()
-    res = await session.execute(select(Budget).where(Budget.date == today))
-    row = res.scalars().first()
-    spent = row.usd_spent if row else 0.0
-    return spent + expected_usd <= (row.cap if row else 20.0)
-
+    day_spent, cap, month_spent = await _spent(session, today)
+    pending = _reserved.get(today, 0.0)
+    return (
+        day_spent + pending + expected_usd <= cap
+        and month_spent + pending + expected_usd <= settings.OPENAI_MONTHLY_MAX_USD
+    )
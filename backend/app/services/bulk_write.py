@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Keyword, ProductCandidate
+
+
+# rows per statement; keeps bound parameters well under SQLite's limit
+CHUNK_ROWS = 1000
+
+_CANDIDATE_FIELDS = ("title_guess", "brand", "model", "price_band", "why", "image_hint", "dedupe_key")
+
+
+async def upsert_keywords(session: AsyncSession, items: Iterable[Dict[str, Any]], day: str | None) -> List[Keyword]:
+    """Insert or refresh keywords for `day` with INSERT ... ON CONFLICT (text, date_range) DO UPDATE
+    ... RETURNING, one statement per CHUNK_ROWS rows. Existing rows get the new score/category (an item
+    without one keeps the stored value) and keep their status. Returns the affected keywords; the
+    caller commits.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for i in items:
+        # last occurrence wins, like the per-row update it replaces
+        rows[i["text"]] = {
+            "text": i["text"],
+            "date_range": day,
+            "score": i.get("score"),
+            "category": i.get("category"),
+            "status": "collected",
+        }
+    if not rows:
+        return []
+    if day is None:
+        return await _upsert_undated_keywords(session, rows)
+    # executemany form: compiled once, sent as multi-row INSERT ... RETURNING batches
+    # ("insertmanyvalues", CHUNK_ROWS rows per statement)
+    stmt = insert(Keyword)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Keyword.text, Keyword.date_range],
+        set_={
+            "score": func.coalesce(stmt.excluded.score, Keyword.score),
+            "category": func.coalesce(stmt.excluded.category, Keyword.category),
+            "status": func.coalesce(Keyword.status, stmt.excluded.status),
+        },
+    ).returning(Keyword)
+    res = await session.scalars(
+        stmt.execution_options(insertmanyvalues_page_size=CHUNK_ROWS),
+        list(rows.values()),
+        execution_options={"populate_existing": True},
+    )
+    return list(res.all())
+
+
+async def _upsert_undated_keywords(session: AsyncSession, rows: Dict[str, Dict[str, Any]]) -> List[Keyword]:
+    """upsert_keywords for date_range NULL: UNIQUE treats NULLs as distinct, so ON CONFLICT never
+    fires and existing rows are looked up instead."""
+    texts = list(rows)
+    existing: Dict[str, Keyword] = {}
+    for start in range(0, len(texts), CHUNK_ROWS):
+        res = await session.scalars(
+            select(Keyword).where(Keyword.date_range.is_(None), Keyword.text.in_(texts[start:start + CHUNK_ROWS]))
+        )
+        existing.update((k.text, k) for k in res)
+    for text, k in existing.items():
+        row = rows[text]
+        if row["score"] is not None:
+            k.score = row["score"]
+        if row["category"] is not None:
+            k.category = row["category"]
+        k.status = k.status or row["status"]
+    new = [row for text, row in rows.items() if text not in existing]
+    if new:
+        res = await session.scalars(
+            insert(Keyword).returning(Keyword).execution_options(insertmanyvalues_page_size=CHUNK_ROWS), new
+        )
+        existing.update((k.text, k) for k in res.all())
+    await session.flush()
+    return [existing[text] for text in texts]
+
+
+async def insert_candidates(session: AsyncSession, keyword_id: int, data: Iterable[Dict[str, Any]]) -> List[ProductCandidate]:
+    """Multi-row INSERT ... RETURNING of recommended candidates for one keyword, in input order;
+    the caller commits."""
+    values = []
+    for d in data:
+        row = {f: d.get(f) for f in _CANDIDATE_FIELDS}
+        row["title_guess"] = d.get("title_guess") or d.get("title")
+        row["keyword_id"] = keyword_id
+        row["status"] = "pending"
+        values.append(row)
+    if not values:
+        return []
+    stmt = insert(ProductCandidate).returning(ProductCandidate)
+    res = await session.scalars(stmt.execution_options(insertmanyvalues_page_size=CHUNK_ROWS), values)
+    # RETURNING order isn't guaranteed (and asking SQLAlchemy to sort falls back to one row per
+    # statement on SQLite); new rowids follow the parameter order, so sort by id instead
+    return sorted(res.all(), key=lambda pc: pc.id)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import datetime as dt
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.sqlite import insert
+from app.db import AsyncSessionLocal
+from app.models import CatalogProduct, AffiliateMap, ProductCandidate, ProductSpecCache
+from app.utils.urls import canonical_product_url
+
+
+# local resolution counters (exposed via /api/diagnostics/catalog)
+catalog_stats: Dict[str, int] = {"lookups": 0, "hits": 0, "misses": 0, "recorded": 0}
+
+_MATCH_SQL = text(
+    "SELECT c.url FROM product_catalog_fts f JOIN product_catalog c ON c.id = f.rowid "
+    "WHERE product_catalog_fts MATCH :q "
+    "ORDER BY bm25(product_catalog_fts, 1.0, 2.0, 4.0) LIMIT 1"
+)
+
+
+def _is_product_url(url: str | None) -> bool:
+    return bool(url) and "coupang.com" in url and "/vp/products/" in url
+
+
+def _tokens(*parts: str | None) -> List[str]:
+    s = unicodedata.normalize("NFKC", " ".join(p for p in parts if p)).lower()
+    return re.findall(r"\w+", s)
+
+
+def match_query(brand: str | None, model: str | None, title_guess: str | None) -> Optional[str]:
+    """FTS5 query requiring every token; None when the input is too vague to trust a local hit.
+
+    brand+model is used when a model is known, otherwise the title guess (first 8 tokens).
+    """
+    tokens = _tokens(brand, model) if model else _tokens(title_guess)[:8]
+    tokens = list(dict.fromkeys(tokens))
+    if len(tokens) < 2:
+        return None
+    return " ".join(f'"{t}"' for t in tokens)
+
+
+async def match_many(items: Iterable[Tuple[str | None, str | None, str | None]]) -> List[Optional[str]]:
+    """Best local product URL for each (brand, model, title_guess), or None."""
+    out: List[Optional[str]] = []
+    async with AsyncSessionLocal() as session:
+        for brand, model, title_guess in items:
+            q = match_query(brand, model, title_guess)
+            url = None
+            if q:
+                catalog_stats["lookups"] += 1
+                try:
+                    url = (await session.execute(_MATCH_SQL, {"q": q})).scalar()
+                except Exception as e:
+                    logger.warning("Catalog match failed for {!r}: {}", q, e)
+                catalog_stats["hits" if url else "misses"] += 1
+            out.append(url)
+    return out
+
+
+async def record_many(entries: Iterable[Dict[str, Any]], source: str) -> int:
+    """Upsert product pages (url, title, brand, model) into the catalog; non-product URLs are skipped.
+    Known fields are kept when a later source doesn't provide them."""
+    now = dt.datetime.utcnow()
+    rows = {}
+    for e in entries:
+        url = e.get("url")
+        if not _is_product_url(url):
+            continue
+        key = canonical_product_url(url)
+        row = rows.setdefault(key, {"url": key, "title": None, "brand": None, "model": None, "source": source, "updated_at": now})
+        for field in ("title", "brand", "model"):
+            row[field] = row[field] or e.get(field) or None
+    if not rows:
+        return 0
+    values = list(rows.values())
+    try:
+        async with AsyncSessionLocal() as session:
+            for i in range(0, len(values), 500):
+                stmt = insert(CatalogProduct).values(values[i:i + 500])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[CatalogProduct.url],
+                    set_={
+                        "title": func.coalesce(stmt.excluded.title, CatalogProduct.title),
+                        "brand": func.coalesce(stmt.excluded.brand, CatalogProduct.brand),
+                        "model": func.coalesce(stmt.excluded.model, CatalogProduct.model),
+                        "source": stmt.excluded.source,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+                await session.execute(stmt)
+            await session.commit()
+    except Exception as e:
+        logger.warning("Catalog update failed: {}", e)
+        return 0
+    catalog_stats["recorded"] += len(rows)
+    return len(rows)
+
+
+async def record(url: str | None, *, source: str, title: str | None = None, brand: str | None = None, model: str | None = None) -> int:
+    return await record_many([{"url": url, "title": title, "brand": brand, "model": model}], source)
+
+
+async def backfill() -> Dict[str, int]:
+    """Fill the catalog from existing affiliate maps and cached spec pages."""
+    async with AsyncSessionLocal() as session:
+        maps = (await session.execute(
+            select(AffiliateMap.affiliate_url, ProductCandidate.title_guess, ProductCandidate.brand, ProductCandidate.model)
+            .join(ProductCandidate, ProductCandidate.id == AffiliateMap.product_candidate_id)
+        )).all()
+        specs = (await session.execute(
+            select(ProductSpecCache.url, ProductSpecCache.data_json).where(ProductSpecCache.status == "ok")
+        )).all()
+    affiliate = await record_many(
+        ({"url": u, "title": t, "brand": b, "model": m} for u, t, b, m in maps), "affiliate"
+    )
+
+    def spec_entries():
+        for url, data_json in specs:
+            try:
+                data = json.loads(data_json or "{}")
+            except Exception:
+                continue
+            yield {"url": data.get("source_url") or url, "title": data.get("title")}
+
+    spec = await record_many(spec_entries(), "spec")
+    return {"affiliate": affiliate, "spec": spec}
+
+
+async def catalog_summary() -> Dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(CatalogProduct.source, func.count()).group_by(CatalogProduct.source))).all()
+    lookups = catalog_stats["lookups"]
+    return {
+        **catalog_stats,
+        "entries": {s: n for s, n in rows},
+        "hit_rate": (catalog_stats["hits"] / lookups) if lookups else None,
+    }
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import time
 from typing import Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -7,12 +8,23 @@ from app.models import AppConfig
 from app.settings import settings
 
 
-async def get_ai_config_dict() -> Dict[str, str]:
-    values: Dict[str, str] = {}
-    async with AsyncSessionLocal() as session:
-        res = await session.execute(select(AppConfig))
-        for row in res.scalars():
-            values[row.key] = row.value or ""
+# Row bumped on every write so other workers can notice changes cheaply
+VERSION_KEY = 'config_version'
+
+# In-process snapshot: (version, values); checked against the DB at most every AI_CONFIG_CACHE_TTL seconds
+_snapshot: Dict[str, str] | None = None
+_snapshot_version: str | None = None
+_checked_at: float = 0.0
+
+
+def invalidate_ai_config_cache():
+    global _snapshot, _snapshot_version, _checked_at
+    _snapshot = None
+    _snapshot_version = None
+    _checked_at = 0.0
+
+
+def _with_fallbacks(values: Dict[str, str]) -> Dict[str, str]:
     # fallbacks from env
     return {
         'ai_provider': values.get('ai_provider', settings.AI_PROVIDER),
@@ -21,11 +33,35 @@ async def get_ai_config_dict() -> Dict[str, str]:
         'gemini_model_small': values.get('gemini_model_small', settings.GEMINI_MODEL_SMALL),
         'gemini_model_writer': values.get('gemini_model_writer', settings.GEMINI_MODEL_WRITER),
         'gemini_safety': values.get('gemini_safety', settings.GEMINI_SAFETY),
+        'ai_routing': values.get('ai_routing', settings.AI_ROUTING),
     }
 
 
+async def get_ai_config_dict() -> Dict[str, str]:
+    global _snapshot, _snapshot_version, _checked_at
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < settings.AI_CONFIG_CACHE_TTL:
+        return dict(_snapshot)
+    async with AsyncSessionLocal() as session:
+        if _snapshot is not None:
+            # cheap primary-key lookup; full reload only if another worker changed the config
+            row = await session.get(AppConfig, VERSION_KEY)
+            version = row.value if row else None
+            if version == _snapshot_version:
+                _checked_at = now
+                return dict(_snapshot)
+        values: Dict[str, str] = {}
+        res = await session.execute(select(AppConfig))
+        for row in res.scalars():
+            values[row.key] = row.value or ""
+    _snapshot_version = values.get(VERSION_KEY)
+    _snapshot = _with_fallbacks(values)
+    _checked_at = now
+    return dict(_snapshot)
+
+
 async def set_ai_config_dict(data: Dict[str, str]):
-    allowed = {'ai_provider', 'openai_model_small', 'openai_model_writer', 'gemini_model_small', 'gemini_model_writer', 'gemini_safety'}
+    allowed = {'ai_provider', 'openai_model_small', 'openai_model_writer', 'gemini_model_small', 'gemini_model_writer', 'gemini_safety', 'ai_routing'}
     async with AsyncSessionLocal() as session:
         for k, v in data.items():
             if k not in allowed:
@@ -35,4 +71,10 @@ async def set_ai_config_dict(data: Dict[str, str]):
                 existing.value = str(v)
             else:
                 session.add(AppConfig(key=k, value=str(v)))
+        version = await session.get(AppConfig, VERSION_KEY)
+        if version:
+            version.value = str(int(version.value or 0) + 1)
+        else:
+            session.add(AppConfig(key=VERSION_KEY, value="1"))
         await session.commit()
+    invalidate_ai_config_cache()
@@ -1,9 +1,17 @@
 from __future__ import annotations
+import asyncio
+import datetime as dt
 import re
+import unicodedata
 from urllib.parse import quote_plus
-from typing import Optional
-import httpx
+from typing import Dict, Optional, Tuple
 from bs4 import BeautifulSoup
+from sqlalchemy import select, func
+from app.db import AsyncSessionLocal
+from app.models import SearchResultCache
+from app.settings import settings
+from app.services.crawler import INTERACTIVE, crawl_get
+from app.services.html_extract import PARSER, SEARCH_LINK_STRAINER, run_parser
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36",
@@ -15,23 +23,31 @@ def search_url(query: str) -> str:
     return f"https://www.coupang.com/np/search?q={quote_plus(query)}&channel=user"
 
 
-async def fetch_top_product_url(query: str, timeout: float = 12.0) -> Optional[str]:
-    """Return first product page URL from Coupang search results or None if not found.
-    Non-auth scraping; best-effort.
-    """
-    url = search_url(query)
-    async with httpx.AsyncClient(headers=HEADERS, timeout=timeout, follow_redirects=True) as client:
-        r = await client.get(url)
+def normalize_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query or "").lower().split())
+
+
+# lookup counters (exposed via /api/diagnostics/search-cache)
+search_stats: Dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+async def _search_top_product_url(query: str, timeout: float, priority: int) -> Tuple[Optional[str], bool]:
+    """Scrape the search page. Returns (url or None, cacheable); non-200 answers aren't cacheable."""
+    r = await crawl_get(search_url(query), headers=HEADERS, timeout=timeout, priority=priority)
     if r.status_code != 200:
-        return None
-    html = r.text
+        return None, False
+    return await run_parser(extract_top_product_url, r.text), True
+
+
+def extract_top_product_url(html: str) -> Optional[str]:
     # Common pattern: /vp/products/<id>
     m = re.search(r"/vp/products/(\d+)", html)
     if m:
         pid = m.group(1)
         return f"https://www.coupang.com/vp/products/{pid}"
-    # Fallback to parsing anchors
-    soup = BeautifulSoup(html, 'html.parser')
+    # Fallback to parsing anchors (links only)
+    soup = BeautifulSoup(html, PARSER, parse_only=SEARCH_LINK_STRAINER)
     a = soup.select_one('a.search-product-link') or soup.select_one('a[href*="/vp/products/"]')
     if a and a.get('href'):
         href = a['href']
@@ -40,3 +56,78 @@ async def fetch_top_product_url(query: str, timeout: float = 12.0) -> Optional[s
         return f"https://www.coupang.com{href}"
     return None
 
+
+async def _cached(key: str) -> Tuple[bool, Optional[str]]:
+    async with AsyncSessionLocal() as session:
+        row = await session.get(SearchResultCache, key)
+    if row and row.expires_at > dt.datetime.utcnow():
+        return True, row.product_url
+    return False, None
+
+
+async def _store(key: str, product_url: Optional[str]):
+    now = dt.datetime.utcnow()
+    ttl = settings.SEARCH_CACHE_TTL if product_url else settings.SEARCH_CACHE_NEGATIVE_TTL
+    async with AsyncSessionLocal() as session:
+        row = await session.get(SearchResultCache, key)
+        if not row:
+            row = SearchResultCache(query=key)
+            session.add(row)
+        row.product_url = product_url
+        row.fetched_at = now
+        row.expires_at = now + dt.timedelta(seconds=ttl)
+        await session.commit()
+
+
+async def fetch_top_product_url(query: str, timeout: float = 12.0, priority: int = INTERACTIVE) -> Optional[str]:
+    """Return first product page URL from Coupang search results or None if not found.
+    Non-auth scraping; best-effort.
+
+    Results are cached per normalized query (misses for a shorter TTL), and concurrent
+    lookups of the same query share one request.
+    """
+    key = normalize_query(query)
+    found, product_url = await _cached(key)
+    if found:
+        search_stats["hits" if product_url else "negative_hits"] += 1
+        return product_url
+    fut = _inflight.get(key)
+    while fut is not None:
+        search_stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            # the leader was cancelled, not us: run the lookup ourselves (or join a newer one)
+            if not fut.cancelled() or asyncio.current_task().cancelling():
+                raise
+        fut = _inflight.get(key)
+    search_stats["misses"] += 1
+    fut = asyncio.get_running_loop().create_future()
+    # waiters re-raise the leader's error; this marks it retrieved when nobody was waiting
+    fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = fut
+    try:
+        search_stats["fetches"] += 1
+        product_url, cacheable = await _search_top_product_url(query, timeout, priority)
+        if cacheable:
+            await _store(key, product_url)
+        fut.set_result(product_url)
+        return product_url
+    except BaseException as e:
+        search_stats["errors"] += 1
+        if isinstance(e, Exception):
+            fut.set_exception(e)
+        else:
+            # only this task was cancelled; waiters see a cancelled future and retry on their own
+            fut.cancel()
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def search_cache_stats() -> Dict:
+    async with AsyncSessionLocal() as session:
+        entries = (await session.execute(select(func.count()).select_from(SearchResultCache))).scalar() or 0
+    lookups = search_stats["hits"] + search_stats["negative_hits"] + search_stats["misses"] + search_stats["coalesced"]
+    saved = lookups - search_stats["fetches"]
+    return {**search_stats, "entries": entries, "hit_rate": (saved / lookups) if lookups else None}
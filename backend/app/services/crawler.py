@@ -0,0 +1,179 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from loguru import logger
+from app.settings import settings
+from app.services.http_clients import get_http_client
+
+
+# request priorities (lower runs first)
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# answers that mean the host is throttling or blocking us
+BLOCK_STATUSES = {403, 429, 503}
+
+
+class CrawlBlocked(RuntimeError):
+    pass
+
+
+class HostScheduler:
+    """Polite access to one host.
+
+    Requests are granted in priority order, at most HTTP_HOST_CONCURRENCY at a time and
+    no closer than CRAWL_MIN_INTERVAL apart. Blocking answers (403/429/503, timeouts)
+    grow an extra delay up to CRAWL_BACKOFF_MAX; CRAWL_BREAKER_THRESHOLD of them in a
+    row open a circuit breaker that fails requests immediately for
+    CRAWL_BREAKER_COOLDOWN seconds, after which single probe requests are let through.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.backoff = 0.0
+        self.next_at = 0.0
+        self.in_flight = 0
+        self.failures = 0  # consecutive blocking answers
+        self.open_until = 0.0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.counters: Dict[str, int] = {"requests": 0, "ok": 0, "failed": 0, "blocked": 0, "rejected": 0, "breaker_trips": 0}
+
+    def _tripped(self) -> bool:
+        return self.failures >= settings.CRAWL_BREAKER_THRESHOLD
+
+    def _reject_if_open(self):
+        if self._tripped() and time.monotonic() < self.open_until:
+            self.counters["rejected"] += 1
+            raise CrawlBlocked(f"crawl_blocked: {self.host} circuit open for {self.open_until - time.monotonic():.0f}s")
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        self._reject_if_open()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), fut))
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # granted just as we were cancelled: hand the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+    def release(self, status: Optional[int], retry_after: Optional[str] = None, timed_out: bool = False):
+        self.in_flight -= 1
+        now = time.monotonic()
+        if timed_out or status in BLOCK_STATUSES:
+            self.counters["blocked"] += 1
+            self.failures += 1
+            self.backoff = min(settings.CRAWL_BACKOFF_MAX, max(settings.CRAWL_MIN_INTERVAL, self.backoff * 2))
+            delay = self.backoff
+            try:
+                delay = max(delay, float(retry_after)) if retry_after else delay
+            except ValueError:
+                pass
+            self.next_at = max(self.next_at, now + delay)
+            if self._tripped():
+                self.counters["breaker_trips"] += 1
+                self.open_until = now + settings.CRAWL_BREAKER_COOLDOWN
+                logger.warning("Crawl breaker open for {} ({}s): {} blocking answers in a row", self.host, settings.CRAWL_BREAKER_COOLDOWN, self.failures)
+        elif status is None:
+            self.counters["failed"] += 1
+        else:
+            self.counters["ok" if status < 400 else "failed"] += 1
+            self.failures = 0
+            self.backoff = self.backoff / 2 if self.backoff > 0.1 else 0.0
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant queued requests while slots, spacing and the breaker allow."""
+        while self._queue:
+            _, _, fut = self._queue[0]
+            if fut.done():  # waiter went away
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            if self._tripped():
+                if now < self.open_until:
+                    heapq.heappop(self._queue)
+                    self.counters["rejected"] += 1
+                    fut.set_exception(CrawlBlocked(f"crawl_blocked: {self.host} circuit open"))
+                    continue
+                # half-open: one probe at a time
+                limit = 1
+            else:
+                limit = max(1, settings.HTTP_HOST_CONCURRENCY)
+            if self.in_flight >= limit:
+                return
+            if now < self.next_at:
+                self._arm(self.next_at - now)
+                return
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+            self.counters["requests"] += 1
+            self.next_at = now + settings.CRAWL_MIN_INTERVAL + self.backoff
+            fut.set_result(None)
+
+    def _arm(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+
+        def fire():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(delay, fire)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            **self.counters,
+            "queued": sum(1 for _, _, f in self._queue if not f.done()),
+            "in_flight": self.in_flight,
+            "backoff_s": round(self.backoff, 2),
+            "consecutive_blocks": self.failures,
+            "breaker_open": self._tripped() and now < self.open_until,
+            "breaker_retry_in_s": round(max(0.0, self.open_until - now), 1) if self._tripped() else 0.0,
+        }
+
+
+_schedulers: Dict[str, HostScheduler] = {}
+
+
+def scheduler_for(url: str) -> HostScheduler:
+    host = urlsplit(url).netloc
+    sched = _schedulers.get(host)
+    if sched is None:
+        sched = HostScheduler(host)
+        _schedulers[host] = sched
+    return sched
+
+
+async def crawl_get(url: str, *, headers: Dict[str, str], timeout: float, priority: int = INTERACTIVE) -> httpx.Response:
+    """GET a Coupang page through the host's scheduler. Raises CrawlBlocked while its breaker is open."""
+    sched = scheduler_for(url)
+    await sched.acquire(priority)
+    status: Optional[int] = None
+    retry_after: Optional[str] = None
+    timed_out = False
+    try:
+        r = await get_http_client("coupang").get(url, headers=headers, timeout=timeout)
+        status, retry_after = r.status_code, r.headers.get("retry-after")
+        return r
+    except httpx.TimeoutException:
+        timed_out = True
+        raise
+    finally:
+        sched.release(status, retry_after, timed_out)
+
+
+def crawl_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: s.stats() for host, s in _schedulers.items()}
@@ -1,24 +1,52 @@
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Tuple
 import google.generativeai as genai
 from app.settings import settings
 from app.services.config import get_ai_config_dict
 
 
+_configured_key: str | None = None
+
+
 def get_client() -> bool:
+    global _configured_key
     if not settings.GEMINI_API_KEY:
         return False
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+    if _configured_key != settings.GEMINI_API_KEY:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        _configured_key = settings.GEMINI_API_KEY
+        get_model.cache_clear()
     return True
 
 
-async def complete_chat_gemini(
-    *,
-    model: str,
+@lru_cache(maxsize=8)
+def get_safety_settings(safety_mode: str) -> tuple:
+    threshold = 'BLOCK_ONLY_HIGH' if safety_mode == 'low' else ('BLOCK_NONE' if safety_mode == 'none' else 'BLOCK_MEDIUM_AND_ABOVE')
+    return tuple(
+        {"category": category, "threshold": threshold}
+        for category in (
+            "HARM_CATEGORY_HARASSMENT",
+            "HARM_CATEGORY_HATE_SPEECH",
+            "HARM_CATEGORY_SEXUAL",
+            "HARM_CATEGORY_DANGEROUS",
+        )
+    )
+
+
+@lru_cache(maxsize=16)
+def get_model(model: str, safety_mode: str) -> genai.GenerativeModel:
+    """Configured model object, reused across calls for the same (model, safety mode)."""
+    return genai.GenerativeModel(model, safety_settings=list(get_safety_settings(safety_mode)))
+
+
+async def _prepare(
     messages: List[Dict[str, Any]],
-    temperature: float | None = 1.0,
-    max_tokens: int | None = None,
-    force_json: bool = False,
-) -> Tuple[str, int | None]:
+    temperature: float | None,
+    max_tokens: int | None,
+    force_json: bool,
+    model: str,
+    safety_mode: str | None,
+) -> Tuple[genai.GenerativeModel, str, Dict[str, Any]]:
     if not get_client():
         raise RuntimeError("GEMINI_API_KEY not configured")
     # Flatten messages to a single prompt; prefer system then user/assistant order
@@ -34,40 +62,41 @@ async def complete_chat_gemini(
     if force_json:
         generation_config["response_mime_type"] = "application/json"
 
-    # Safety from config
-    cfg = await get_ai_config_dict()
-    safety_mode = (cfg.get('gemini_safety') or settings.GEMINI_SAFETY or 'low').lower()
-    threshold = 'BLOCK_ONLY_HIGH' if safety_mode == 'low' else ('BLOCK_NONE' if safety_mode == 'none' else 'BLOCK_MEDIUM_AND_ABOVE')
-    safety_settings = [
-        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": threshold},
-        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": threshold},
-        {"category": "HARM_CATEGORY_SEXUAL", "threshold": threshold},
-        {"category": "HARM_CATEGORY_DANGEROUS", "threshold": threshold},
-    ]
-
-    model_obj = genai.GenerativeModel(model)
+    # Safety from config (callers that already hold the config pass it in)
+    if safety_mode is None:
+        cfg = await get_ai_config_dict()
+        safety_mode = cfg.get('gemini_safety')
+    safety_mode = (safety_mode or settings.GEMINI_SAFETY or 'low').lower()
+    return get_model(model, safety_mode), prompt, generation_config
+
+
+async def _generate(model_obj: genai.GenerativeModel, prompt: str, generation_config: Dict[str, Any], stream: bool = False):
     try:
-        resp = model_obj.generate_content(prompt, generation_config=generation_config or None, safety_settings=safety_settings)
+        return await model_obj.generate_content_async(prompt, generation_config=generation_config or None, stream=stream)
     except Exception as e:
-        # Retry without unsupported params
+        # Retry once without unsupported params; anything else is final
         s = str(e)
+        if "temperature" not in s and "max_output_tokens" not in s:
+            raise
         if "temperature" in s:
             generation_config.pop("temperature", None)
         if "max_output_tokens" in s:
             generation_config.pop("max_output_tokens", None)
-        resp = model_obj.generate_content(prompt, generation_config=generation_config or None, safety_settings=safety_settings)
+        return await model_obj.generate_content_async(prompt, generation_config=generation_config or None, stream=stream)
+
 
-    # Extract usage
-    total_tokens = None
+def _total_tokens(resp) -> int | None:
     try:
         usage = getattr(resp, 'usage_metadata', None)
         if usage and getattr(usage, 'total_token_count', None) is not None:
-            total_tokens = int(usage.total_token_count)
+            return int(usage.total_token_count)
     except Exception:
-        total_tokens = None
+        return None
+    return None
 
+
+def _extract_text(resp) -> str:
     # Extract text strictly from candidates/parts (never access resp.text)
-    text = ''
     try:
         cands = getattr(resp, 'candidates', None) or []
         for c in cands:
@@ -79,33 +108,77 @@ async def complete_chat_gemini(
                 if t:
                     collected.append(t)
             if collected:
-                text = ''.join(collected).strip()
-                if text:
-                    break
+                text = ''.join(collected)
+                if text.strip():
+                    return text
     except Exception:
-        text = ''
+        return ''
+    return ''
 
-    if not text:
-        # Determine block/no-content reason
+
+def _policy_block(resp) -> RuntimeError:
+    # Determine block/no-content reason
+    reason = None
+    try:
+        pf = getattr(resp, 'prompt_feedback', None)
+        if pf and getattr(pf, 'block_reason', None):
+            reason = f"blocked: {pf.block_reason}"
+            ratings = getattr(pf, 'safety_ratings', None) or []
+            details = []
+            for r in ratings:
+                try:
+                    if getattr(r, 'blocked', False):
+                        details.append(f"{getattr(r, 'category', 'harm')}: {getattr(r, 'probability', '')}")
+                except Exception:
+                    continue
+            if details:
+                reason += " (" + ", ".join(details) + ")"
+    except Exception:
         reason = None
-        try:
-            pf = getattr(resp, 'prompt_feedback', None)
-            if pf and getattr(pf, 'block_reason', None):
-                reason = f"blocked: {pf.block_reason}"
-                ratings = getattr(pf, 'safety_ratings', None) or []
-                details = []
-                for r in ratings:
-                    try:
-                        if getattr(r, 'blocked', False):
-                            details.append(f"{getattr(r, 'category', 'harm')}: {getattr(r, 'probability', '')}")
-                    except Exception:
-                        continue
-                if details:
-                    reason += " (" + ", ".join(details) + ")"
-        except Exception:
-            reason = None
-        if not reason:
-            reason = "no candidates returned"
-        raise RuntimeError(f"policy_block: {reason}")
-
-    return text, total_tokens
+    if not reason:
+        reason = "no candidates returned"
+    return RuntimeError(f"policy_block: {reason}")
+
+
+async def complete_chat_gemini(
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = 1.0,
+    max_tokens: int | None = None,
+    force_json: bool = False,
+    safety_mode: str | None = None,
+) -> Tuple[str, int | None]:
+    model_obj, prompt, generation_config = await _prepare(messages, temperature, max_tokens, force_json, model, safety_mode)
+    resp = await _generate(model_obj, prompt, generation_config)
+    text = _extract_text(resp).strip()
+    if not text:
+        raise _policy_block(resp)
+    return text, _total_tokens(resp)
+
+
+async def stream_chat_gemini(
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = 1.0,
+    max_tokens: int | None = None,
+    safety_mode: str | None = None,
+    usage: Dict[str, Any] | None = None,
+) -> AsyncIterator[str]:
+    """Stream text chunks. Sets usage['total_tokens'] when the stream ends."""
+    model_obj, prompt, generation_config = await _prepare(messages, temperature, max_tokens, False, model, safety_mode)
+    resp = await _generate(model_obj, prompt, generation_config, stream=True)
+    produced = False
+    last = None
+    async for chunk in resp:
+        last = chunk
+        text = _extract_text(chunk)
+        if text:
+            produced = True
+            yield text
+    total = _total_tokens(last) if last is not None else None
+    if usage is not None and total is not None:
+        usage["total_tokens"] = total
+    if not produced:
+        raise _policy_block(last)
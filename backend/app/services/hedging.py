@@ -0,0 +1,102 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple, TypeVar
+from loguru import logger
+from app.settings import settings
+from app.services.rate_limit import is_transient
+
+
+T = TypeVar("T")
+Call = Callable[[], Awaitable[T]]
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per (provider, purpose)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def record(self, provider: str, purpose: str, seconds: float):
+        self._samples.setdefault((provider, purpose), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, provider: str, purpose: str, q: float) -> float | None:
+        samples = sorted(self._samples.get((provider, purpose)) or [])
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[idx]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        out = []
+        for (provider, purpose), samples in self._samples.items():
+            out.append({
+                "provider": provider,
+                "purpose": purpose,
+                "samples": len(samples),
+                "p50_s": round(self.percentile(provider, purpose, 0.5) or 0.0, 3),
+                "p95_s": round(self.percentile(provider, purpose, 0.95) or 0.0, 3),
+            })
+        return out
+
+
+latency = LatencyTracker()
+
+
+def hedge_budget(provider: str, purpose: str) -> float:
+    """Seconds to wait on the primary before hedging.
+
+    Starts from the static per-purpose budget; once enough samples exist it adapts to the
+    primary's observed p95, clamped to [0.5x, 2x] of the static budget.
+    """
+    static = settings.AI_HEDGE_BUDGET_WRITER if purpose == 'writer' else settings.AI_HEDGE_BUDGET_SMALL
+    samples = latency._samples.get((provider, purpose)) or ()
+    if len(samples) < settings.AI_HEDGE_MIN_SAMPLES:
+        return static
+    p95 = latency.percentile(provider, purpose, 0.95) or static
+    return min(static * 2, max(static * 0.5, p95 * 1.1))
+
+
+async def hedged(primary: Call[T], secondary: Call[T] | None, budget: float, *, label: str = "") -> T:
+    """Run `primary`; if it hasn't answered within `budget` seconds or fails transiently,
+    also run `secondary`. The first successful answer wins and the other call is cancelled;
+    its result is returned unchanged, so callers that need to know which call answered
+    include that in the result. Non-transient primary errors (config, policy) are raised
+    without hedging.
+    """
+    primary_task = asyncio.ensure_future(primary())
+    tasks = [primary_task]
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=budget)
+        if done:
+            err = primary_task.exception()
+            if err is None:
+                return primary_task.result()
+            if secondary is None or not is_transient(err):
+                raise err
+            logger.warning("Primary LLM failed for {} ({}); failing over", label, err)
+        elif secondary is None:
+            return await primary_task
+        else:
+            logger.info("Primary LLM slower than {:.1f}s for {}; hedging", budget, label)
+
+        secondary_task = asyncio.ensure_future(secondary())
+        tasks.append(secondary_task)
+        pending = {t for t in (primary_task, secondary_task) if not t.done()}
+        first_err: BaseException | None = primary_task.exception() if primary_task.done() else None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                err = t.exception()
+                if err is None:
+                    for other in pending:
+                        other.cancel()
+                    return t.result()
+                first_err = first_err or err
+        raise first_err  # type: ignore[misc]
+    except BaseException:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+        raise
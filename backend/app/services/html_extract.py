@@ -0,0 +1,70 @@
+from __future__ import annotations
+import asyncio
+import importlib.util
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from bs4 import SoupStrainer
+from app.settings import settings
+
+
+# lxml is much faster than the stdlib parser; used automatically when installed
+PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+# Only these subtrees of a product page are ever read by specs.parse_coupang_product_html
+_PRODUCT_IDS = {"productTitle"}
+_PRODUCT_CLASSES = {
+    "prod-buy-header__title",
+    "total-price",
+    "prod-sale-price",
+    "prod-description-attribute",
+    "prod-attr-list",
+    "prod-feature",
+    "prod-image__detail",
+    "prod-image__items",
+    "prod-description-table",
+}
+_PRODUCT_TAGS = {"title", "table", "img"}
+
+
+def _is_product_part(name: str, attrs: dict) -> bool:
+    if name in _PRODUCT_TAGS:
+        return True
+    if attrs.get("id") in _PRODUCT_IDS:
+        return True
+    classes = attrs.get("class") or ()
+    if isinstance(classes, str):
+        classes = classes.split()
+    return any(c in _PRODUCT_CLASSES for c in classes)
+
+
+PRODUCT_PAGE_STRAINER = SoupStrainer(_is_product_part)
+SEARCH_LINK_STRAINER = SoupStrainer("a")
+
+_executor: Executor | None = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = max(1, settings.HTML_PARSE_WORKERS)
+        if settings.HTML_PARSE_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parse")
+    return _executor
+
+
+async def run_parser(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a CPU-bound parse function off the event loop (HTML_PARSE_EXECUTOR pool).
+
+    With the process pool, `fn` must be a picklable module-level function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+def shutdown_parsers():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
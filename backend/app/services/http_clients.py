@@ -0,0 +1,56 @@
+from __future__ import annotations
+import importlib.util
+from typing import Dict
+import httpx
+from loguru import logger
+from app.settings import settings
+
+
+# One pooled client per upstream, so connection limits apply per host group
+# and keep-alive connections are reused across requests.
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build(name: str) -> httpx.AsyncClient:
+    max_conns = settings.HTTP_COUPANG_MAX_CONNECTIONS if name == "coupang" else settings.HTTP_MAX_CONNECTIONS
+    http2 = settings.HTTP2 and _http2_available()
+    if settings.HTTP2 and not http2:
+        logger.warning("HTTP2 requested but 'h2' is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=http2,
+        follow_redirects=(name == "coupang"),
+        limits=httpx.Limits(
+            max_connections=max_conns,
+            max_keepalive_connections=max_conns,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+    )
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Application-lifetime client for an upstream ('coupang' | 'naver').
+
+    Created lazily if startup hasn't run (scripts, tests); closed by close_http_clients().
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _build(name)
+        _clients[name] = client
+    return client
+
+
+async def init_http_clients():
+    for name in ("coupang", "naver"):
+        get_http_client(name)
+
+
+async def close_http_clients():
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
@@ -13,19 +13,29 @@ REPAIR_SYSTEM = (
     "- 항목 수: 5~12개. 불분명하면 최대한 합리적으로 채움.\n"
 )
 
+REPAIR_RESULTS_SYSTEM = (
+    "역할: JSON 데이터 정제기. 입력 텍스트에서 검색어별 제품 후보 목록을 추출해 올바른 JSON으로 변환.\n"
+    "규칙:\n"
+    "- 출력은 '반드시' JSON만. 코드블록/설명/주석 금지.\n"
+    "- 최종 형식: {\"results\":[{\"keyword\":\"<입력에 있던 검색어 그대로>\",\"items\":[..]}, ..]} 객체 하나.\n"
+    "- 각 item 키: title_guess, brand, model, price_band, why, image_hint, coupang_url. 값은 문자열 또는 null.\n"
+    "- 입력에 없는 검색어나 항목을 지어내지 말 것.\n"
+)
+
 
-async def attempt_repair_to_items_array(raw_text: str) -> str:
-    """Ask the model to convert arbitrary text into a strict JSON array/object with items.
+async def attempt_repair_to_items_array(raw_text: str, system: str = REPAIR_SYSTEM, max_tokens: int = 1200) -> str:
+    """Ask the model to convert arbitrary text into a strict JSON array/object with items
+    (or, with system=REPAIR_RESULTS_SYSTEM, the packed {"results": [...]} shape).
     Returns JSON string (or empty string if still impossible).
     """
     try:
         text, _ = await complete_chat(
             messages=[
-                {"role": "system", "content": REPAIR_SYSTEM},
+                {"role": "system", "content": system},
                 {"role": "user", "content": f"다음 텍스트를 요구 포맷의 JSON으로 변환:\n\n{raw_text}\n\n출력은 JSON만."},
             ],
             temperature=0.0,
-            max_tokens=1200,
+            max_tokens=max_tokens,
             purpose='small',
             force_json=True,
         )
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Dict, List, Tuple
+from loguru import logger
+from sqlalchemy import select, delete, func, update, bindparam
+from app.db import AsyncSessionLocal, ReadSessionLocal
+from app.models import LLMCacheEntry
+from app.settings import settings
+
+
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+# hits counted in memory, by key: [count, last used]; written by flush_hits() so lookups stay
+# read-only
+_pending_hits: Dict[str, List[Any]] = {}
+
+
+def cache_key(*, provider: str, model: str, messages: List[Dict[str, Any]], temperature: float | None, force_json: bool) -> str:
+    payload = json.dumps(
+        {"provider": provider, "model": model, "messages": messages, "temperature": temperature, "force_json": force_json},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def should_cache(purpose: str, temperature: float | None) -> bool:
+    """Per-purpose policy: writer output is never cached; small calls only at low temperature."""
+    if not settings.LLM_CACHE_ENABLED:
+        return False
+    if purpose != 'small':
+        return False
+    return temperature is not None and temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+
+
+async def get_cached(key: str) -> Tuple[str, int | None] | None:
+    now = dt.datetime.utcnow()
+    async with ReadSessionLocal() as session:
+        row = (await session.execute(
+            select(LLMCacheEntry.response, LLMCacheEntry.total_tokens, LLMCacheEntry.created_at).where(LLMCacheEntry.key == key)
+        )).first()
+    if not row or row.created_at < now - dt.timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS):
+        _stats["misses"] += 1
+        return None
+    acc = _pending_hits.setdefault(key, [0, now])
+    acc[0] += 1
+    acc[1] = now
+    _stats["hits"] += 1
+    return row.response, row.total_tokens
+
+
+async def _write_hits(session, batch: Dict[str, List[Any]]):
+    if not batch:
+        return
+    stmt = (
+        update(LLMCacheEntry.__table__)
+        .where(LLMCacheEntry.__table__.c.key == bindparam("k"))
+        .values(hits=func.coalesce(LLMCacheEntry.__table__.c.hits, 0) + bindparam("n"), last_used_at=bindparam("t"))
+    )
+    await session.execute(stmt, [{"k": k, "n": n, "t": t} for k, (n, t) in batch.items()])
+
+
+def _take_hits() -> Dict[str, List[Any]]:
+    global _pending_hits
+    batch, _pending_hits = _pending_hits, {}
+    return batch
+
+
+def _restore_hits(batch: Dict[str, List[Any]]):
+    for k, (n, t) in batch.items():
+        acc = _pending_hits.setdefault(k, [0, t])
+        acc[0] += n
+        acc[1] = max(acc[1], t)
+
+
+async def flush_hits() -> int:
+    """Write the counted hits in one executemany UPDATE; runs every LLM_CACHE_HIT_FLUSH_INTERVAL
+    seconds, before LRU trimming and at shutdown."""
+    batch = _take_hits()
+    if not batch:
+        return 0
+    try:
+        async with AsyncSessionLocal() as session:
+            await _write_hits(session, batch)
+            await session.commit()
+    except Exception as e:
+        logger.warning("LLM cache hit flush failed, will retry: {}", e)
+        _restore_hits(batch)
+        return 0
+    return len(batch)
+
+
+async def put_cached(key: str, *, provider: str, model: str, response: str, total_tokens: int | None):
+    now = dt.datetime.utcnow()
+    # trimming goes by last_used_at, so the hits counted so far are written in the same transaction
+    hits = _take_hits()
+    try:
+        evicted = await _store_and_trim(key, now, hits, provider=provider, model=model, response=response, total_tokens=total_tokens)
+    except BaseException:
+        _restore_hits(hits)
+        raise
+    _stats["stores"] += 1
+    _stats["evictions"] += evicted
+
+
+async def _store_and_trim(key: str, now: dt.datetime, hits: Dict[str, List[Any]], *, provider: str, model: str, response: str, total_tokens: int | None) -> int:
+    async with AsyncSessionLocal() as session:
+        row = await session.get(LLMCacheEntry, key)
+        if row:
+            row.response = response
+            row.total_tokens = total_tokens
+            row.created_at = now
+            row.last_used_at = now
+        else:
+            session.add(LLMCacheEntry(key=key, provider=provider, model=model, response=response, total_tokens=total_tokens, hits=0, created_at=now, last_used_at=now))
+        await _write_hits(session, hits)
+        await session.flush()
+        # expired rows first, then least-recently-used beyond the size cap
+        expired = await session.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.created_at < now - dt.timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS))
+        )
+        evicted = expired.rowcount or 0
+        count = (await session.execute(select(func.count()).select_from(LLMCacheEntry))).scalar() or 0
+        overflow = count - settings.LLM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            oldest = select(LLMCacheEntry.key).order_by(LLMCacheEntry.last_used_at.asc()).limit(overflow)
+            res = await session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest)))
+            evicted += res.rowcount or 0
+        await session.commit()
+    return evicted
+
+
+async def cache_stats() -> Dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        entries = (await session.execute(select(func.count()).select_from(LLMCacheEntry))).scalar() or 0
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        "enabled": settings.LLM_CACHE_ENABLED,
+        "entries": entries,
+        **_stats,
+        "pending_hits": sum(n for n, _ in _pending_hits.values()),
+        "hit_rate": (_stats["hits"] / lookups) if lookups else None,
+    }
+
+
+async def purge_cache() -> int:
+    _pending_hits.clear()
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(delete(LLMCacheEntry))
+        await session.commit()
+    return res.rowcount or 0
@@ -0,0 +1,237 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List
+from loguru import logger
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import AsyncSessionLocal, engine
+from app.services import rollups
+from app.settings import settings
+
+
+# Admin purges run as background jobs, one at a time: rows go in chunks of MAINTENANCE_CHUNK_ROWS,
+# each chunk in its own short transaction, so drafts and the scheduler only ever wait for one chunk.
+# Jobs live in memory; a restart forgets them (finished chunks stay deleted).
+
+_KEEP_JOBS = 20
+_ids = itertools.count(1)
+_jobs: "OrderedDict[int, Job]" = OrderedDict()
+_run_lock = asyncio.Lock()
+
+_UNREFERENCED_HTML = "NOT EXISTS (SELECT 1 FROM affiliate_map WHERE affiliate_map.html_hash = affiliate_html.hash)"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = next(_ids)
+        self.kind = kind
+        self.params = params
+        self.status = "queued"  # queued | running | done | cancelled | failed
+        self.stage: str | None = None
+        self.deleted: Dict[str, int] = {}
+        self.vacuum: Dict[str, Any] | None = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.cancel_requested = False
+        self.task: asyncio.Task | None = None
+
+    def check_cancel(self):
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stage": self.stage,
+            "deleted": dict(self.deleted),
+            "vacuum": self.vacuum,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _id_list(ids: List[int]) -> str:
+    return ",".join(str(int(i)) for i in ids)
+
+
+async def _delete_chunks(
+    job: Job,
+    table: str,
+    select_ids: str,
+    params: Dict[str, Any] | None = None,
+    before: Callable[[AsyncSession, str], Awaitable[None]] | None = None,
+    key: str = "id",
+    recheck: str = "",
+):
+    """Delete the rows of `table` whose `key` values `select_ids` returns, CHUNK rows per transaction.
+
+    `select_ids` is a SELECT of keys (without LIMIT) that should use an index; `before` runs in the
+    same transaction with the chunk's id list, e.g. to keep rollups in step with the delete.
+    `recheck` is an SQL condition repeated in the DELETE itself, for rows that may stop qualifying
+    between the SELECT and the DELETE.
+    """
+    job.stage = table
+    job.deleted.setdefault(table, 0)
+    limit = max(1, int(settings.MAINTENANCE_CHUNK_ROWS))
+    while True:
+        job.check_cancel()
+        async with AsyncSessionLocal() as session:
+            ids = list((await session.execute(text(f"{select_ids} LIMIT {limit}"), params or {})).scalars())
+            if not ids:
+                return
+            extra = f" AND {recheck}" if recheck else ""
+            if key == "id":
+                id_list = _id_list(ids)
+                if before:
+                    await before(session, id_list)
+                res = await session.execute(text(f"DELETE FROM {table} WHERE id IN ({id_list}){extra}"))
+            else:
+                res = await session.execute(
+                    text(f"DELETE FROM {table} WHERE {key} IN :keys{extra}").bindparams(bindparam("keys", expanding=True)), {"keys": ids}
+                )
+            await session.commit()
+        job.deleted[table] += res.rowcount or 0
+        # give queued writers a turn before taking the lock again
+        await asyncio.sleep(settings.MAINTENANCE_PAUSE)
+
+
+async def _posts_deleted(session: AsyncSession, id_list: str):
+    await rollups.posts_deleted(session, f"WHERE id IN ({id_list})")
+
+
+async def _purge_keywords(job: Job, date: str | None):
+    # children first, so a cancelled purge never leaves rows pointing at deleted keywords
+    if date:
+        p = {"d": date}
+        kw_ids = "SELECT id FROM keyword WHERE date_range = :d"
+        await _delete_chunks(job, "affiliate_map", (
+            "SELECT am.id FROM affiliate_map am JOIN product_candidate pc ON pc.id = am.product_candidate_id "
+            f"WHERE pc.keyword_id IN ({kw_ids})"
+        ), p)
+        await _delete_chunks(job, "post", f"SELECT id FROM post WHERE keyword_id IN ({kw_ids})", p, before=_posts_deleted)
+        await _delete_chunks(job, "product_candidate", f"SELECT id FROM product_candidate WHERE keyword_id IN ({kw_ids})", p)
+        await _delete_chunks(job, "keyword", kw_ids, p)
+    else:
+        await _delete_chunks(job, "affiliate_map", "SELECT id FROM affiliate_map")
+        await _delete_chunks(job, "post", "SELECT id FROM post", before=_posts_deleted)
+        await _delete_chunks(job, "product_candidate", "SELECT id FROM product_candidate")
+        await _delete_chunks(job, "keyword", "SELECT id FROM keyword")
+    # affiliate snippets no map refers to any more; the DELETE checks again, since a map may have
+    # been stored for the same content since the SELECT (writes are serialized, so it has committed)
+    await _delete_chunks(job, "affiliate_html", f"SELECT hash FROM affiliate_html WHERE {_UNREFERENCED_HTML}", key="hash", recheck=_UNREFERENCED_HTML)
+
+
+async def _dedup_keywords(job: Job, date: str):
+    # keep the latest row per text for the date
+    await _delete_chunks(job, "keyword", (
+        "SELECT id FROM keyword WHERE date_range = :d AND id NOT IN ("
+        "  SELECT MAX(id) FROM keyword WHERE date_range = :d GROUP BY text)"
+    ), {"d": date})
+
+
+async def _incremental_vacuum(job: Job):
+    """Return free pages to the filesystem in small steps. Only databases created with
+    auto_vacuum=INCREMENTAL (SQLITE_AUTO_VACUUM) support it; a full VACUUM would lock the
+    whole file, so it is never run from here."""
+    job.stage = "vacuum"
+    async with engine.connect() as conn:
+        mode = (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar()
+        free = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar() or 0
+    if mode != 2:
+        job.vacuum = {"skipped": "auto_vacuum is not INCREMENTAL for this database", "free_pages": free}
+        return
+    released = 0
+    while free > 0:
+        job.check_cancel()
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(settings.MAINTENANCE_VACUUM_PAGES)})")
+            left = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar() or 0
+        if left >= free:
+            break
+        released += free - left
+        free = left
+        job.vacuum = {"released_pages": released, "free_pages": free}
+        await asyncio.sleep(settings.MAINTENANCE_PAUSE)
+    job.vacuum = {"released_pages": released, "free_pages": free}
+
+
+async def _run(job: Job, work: Callable[[], Awaitable[None]], vacuum: bool):
+    async with _run_lock:
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.status = "running"
+        logger.info("Maintenance job {} ({}) started: {}", job.id, job.kind, job.params)
+        try:
+            await work()
+            if vacuum:
+                await _incremental_vacuum(job)
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.exception("Maintenance job {} failed", job.id)
+            job.status = "failed"
+            job.error = str(e)
+        job.stage = None
+        job.finished_at = time.time()
+        logger.info("Maintenance job {} {}: deleted {}", job.id, job.status, job.deleted)
+
+
+def _start(kind: str, params: Dict[str, Any], work: Callable[[Job], Awaitable[None]], vacuum: bool) -> Job:
+    job = Job(kind, {**params, "vacuum": vacuum})
+    _jobs[job.id] = job
+    while len(_jobs) > _KEEP_JOBS:
+        oldest = next(iter(_jobs.values()))
+        if oldest.status in ("queued", "running"):
+            break
+        _jobs.popitem(last=False)
+    job.task = asyncio.create_task(_run(job, lambda: work(job), vacuum))
+    return job
+
+
+def start_purge_keywords(date: str | None, vacuum: bool = False) -> Job:
+    """Delete keywords (for `date`, or all) with their candidates, affiliate maps and posts."""
+    return _start("purge_keywords", {"date": date}, lambda job: _purge_keywords(job, date), vacuum)
+
+
+def start_dedup_keywords(date: str, vacuum: bool = False) -> Job:
+    return _start("dedup_keywords", {"date": date}, lambda job: _dedup_keywords(job, date), vacuum)
+
+
+def get_job(job_id: int) -> Job | None:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[Dict[str, Any]]:
+    return [j.to_dict() for j in reversed(_jobs.values())]
+
+
+def cancel_job(job_id: int) -> Job | None:
+    """Ask a job to stop after its current chunk; chunks already committed stay deleted."""
+    job = _jobs.get(job_id)
+    if job and job.status in ("queued", "running"):
+        job.cancel_requested = True
+    return job
+
+
+async def shutdown_jobs():
+    for job in list(_jobs.values()):
+        if job.task and not job.task.done():
+            job.cancel_requested = True
+    pending = [j.task for j in _jobs.values() if j.task and not j.task.done()]
+    if pending:
+        await asyncio.wait(pending, timeout=10)
@@ -1,18 +1,45 @@
-from sqlalchemy import text
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from loguru import logger
 from app.db import engine
 
 
-async def ensure_affiliate_html_column():
-    async with engine.begin() as conn:
-        res = await conn.exec_driver_sql("PRAGMA table_info('affiliate_map')")
-        cols = [row[1] for row in res.fetchall()]
-        if 'affiliate_html' not in cols:
-            await conn.exec_driver_sql("ALTER TABLE affiliate_map ADD COLUMN affiliate_html TEXT")
+SCRIPT_LOCATION = str(Path(__file__).resolve().parent.parent / "alembic")
+
+
+def _config() -> Config:
+    cfg = Config()
+    cfg.set_main_option("script_location", SCRIPT_LOCATION)
+    return cfg
+
+
+def head_revision() -> str | None:
+    return ScriptDirectory.from_config(_config()).get_current_head()
+
+
+async def current_revision() -> str | None:
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda c: MigrationContext.configure(c).get_current_revision())
+
+
+async def run_migrations():
+    """Bring the schema to the latest alembic revision (app/alembic/versions).
+
+    A database already at head costs one read of the alembic_version row.
+    """
+    head = head_revision()
+    current = await current_revision()
+    if current == head:
+        return
+    logger.info("Migrating database schema {} → {}", current or "(empty)", head)
 
+    def upgrade(sync_conn):
+        cfg = _config()
+        cfg.attributes["connection"] = sync_conn
+        command.upgrade(cfg, "head")
 
-async def ensure_post_meta_json_column():
     async with engine.begin() as conn:
-        res = await conn.exec_driver_sql("PRAGMA table_info('post')")
-        cols = [row[1] for row in res.fetchall()]
-        if 'meta_json' not in cols:
-            await conn.exec_driver_sql("ALTER TABLE post ADD COLUMN meta_json TEXT")
+        await conn.run_sync(upgrade)
@@ -2,12 +2,12 @@ import os
 import time
 import json
 import datetime as dt
-import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.settings import settings
 from app.db import AsyncSessionLocal
 from app.models import NaverToken
+from app.services.http_clients import get_http_client
 
 
 AUTH_BASE = "https://nid.naver.com/oauth2.0"
@@ -27,17 +27,17 @@ def naver_login_url() -> str:
 async def handle_callback(code: str | None, state: str | None) -> bool:
     if not code:
         return False
-    async with httpx.AsyncClient(timeout=20) as client:
-        res = await client.get(
-            f"{AUTH_BASE}/token",
-            params={
-                "grant_type": "authorization_code",
-                "client_id": settings.NAVER_CLIENT_ID,
-                "client_secret": settings.NAVER_CLIENT_SECRET,
-                "code": code,
-                "state": state or "",
-            },
-        )
+    res = await get_http_client("naver").get(
+        f"{AUTH_BASE}/token",
+        params={
+            "grant_type": "authorization_code",
+            "client_id": settings.NAVER_CLIENT_ID,
+            "client_secret": settings.NAVER_CLIENT_SECRET,
+            "code": code,
+            "state": state or "",
+        },
+        timeout=20,
+    )
     if res.status_code != 200:
         return False
     data = res.json()
@@ -69,16 +69,16 @@ async def publish_blog_post(title: str, content: str) -> str | None:
     if not tok or not tok.access_token:
         return None
     headers = {"Authorization": f"Bearer {tok.access_token}"}
-    async with httpx.AsyncClient(timeout=30) as client:
-        res = await client.post(
-            f"{API_BASE}/blog/writePost.json",
-            headers=headers,
-            data={
-                "title": title,
-                "contents": content,
-                "blogId": settings.NAVER_BLOG_ID or "",
-            },
-        )
+    res = await get_http_client("naver").post(
+        f"{API_BASE}/blog/writePost.json",
+        headers=headers,
+        data={
+            "title": title,
+            "contents": content,
+            "blogId": settings.NAVER_BLOG_ID or "",
+        },
+        timeout=30,
+    )
     if res.status_code != 200:
         return None
     data = res.json()
@@ -1,40 +1,56 @@
 from app.settings import settings
-from openai import OpenAI
-from typing import Any, Dict, List, Tuple
+from openai import AsyncOpenAI
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 
-def get_client() -> OpenAI | None:
+_client: AsyncOpenAI | None = None
+_client_key: str | None = None
+
+
+def get_client() -> AsyncOpenAI | None:
+    """Return the process-wide AsyncOpenAI client (one pooled httpx client underneath).
+
+    Rebuilt only when the configured API key changes.
+    """
+    global _client, _client_key
     if not settings.OPENAI_API_KEY:
         return None
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
+    if _client is None or _client_key != settings.OPENAI_API_KEY:
+        # retries/backoff are handled by rate_limit.LLMGovernor
+        _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        _client_key = settings.OPENAI_API_KEY
+    return _client
+
+
+async def close_client():
+    global _client, _client_key
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _client_key = None
 
 
-def complete_chat(
+async def _create_with_fallbacks(
+    client: AsyncOpenAI,
     *,
-    model: str,
-    messages: List[Dict[str, Any]],
-    temperature: float | None = 1.0,
-    max_tokens: int | None = None,
-    force_json: bool = False,
-) -> Tuple[str, int | None]:
-    """Create a chat completion, adapting to models that reject some params.
+    temperature: float | None,
+    max_tokens: int | None,
+    force_json: bool,
+    **base: Any,
+):
+    """Call chat.completions.create, dropping params the model rejects.
 
     - If max_tokens is unsupported → retry without it.
     - If temperature != 1 is unsupported → retry without temperature (defaults to model's).
-
-    Returns (text, total_tokens). Raises on final failure.
+    - If json mode is rejected → retry without response_format.
     """
-    client = get_client()
-    if not client:
-        raise RuntimeError("OPENAI_API_KEY not configured")
-
     allow_max = max_tokens is not None
     allow_temp = temperature is not None
 
     last_err: Exception | None = None
     for _ in range(3):
         try:
-            kwargs: Dict[str, Any] = dict(model=model, messages=messages)
+            kwargs: Dict[str, Any] = dict(base)
             if allow_temp and temperature is not None:
                 kwargs["temperature"] = temperature
             if allow_max and max_tokens is not None:
@@ -42,10 +58,7 @@ def complete_chat(
             if force_json:
                 # prefer strict json mode if supported
                 kwargs["response_format"] = {"type": "json_object"}
-            resp = client.chat.completions.create(**kwargs)
-            text = (resp.choices[0].message.content or "").strip()
-            total = int(getattr(resp, "usage", None).total_tokens) if getattr(resp, "usage", None) else None
-            return text, total
+            return await client.chat.completions.create(**kwargs)
         except Exception as e:
             s = str(e)
             last_err = e
@@ -62,3 +75,51 @@ def complete_chat(
             break
     # If we reach here, all retries failed
     raise last_err if last_err else RuntimeError("OpenAI completion failed")
+
+
+async def complete_chat(
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = 1.0,
+    max_tokens: int | None = None,
+    force_json: bool = False,
+) -> Tuple[str, int | None]:
+    """Create a chat completion, adapting to models that reject some params.
+
+    Returns (text, total_tokens). Raises on final failure.
+    """
+    client = get_client()
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    resp = await _create_with_fallbacks(
+        client, model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, force_json=force_json,
+    )
+    text = (resp.choices[0].message.content or "").strip()
+    total = int(getattr(resp, "usage", None).total_tokens) if getattr(resp, "usage", None) else None
+    return text, total
+
+
+async def stream_chat(
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float | None = 1.0,
+    max_tokens: int | None = None,
+    usage: Dict[str, Any] | None = None,
+) -> AsyncIterator[str]:
+    """Stream a chat completion as text deltas. Sets usage['total_tokens'] when the stream ends."""
+    client = get_client()
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    stream = await _create_with_fallbacks(
+        client, model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, force_json=False,
+        stream=True, stream_options={"include_usage": True},
+    )
+    async for event in stream:
+        if event.choices:
+            delta = event.choices[0].delta.content
+            if delta:
+                yield delta
+        if getattr(event, "usage", None) and usage is not None:
+            usage["total_tokens"] = int(event.usage.total_tokens)
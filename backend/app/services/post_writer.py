@@ -1,8 +1,6 @@
 import random
 from app.settings import settings
-from app.services.ai_client import complete_chat
-from app.db import AsyncSessionLocal
-from app.services.budget import add_usage
+from app.services.ai_client import complete_chat, stream_chat
 from app.models import ProductCandidate
 from app.utils.errors import AIError
 from app.services.prompts import WRITER_SYSTEM, build_user_prompt
@@ -88,10 +86,7 @@ def _needs_alignment(text: str, enforce_name: str | None, allowed_names: list[st
     return False
 
 
-async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affiliate_url: str, affiliate_html: str | None = None, template_type: str = "A", template_input: dict | None = None):
-    # provider resolved in ai_client
-    template_id = random.choice(["A", "B", "C"])
-
+def _writer_messages(keyword: str, candidate: ProductCandidate, affiliate_url: str, template_type: str, template_input: dict | None) -> list[dict]:
     data = {
         "keyword": keyword,
         "product_name": f"{candidate.brand or ''} {candidate.model or ''}".strip() or candidate.title_guess,
@@ -101,30 +96,28 @@ async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affi
     if template_input:
         data.update(template_input)
     user = build_user_prompt(template_type, data)
+    return [
+        {"role": "system", "content": WRITER_SYSTEM},
+        {"role": "user", "content": user},
+    ]
 
-    try:
-        text, total_tokens = await complete_chat(
-            messages=[
-                {"role": "system", "content": WRITER_SYSTEM},
-                {"role": "user", "content": user},
-            ],
-            temperature=0.8,
-            max_tokens=2000,
-            purpose='writer',
-        )
-    except Exception as e:
-        msg = str(e)
-        if 'not configured' in msg:
-            raise AIError("config_error", msg)
-        if 'policy_block' in msg or 'blocked' in msg:
-            raise AIError("policy_block", msg)
-        raise AIError("network_error", f"AI API request failed: {e}")
-    content = text
+
+def _ai_error(e: Exception) -> AIError:
+    msg = str(e)
+    if 'not configured' in msg:
+        return AIError("config_error", msg)
+    if 'budget_exceeded' in msg:
+        return AIError("budget_exceeded", msg)
+    if 'policy_block' in msg or 'blocked' in msg:
+        return AIError("policy_block", msg)
+    return AIError("network_error", f"AI API request failed: {e}")
+
+
+async def _finish_post(content: str, keyword: str, affiliate_url: str, affiliate_html: str | None, template_input: dict | None, template_id: str):
+    """Disclosure/CTA enforcement, alignment rewrite and title/tag extraction.
+    Token usage is accounted in ai_client."""
     if not content:
         raise AIError("empty_response", "OpenAI returned empty content for post writer")
-    total_tokens = total_tokens or 800
-    async with AsyncSessionLocal() as session:
-        await add_usage(session, total_tokens)
     # enforce disclosure + link once
     content = _ensure_disclosure_and_link(content, affiliate_url)
     # alignment guard: ensure correct product appears, and unrelated tokens removed
@@ -141,7 +134,7 @@ async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affi
             + content
         )
         try:
-            new_text, more_tokens = await complete_chat(
+            new_text, _ = await complete_chat(
                 messages=[
                     {"role": "system", "content": WRITER_SYSTEM},
                     {"role": "user", "content": rev_user},
@@ -152,7 +145,6 @@ async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affi
             )
             if new_text:
                 content = _ensure_disclosure_and_link(new_text, affiliate_url)
-                total_tokens = (total_tokens or 0) + (more_tokens or 0)
         except Exception:
             pass
     # title extraction
@@ -164,3 +156,39 @@ async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affi
     if affiliate_html and (affiliate_html not in content):
         content = content.rstrip() + "\n\n" + affiliate_html + "\n"
     return content, title, tags, images, template_id
+
+
+async def generate_post_markdown(keyword: str, candidate: ProductCandidate, affiliate_url: str, affiliate_html: str | None = None, template_type: str = "A", template_input: dict | None = None):
+    # provider resolved in ai_client
+    template_id = random.choice(["A", "B", "C"])
+    try:
+        text, _ = await complete_chat(
+            messages=_writer_messages(keyword, candidate, affiliate_url, template_type, template_input),
+            temperature=0.8,
+            max_tokens=2000,
+            purpose='writer',
+        )
+    except Exception as e:
+        raise _ai_error(e)
+    return await _finish_post(text, keyword, affiliate_url, affiliate_html, template_input, template_id)
+
+
+async def stream_post_markdown(keyword: str, candidate: ProductCandidate, affiliate_url: str, affiliate_html: str | None = None, template_type: str = "A", template_input: dict | None = None):
+    """Like generate_post_markdown, but yields ("chunk", text) events while the writer model streams,
+    then a single ("result", (content, title, tags, images, template_id)) once post-processing is done.
+    """
+    template_id = random.choice(["A", "B", "C"])
+    parts: list[str] = []
+    try:
+        async for chunk in stream_chat(
+            messages=_writer_messages(keyword, candidate, affiliate_url, template_type, template_input),
+            temperature=0.8,
+            max_tokens=2000,
+            purpose='writer',
+        ):
+            parts.append(chunk)
+            yield "chunk", chunk
+    except Exception as e:
+        raise _ai_error(e)
+    result = await _finish_post("".join(parts).strip(), keyword, affiliate_url, affiliate_html, template_input, template_id)
+    yield "result", result
@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 from slugify import slugify
 from app.settings import settings
 from app.services.ai_client import complete_chat
@@ -7,9 +9,9 @@ from loguru import logger
 from app.utils.errors import AIError
 from app.utils.urls import build_coupang_search_url
 from app.services.coupang import fetch_top_product_url
-from app.services.json_repair import attempt_repair_to_items_array
-from app.db import AsyncSessionLocal
-from app.services.budget import add_usage
+from app.services.crawler import BACKGROUND, INTERACTIVE
+from app.services import catalog
+from app.services.json_repair import REPAIR_RESULTS_SYSTEM, attempt_repair_to_items_array
 
 
 SYSTEM_PROMPT = (
@@ -22,12 +24,101 @@ SYSTEM_PROMPT = (
 )
 
 
-async def recommend_products(keyword: str, dedupe_keys: list[str]) -> list[dict]:
+BULK_SYSTEM_PROMPT = (
+    "당신은 이커머스 MD입니다. 여러 개의 검색어(네이버 이용자 관점)가 주어집니다. 각 검색어마다 쇼핑 의도를 바탕으로, "
+    "쿠팡에서 잘 팔릴 법한 상품 후보를 5~8개 제안하세요.\n"
+    "'반드시' JSON만 출력하세요. 코드블록/설명/주석/앞뒤 텍스트 금지.\n"
+    "출력 형식: {\"results\":[{\"keyword\":\"<입력 검색어 그대로>\",\"items\":[..]}, ..]} 객체 하나. 입력된 모든 검색어를 포함.\n"
+    "각 항목은 {\"title_guess\",\"brand\",\"model\",\"price_band\",\"why\",\"image_hint\",\"coupang_url\"}를 포함.\n"
+    "이미 판매 종결/단종/사기성 제품은 제외. 동일 모델 변형은 1~2개만."
+)
+
+
+def _raise_ai_error(e: Exception):
+    msg = str(e)
+    if 'not configured' in msg:
+        raise AIError("config_error", msg)
+    if 'budget_exceeded' in msg:
+        raise AIError("budget_exceeded", msg)
+    if 'policy_block' in msg or 'blocked' in msg:
+        raise AIError("policy_block", msg)
+    raise AIError("network_error", f"AI API request failed: {e}")
+
+
+# timing for the URL-resolution stage (exposed via /api/diagnostics/url-resolution)
+resolve_stats: dict[str, float] = {"runs": 0, "local": 0, "lookups": 0, "resolved": 0, "fallbacks": 0, "timeouts": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0}
+
+
+async def _resolve_candidate_urls(data: list[dict], keyword: str, priority: int = INTERACTIVE) -> list[dict]:
+    """Fill dedupe_key and coupang_url for each candidate.
+
+    Lookups run concurrently (RESOLVE_CONCURRENCY, paced by the crawl scheduler)
+    under one RESOLVE_DEADLINE for the whole stage; anything unresolved by then falls
+    back to a search URL. The local catalog (CATALOG_LOOKUP) is consulted first and
+    live results are added to it.
+    """
+    started = time.monotonic()
+    sem = asyncio.Semaphore(max(1, settings.RESOLVE_CONCURRENCY))
+
+    async def lookup(query: str) -> str | None:
+        async with sem:
+            try:
+                return await fetch_top_product_url(query, timeout=float(settings.COUPANG_SCRAPE_TIMEOUT), priority=priority)
+            except Exception:
+                return None
+
+    for d in data:
+        d["dedupe_key"] = slugify(f"{d.get('brand','')}-{d.get('model','')}-{keyword}")
+    local: dict[int, str] = {}
+    if settings.CATALOG_LOOKUP:
+        idx = [i for i, d in enumerate(data) if not d.get("coupang_url")]
+        found = await catalog.match_many((data[i].get('brand'), data[i].get('model'), data[i].get('title_guess')) for i in idx)
+        local = {i: url for i, url in zip(idx, found) if url}
+        for i, url in local.items():
+            data[i]["coupang_url"] = url
+        resolve_stats["local"] += len(local)
+    tasks: dict[int, asyncio.Task] = {}
+    for i, d in enumerate(data):
+        if not d.get("coupang_url") and settings.COUPANG_SCRAPE:
+            query = (d.get('brand') or '') + ' ' + (d.get('model') or '')
+            query = query.strip() or (d.get('title_guess') or keyword)
+            tasks[i] = asyncio.ensure_future(lookup(query))
+    if tasks:
+        _, pending = await asyncio.wait(tasks.values(), timeout=settings.RESOLVE_DEADLINE)
+        for t in pending:
+            t.cancel()
+        resolve_stats["timeouts"] += len(pending)
+    found_live: list[dict] = []
+    for i, d in enumerate(data):
+        if d.get("coupang_url"):
+            continue
+        t = tasks.get(i)
+        product_url = t.result() if t is not None and t.done() and not t.cancelled() else None
+        if t is not None:
+            resolve_stats["lookups"] += 1
+            resolve_stats["resolved" if product_url else "fallbacks"] += 1
+        d["coupang_url"] = product_url or build_coupang_search_url(
+            title_guess=d.get('title_guess'), brand=d.get('brand'), model=d.get('model'), keyword=keyword
+        )
+        if product_url:
+            found_live.append({"url": product_url, "title": d.get('title_guess'), "brand": d.get('brand'), "model": d.get('model')})
+    if found_live:
+        await catalog.record_many(found_live, "search")
+    elapsed = time.monotonic() - started
+    resolve_stats["runs"] += 1
+    resolve_stats["total_s"] += elapsed
+    resolve_stats["last_s"] = elapsed
+    resolve_stats["max_s"] = max(resolve_stats["max_s"], elapsed)
+    logger.debug("Resolved {} candidate URLs for '{}' in {:.2f}s", len(tasks), keyword, elapsed)
+    return data
+
+
+async def recommend_products(keyword: str, dedupe_keys: list[str], priority: int = INTERACTIVE) -> list[dict]:
     # provider selection handled in ai_client.complete_chat via config
 
     user_msg = f"키워드: \"{keyword}\"\n내가 이미 올린 상품 dedupe 키 목록: {dedupe_keys}\n가격대 범위: 자유"
     try:
-        text, total_tokens = await complete_chat(
+        text, _ = await complete_chat(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_msg},
@@ -38,19 +129,11 @@ async def recommend_products(keyword: str, dedupe_keys: list[str]) -> list[dict]
             force_json=True,
         )
     except Exception as e:
-        msg = str(e)
         logger.exception("AI completion error in ProductScout")
-        if 'not configured' in msg:
-            raise AIError("config_error", msg)
-        if 'policy_block' in msg or 'blocked' in msg:
-            raise AIError("policy_block", msg)
-        raise AIError("network_error", f"AI API request failed: {e}")
+        _raise_ai_error(e)
     if not text:
         raise AIError("empty_response", "OpenAI returned no content")
     logger.debug("ProductScout raw response (truncated): {}", text[:1200])
-    # budget tracking (approx)
-    async with AsyncSessionLocal() as session:
-        await add_usage(session, total_tokens)
     data = parse_json_array_loose(text) or parse_json_items_or_array(text)
     if not data:
         # Try salvage from truncated JSON first
@@ -70,18 +153,99 @@ async def recommend_products(keyword: str, dedupe_keys: list[str]) -> list[dict]
         if not data:
             logger.error("JSON repair failed. Sample: {}", (text or "")[:300])
             raise AIError("parse_error", "Model did not return a valid JSON array/object with items as instructed")
-    for d in data:
-        d["dedupe_key"] = slugify(f"{d.get('brand','')}-{d.get('model','')}-{keyword}")
-        if not d.get("coupang_url"):
-            query = (d.get('brand') or '') + ' ' + (d.get('model') or '')
-            query = query.strip() or (d.get('title_guess') or keyword)
-            product_url = None
-            if settings.COUPANG_SCRAPE:
+    return await _resolve_candidate_urls(data, keyword, priority)
+
+
+def _pack_keywords(requests: list[tuple[str, list[str]]]) -> list[list[tuple[str, list[str]]]]:
+    """Group keywords so each packed prompt stays within RECOMMEND_BATCH_SIZE keywords
+    and RECOMMEND_BATCH_MAX_CHARS characters of user input."""
+    groups: list[list[tuple[str, list[str]]]] = []
+    cur: list[tuple[str, list[str]]] = []
+    cur_chars = 0
+    for keyword, dedupe_keys in requests:
+        size = len(keyword) + len(json.dumps(dedupe_keys, ensure_ascii=False))
+        if cur and (len(cur) >= settings.RECOMMEND_BATCH_SIZE or cur_chars + size > settings.RECOMMEND_BATCH_MAX_CHARS):
+            groups.append(cur)
+            cur, cur_chars = [], 0
+        cur.append((keyword, dedupe_keys))
+        cur_chars += size
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+async def _recommend_packed(group: list[tuple[str, list[str]]]) -> dict[str, list[dict]]:
+    """One structured-JSON call for several keywords. Returns items per keyword that the model answered."""
+    user_msg = "키워드별 요청 목록 (가격대 범위: 자유):\n" + json.dumps(
+        [{"keyword": k, "exclude_dedupe_keys": keys} for k, keys in group], ensure_ascii=False
+    )
+    max_tokens = min(4000, 1200 * len(group))
+    try:
+        text, _ = await complete_chat(
+            messages=[
+                {"role": "system", "content": BULK_SYSTEM_PROMPT},
+                {"role": "user", "content": user_msg},
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            purpose='small',
+            force_json=True,
+        )
+    except Exception as e:
+        logger.exception("AI completion error in ProductScout (packed)")
+        _raise_ai_error(e)
+    out: dict[str, list[dict]] = {}
+    # same lenient chain as recommend_products: loose parse, salvage complete per-keyword results
+    # from a truncated tail, then one repair call; whatever is still missing falls back per keyword
+    results = parse_json_items_or_array(text) or salvage_json_items_from_truncated(text, key="results")
+    if not results and text:
+        logger.warning("Packed recommend returned unparseable JSON for {} keywords. Trying repair pass...", len(group))
+        fixed = await attempt_repair_to_items_array(text, system=REPAIR_RESULTS_SYSTEM, max_tokens=max_tokens)
+        results = parse_json_items_or_array(fixed) or salvage_json_items_from_truncated(fixed, key="results")
+    wanted = {k for k, _ in group}
+    for r in results:
+        if not isinstance(r, dict):
+            continue
+        kw = r.get("keyword")
+        items = [i for i in (r.get("items") or []) if isinstance(i, dict)]
+        if kw in wanted and items:
+            out[kw] = items
+    return out
+
+
+async def recommend_products_bulk(requests: list[tuple[str, list[str]]]) -> dict[str, list[dict] | AIError]:
+    """Recommend candidates for many keywords.
+
+    Keywords are packed several-per-prompt; keywords a packed call could not answer
+    (or all of them, if packing fails) fall back to recommend_products with
+    RECOMMEND_CONCURRENCY calls in flight. Per-keyword failures are returned as AIError values.
+    """
+    results: dict[str, list[dict] | AIError] = {}
+    sem = asyncio.Semaphore(max(1, settings.RECOMMEND_CONCURRENCY))
+    keys_by_kw = dict(requests)
+
+    async def run_group(group: list[tuple[str, list[str]]]):
+        async with sem:
+            if len(group) > 1:
                 try:
-                    product_url = await fetch_top_product_url(query, timeout=float(settings.COUPANG_SCRAPE_TIMEOUT))
-                except Exception:
-                    product_url = None
-            d["coupang_url"] = product_url or build_coupang_search_url(
-                title_guess=d.get('title_guess'), brand=d.get('brand'), model=d.get('model'), keyword=keyword
-            )
-    return data
+                    packed = await _recommend_packed(group)
+                except AIError as e:
+                    if e.code == "config_error":
+                        for k, _ in group:
+                            results[k] = e
+                        return
+                    packed = {}
+                for k, items in packed.items():
+                    results[k] = await _resolve_candidate_urls(items, k, priority=BACKGROUND)
+        missing = [k for k, _ in group if k not in results]
+        await asyncio.gather(*(run_single(k) for k in missing))
+
+    async def run_single(keyword: str):
+        async with sem:
+            try:
+                results[keyword] = await recommend_products(keyword, keys_by_kw.get(keyword, []), priority=BACKGROUND)
+            except AIError as e:
+                results[keyword] = e
+
+    await asyncio.gather(*(run_group(g) for g in _pack_keywords(requests)))
+    return results
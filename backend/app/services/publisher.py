@@ -4,6 +4,7 @@ from sqlalchemy import select
 from markdown import markdown as md_to_html
 from app.models import Post, AffiliateMap
 from app.services.naver import publish_blog_post
+from app.services import rollups
 
 
 async def schedule_post(post_id: int, when: datetime, session: AsyncSession):
@@ -11,6 +12,7 @@ async def schedule_post(post_id: int, when: datetime, session: AsyncSession):
     if not post:
         return
     post.scheduled_at = when
+    await rollups.post_status_changed(session, post.status, "scheduled")
     post.status = "scheduled"
     await session.commit()
 
@@ -20,17 +22,19 @@ async def publish_now(post_id: int, session: AsyncSession):
     if not post:
         return
     # Build HTML from Markdown and inject affiliate iframe if missing
-    body_md = post.body_md or ""
+    body_md = (await session.scalar(select(Post.body_md).where(Post.id == post.id))) or ""
     html = md_to_html(body_md)
     # If related affiliate HTML exists but not present in content, append
     if post.product_candidate_id:
-        res = await session.execute(select(AffiliateMap).where(AffiliateMap.product_candidate_id == post.product_candidate_id))
-        amap = res.scalars().first()
-        if amap and amap.affiliate_html and (amap.affiliate_html not in body_md and amap.affiliate_html not in html):
-            html = html.rstrip() + "\n" + amap.affiliate_html
+        res = await session.execute(select(AffiliateMap.affiliate_html).where(AffiliateMap.product_candidate_id == post.product_candidate_id).limit(1))
+        html_snippet = res.scalar()
+        if html_snippet and (html_snippet not in body_md and html_snippet not in html):
+            html = html.rstrip() + "\n" + html_snippet
     # publish to Naver
     post_id_naver = await publish_blog_post(post.title or "", html)
     post.naver_post_id = post_id_naver
     post.published_at = datetime.utcnow()
-    post.status = "published" if post_id_naver else "failed"
+    new_status = "published" if post_id_naver else "failed"
+    await rollups.post_status_changed(session, post.status, new_status)
+    post.status = new_status
     await session.commit()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from loguru import logger
+from app.settings import settings
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_min` units per minute.
+
+    A rate of 0/None means unlimited.
+    """
+
+    def __init__(self, per_min: float | None):
+        self.per_min = float(per_min or 0)
+        self.capacity = self.per_min
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_min / 60.0)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        if self.per_min <= 0:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) * 60.0 / self.per_min)
+
+    def consume(self, amount: float):
+        """Charge (or refund, if negative) without waiting; the bucket may go into debt."""
+        if self.per_min <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _status_code(e: Exception) -> int | None:
+    for attr in ("status_code", "code"):
+        v = getattr(e, attr, None)
+        if isinstance(v, int):
+            return v
+    resp = getattr(e, "response", None)
+    v = getattr(resp, "status_code", None)
+    return v if isinstance(v, int) else None
+
+
+def _retry_after(e: Exception) -> float | None:
+    resp = getattr(e, "response", None)
+    headers = getattr(resp, "headers", None)
+    if not headers:
+        return None
+    raw = headers.get("retry-after-ms")
+    if raw:
+        try:
+            return float(raw) / 1000.0
+        except ValueError:
+            pass
+    raw = headers.get("retry-after")
+    if raw:
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+    return None
+
+
+def is_transient(e: Exception) -> bool:
+    status = _status_code(e)
+    if status in (408, 409, 429) or (status is not None and status >= 500):
+        return True
+    s = str(e)
+    return "429" in s or "rate limit" in s.lower() or "RESOURCE_EXHAUSTED" in s or "Resource has been exhausted" in s
+
+
+class LLMGovernor:
+    """Per (provider, model) admission control: requests/min, tokens/min and max concurrency,
+    with Retry-After aware exponential backoff on throttling/transient errors.
+    """
+
+    def __init__(self, name: str, *, rpm: float | None, tpm: float | None, concurrency: int):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.concurrency = max(1, concurrency)
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def _admit(self, est_tokens: int):
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.requests.acquire(1)
+            await self.tokens.acquire(est_tokens)
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            waited = time.monotonic() - started
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    async def run(self, call: Callable[[], Awaitable[Tuple[str, int | None]]], *, est_tokens: int) -> Tuple[str, int | None]:
+        attempts = max(0, settings.LLM_MAX_RETRIES) + 1
+        for attempt in range(attempts):
+            await self._admit(est_tokens)
+            self.in_flight += 1
+            self.calls += 1
+            try:
+                text, total = await call()
+            except Exception as e:
+                if attempt + 1 >= attempts or not is_transient(e):
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * (2 ** attempt))
+                delay += random.uniform(0, delay * 0.25)
+                # everyone queued on this provider/model backs off, not just this caller
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+                logger.warning("LLM throttled on {} (attempt {}): {} — backing off {:.1f}s", self.name, attempt + 1, e, delay)
+                continue
+            finally:
+                self.in_flight -= 1
+                self.semaphore.release()
+            if total:
+                self.tokens.consume(total - est_tokens)
+            return text, total
+        raise RuntimeError(f"LLM call on {self.name} exhausted retries")
+
+    @asynccontextmanager
+    async def slot(self, *, est_tokens: int):
+        """Admission for streaming calls: same limits as run(), but no automatic retry
+        once output has started flowing. Yields a dict; set 'total_tokens' to reconcile."""
+        await self._admit(est_tokens)
+        self.in_flight += 1
+        self.calls += 1
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        except Exception as e:
+            self.failures += 1
+            if is_transient(e):
+                delay = _retry_after(e) or settings.LLM_BACKOFF_BASE
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            raise
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+        if usage.get("total_tokens"):
+            self.tokens.consume(usage["total_tokens"] - est_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        admitted = self.calls or 1
+        return {
+            "name": self.name,
+            "rpm": self.requests.per_min or None,
+            "tpm": self.tokens.per_min or None,
+            "concurrency": self.concurrency,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_wait_s": round(self.total_wait / admitted, 3),
+            "max_wait_s": round(self.max_wait, 3),
+            "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+        }
+
+
+_governors: Dict[Tuple[str, str], LLMGovernor] = {}
+
+
+def _limits_for(provider: str, model: str) -> Dict[str, Any]:
+    # most specific override wins: model, then provider, then global defaults
+    limits: Dict[str, Any] = {
+        "rpm": settings.RATE_LIMIT_PER_MIN,
+        "tpm": settings.LLM_TOKENS_PER_MIN,
+        "concurrency": settings.LLM_MAX_CONCURRENCY,
+    }
+    overrides = settings.LLM_RATE_LIMITS or {}
+    limits.update(overrides.get(provider) or {})
+    limits.update(overrides.get(model) or {})
+    return limits
+
+
+def get_governor(provider: str, model: str) -> LLMGovernor:
+    key = (provider, model)
+    gov = _governors.get(key)
+    if gov is None:
+        limits = _limits_for(provider, model)
+        gov = LLMGovernor(f"{provider}:{model}", rpm=limits.get("rpm"), tpm=limits.get("tpm"), concurrency=int(limits.get("concurrency") or 1))
+        _governors[key] = gov
+    return gov
+
+
+def governor_stats() -> List[Dict[str, Any]]:
+    return [g.stats() for g in _governors.values()]
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import datetime as dt
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import select, func, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Keyword, Post, PostRollupDaily, PostStatusCount, PostMetricDaily, MetricRollupDaily
+
+
+# Post rollups are bumped in the caller's transaction, so they commit (or roll back)
+# together with the post change they describe.
+
+
+def _today() -> str:
+    return dt.datetime.utcnow().date().isoformat()
+
+
+async def _bump_daily(session: AsyncSession, day: str, dims: Iterable[tuple[str, str | None]], delta: int = 1):
+    values = [{"day": day, "dimension": d, "value": (v or "none")[:64], "count": delta} for d, v in dims]
+    stmt = insert(PostRollupDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PostRollupDaily.day, PostRollupDaily.dimension, PostRollupDaily.value],
+        set_={"count": PostRollupDaily.count + stmt.excluded.count},
+    )
+    await session.execute(stmt, values)
+
+
+async def _bump_status(session: AsyncSession, status: str, delta: int):
+    stmt = insert(PostStatusCount).values(status=status, count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PostStatusCount.status],
+        set_={"count": PostStatusCount.count + stmt.excluded.count},
+    )
+    await session.execute(stmt)
+
+
+async def post_created(session: AsyncSession, post: Post, keyword: Keyword | None):
+    await _bump_status(session, post.status, 1)
+    await _bump_daily(session, _today(), [
+        ("status", post.status),
+        ("template", post.template_id),
+        ("category", keyword.category if keyword else None),
+        ("keyword_date", keyword.date_range if keyword else None),
+    ])
+
+
+async def post_status_changed(session: AsyncSession, old: str | None, new: str):
+    if old == new:
+        return
+    if old:
+        await _bump_status(session, old, -1)
+    await _bump_status(session, new, 1)
+    await _bump_daily(session, _today(), [("status", new)])
+
+
+async def posts_deleted(session: AsyncSession, where_sql: str = "", params: Dict[str, Any] | None = None):
+    """Take posts about to be deleted out of the status totals and drop their metrics from the
+    time series. `where_sql` selects them (raw SQL on `post`, as used by the admin deletes);
+    call it before the DELETE. Daily post counts are history and are kept."""
+    params = params or {}
+    res = await session.execute(text(f"SELECT status, COUNT(*) FROM post {where_sql} GROUP BY status"), params)
+    for status, n in res.all():
+        await _bump_status(session, status, -n)
+    # foreign keys aren't enforced on these connections, so the metric rows go by hand
+    ids = f"SELECT id FROM post {where_sql}"
+    res = await session.execute(text(
+        "SELECT day, SUM(impressions), SUM(clicks), SUM(revenue), COUNT(*) FROM post_metric_daily "
+        f"WHERE post_id IN ({ids}) GROUP BY day"
+    ), params)
+    for day, imp, clk, rev, n in res.all():
+        await session.execute(
+            update(MetricRollupDaily).where(MetricRollupDaily.day == day).values(
+                impressions=MetricRollupDaily.impressions - imp,
+                clicks=MetricRollupDaily.clicks - clk,
+                revenue=MetricRollupDaily.revenue - rev,
+                posts=MetricRollupDaily.posts - n,
+            )
+        )
+    await session.execute(text(f"DELETE FROM post_metric_daily WHERE post_id IN ({ids})"), params)
+
+
+async def rebuild_post_rollups(session: AsyncSession):
+    """Recompute the rollups from the post and post_metric_daily tables. Scheduling days aren't
+    stored, so 'scheduled' transitions only survive in counters recorded live; the caller commits."""
+    await session.execute(text("DELETE FROM metric_rollup_daily"))
+    await session.execute(text(
+        "INSERT INTO metric_rollup_daily(day, impressions, clicks, revenue, posts) "
+        "SELECT day, SUM(impressions), SUM(clicks), SUM(revenue), COUNT(*) FROM post_metric_daily GROUP BY day"
+    ))
+    await session.execute(text("DELETE FROM post_status_count"))
+    await session.execute(text("DELETE FROM post_rollup_daily"))
+    await session.execute(text("INSERT INTO post_status_count(status, count) SELECT status, COUNT(*) FROM post GROUP BY status"))
+    await session.execute(text(
+        "INSERT INTO post_rollup_daily(day, dimension, value, count) "
+        "SELECT day, dimension, value, COUNT(*) FROM ("
+        "  SELECT date(p.created_at) AS day, 'status' AS dimension, 'draft' AS value FROM post p"
+        "  UNION ALL SELECT date(p.published_at), 'status', p.status FROM post p WHERE p.status IN ('published', 'failed') AND p.published_at IS NOT NULL"
+        "  UNION ALL SELECT date(p.created_at), 'template', COALESCE(p.template_id, 'none') FROM post p"
+        "  UNION ALL SELECT date(p.created_at), 'category', COALESCE(k.category, 'none') FROM post p LEFT JOIN keyword k ON k.id = p.keyword_id"
+        "  UNION ALL SELECT date(p.created_at), 'keyword_date', COALESCE(k.date_range, 'none') FROM post p LEFT JOIN keyword k ON k.id = p.keyword_id"
+        ") WHERE day IS NOT NULL GROUP BY day, dimension, value"
+    ))
+
+
+async def post_summary(session: AsyncSession, date_from: str | None, date_to: str | None) -> Dict[str, Any]:
+    totals = {s: n for s, n in (await session.execute(select(PostStatusCount.status, PostStatusCount.count))).all()}
+    q = select(PostRollupDaily.dimension, PostRollupDaily.value, func.sum(PostRollupDaily.count))
+    if date_from:
+        q = q.where(PostRollupDaily.day >= date_from)
+    if date_to:
+        q = q.where(PostRollupDaily.day <= date_to)
+    q = q.group_by(PostRollupDaily.dimension, PostRollupDaily.value)
+    by: Dict[str, Dict[str, int]] = {}
+    for dim, value, n in (await session.execute(q)).all():
+        if n:
+            by.setdefault(dim, {})[value] = int(n)
+    return {
+        "total": sum(totals.values()),
+        "published": totals.get("published", 0),
+        "by_status": totals,
+        "range": {"from": date_from, "to": date_to, **by},
+    }
+
+
+async def ingest_metrics(session: AsyncSession, items: List[Dict[str, Any]]) -> tuple[int, List[int]]:
+    """Upsert per-post daily metrics (a re-sent day replaces its values) and apply the
+    differences to the daily rollup; the caller commits.
+
+    Items for posts that don't exist are skipped (foreign keys aren't enforced); returns the
+    number of rows written and the skipped post ids.
+    """
+    wanted = sorted({it["post_id"] for it in items})
+    known: set[int] = set()
+    for start in range(0, len(wanted), 500):
+        res = await session.execute(select(Post.id).where(Post.id.in_(wanted[start:start + 500])))
+        known.update(res.scalars())
+    unknown = [i for i in wanted if i not in known]
+    rows: Dict[tuple[int, str], Dict[str, Any]] = {}
+    for it in items:
+        if it["post_id"] not in known:
+            continue
+        rows[(it["post_id"], it["day"])] = {
+            "post_id": it["post_id"],
+            "day": it["day"],
+            "impressions": int(it.get("impressions") or 0),
+            "clicks": int(it.get("clicks") or 0),
+            "revenue": float(it.get("revenue") or 0.0),
+        }
+    if not rows:
+        return 0, unknown
+    keys = list(rows)
+    old: Dict[tuple[int, str], PostMetricDaily] = {}
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        res = await session.execute(
+            select(PostMetricDaily.post_id, PostMetricDaily.day, PostMetricDaily.impressions, PostMetricDaily.clicks, PostMetricDaily.revenue)
+            .where(tuple_(PostMetricDaily.post_id, PostMetricDaily.day).in_(chunk))
+        )
+        old.update({(r.post_id, r.day): r for r in res.all()})
+    deltas: Dict[str, Dict[str, float]] = {}
+    for key, new in rows.items():
+        prev = old.get(key)
+        d = deltas.setdefault(new["day"], {"impressions": 0, "clicks": 0, "revenue": 0.0, "posts": 0})
+        d["impressions"] += new["impressions"] - (prev.impressions if prev else 0)
+        d["clicks"] += new["clicks"] - (prev.clicks if prev else 0)
+        d["revenue"] += new["revenue"] - (prev.revenue if prev else 0.0)
+        d["posts"] += 0 if prev else 1
+    stmt = insert(PostMetricDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PostMetricDaily.post_id, PostMetricDaily.day],
+        set_={"impressions": stmt.excluded.impressions, "clicks": stmt.excluded.clicks, "revenue": stmt.excluded.revenue},
+    )
+    await session.execute(stmt, list(rows.values()))
+    stmt = insert(MetricRollupDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MetricRollupDaily.day],
+        set_={
+            "impressions": MetricRollupDaily.impressions + stmt.excluded.impressions,
+            "clicks": MetricRollupDaily.clicks + stmt.excluded.clicks,
+            "revenue": MetricRollupDaily.revenue + stmt.excluded.revenue,
+            "posts": MetricRollupDaily.posts + stmt.excluded.posts,
+        },
+    )
+    await session.execute(stmt, [{"day": day, **d} for day, d in deltas.items()])
+    return len(rows), unknown
+
+
+async def metric_series(session: AsyncSession, date_from: str | None, date_to: str | None, post_id: int | None = None) -> List[Dict[str, Any]]:
+    """Daily metrics in the range: the rollup, or one post's own series."""
+    if post_id is not None:
+        model = PostMetricDaily
+        q = select(PostMetricDaily.day, PostMetricDaily.impressions, PostMetricDaily.clicks, PostMetricDaily.revenue).where(PostMetricDaily.post_id == post_id)
+    else:
+        model = MetricRollupDaily
+        q = select(MetricRollupDaily.day, MetricRollupDaily.impressions, MetricRollupDaily.clicks, MetricRollupDaily.revenue, MetricRollupDaily.posts)
+    if date_from:
+        q = q.where(model.day >= date_from)
+    if date_to:
+        q = q.where(model.day <= date_to)
+    out = []
+    for r in (await session.execute(q.order_by(model.day))).all():
+        row = dict(r._mapping)
+        row["ctr"] = (row["clicks"] / row["impressions"]) if row["impressions"] else None
+        out.append(row)
+    return out
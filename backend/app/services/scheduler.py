@@ -6,20 +6,25 @@ from datetime import datetime, timezone
 from app.db import AsyncSessionLocal
 from app.models import Post
 from app.services.publisher import publish_now
+from app.services.budget import flush_usage
+from app.services.llm_cache import flush_hits
+from app.settings import settings
 
 
 async def _tick_publish_due():
     async with AsyncSessionLocal() as session:
-        res = await session.execute(select(Post).where(Post.status == "scheduled"))
-        now = datetime.now(timezone.utc)
-        for post in res.scalars():
-            if post.scheduled_at and post.scheduled_at <= now.replace(tzinfo=None):
-                await publish_now(post.id, session)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # range scan on ix_post_status_scheduled_at
+        res = await session.execute(select(Post.id).where(Post.status == "scheduled", Post.scheduled_at <= now))
+        for post_id in list(res.scalars()):
+            await publish_now(post_id, session)
 
 
 async def init_scheduler(app: FastAPI):
     sched = AsyncIOScheduler()
     sched.add_job(_tick_publish_due, IntervalTrigger(seconds=30))
+    sched.add_job(flush_usage, IntervalTrigger(seconds=settings.BUDGET_FLUSH_INTERVAL))
+    sched.add_job(flush_hits, IntervalTrigger(seconds=settings.LLM_CACHE_HIT_FLUSH_INTERVAL))
     sched.start()
     app.state.scheduler = sched
 
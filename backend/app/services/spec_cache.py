@@ -0,0 +1,87 @@
+from __future__ import annotations
+import datetime as dt
+import json
+from typing import Any, Dict, List
+from sqlalchemy import select, delete, func
+from app.db import AsyncSessionLocal
+from app.models import ProductSpecCache
+from app.settings import settings
+
+
+async def get_entry(key: str) -> ProductSpecCache | None:
+    async with AsyncSessionLocal() as session:
+        return await session.get(ProductSpecCache, key)
+
+
+def entry_data(entry: ProductSpecCache) -> Dict:
+    try:
+        return json.loads(entry.data_json or "{}")
+    except Exception:
+        return {}
+
+
+def is_fresh(entry: ProductSpecCache) -> bool:
+    return entry.expires_at > dt.datetime.utcnow()
+
+
+async def store(key: str, data: Dict, *, ok: bool, etag: str | None = None, last_modified: str | None = None):
+    now = dt.datetime.utcnow()
+    ttl = settings.SPEC_CACHE_TTL if ok else settings.SPEC_CACHE_NEGATIVE_TTL
+    async with AsyncSessionLocal() as session:
+        entry = await session.get(ProductSpecCache, key)
+        if not entry:
+            entry = ProductSpecCache(url=key)
+            session.add(entry)
+        entry.status = "ok" if ok else "miss"
+        entry.data_json = json.dumps(data, ensure_ascii=False)
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.fetched_at = now
+        entry.expires_at = now + dt.timedelta(seconds=ttl)
+        await session.commit()
+
+
+async def touch(key: str):
+    """Revalidated (304): extend freshness without rewriting the data."""
+    now = dt.datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        entry = await session.get(ProductSpecCache, key)
+        if entry:
+            entry.fetched_at = now
+            entry.expires_at = now + dt.timedelta(seconds=settings.SPEC_CACHE_TTL)
+            await session.commit()
+
+
+async def list_entries(limit: int = 100, url: str | None = None) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        total = (await session.execute(select(func.count()).select_from(ProductSpecCache))).scalar() or 0
+        q = select(ProductSpecCache).order_by(ProductSpecCache.fetched_at.desc()).limit(limit)
+        if url:
+            q = q.where(ProductSpecCache.url == url)
+        rows = list((await session.execute(q)).scalars())
+    now = dt.datetime.utcnow()
+    items: List[Dict[str, Any]] = []
+    for e in rows:
+        items.append({
+            "url": e.url,
+            "status": e.status,
+            "fresh": e.expires_at > now,
+            "etag": e.etag,
+            "last_modified": e.last_modified,
+            "fetched_at": e.fetched_at.isoformat(),
+            "expires_at": e.expires_at.isoformat(),
+            "data": entry_data(e) if url else None,
+        })
+    return {"total": total, "items": items}
+
+
+async def purge(url: str | None = None, expired_only: bool = False) -> int:
+    q = delete(ProductSpecCache)
+    if url:
+        q = q.where(ProductSpecCache.url == url)
+    if expired_only:
+        q = q.where(ProductSpecCache.expires_at <= dt.datetime.utcnow())
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(q)
+        await session.commit()
+    return res.rowcount or 0
@@ -1,8 +1,11 @@
 from __future__ import annotations
 import re
 from typing import Dict, List, Optional
-import httpx
 from bs4 import BeautifulSoup
+from app.services.crawler import BLOCK_STATUSES, INTERACTIVE, crawl_get
+from app.services import spec_cache, catalog
+from app.services.html_extract import PARSER, PRODUCT_PAGE_STRAINER, run_parser
+from app.utils.urls import canonical_product_url
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36",
@@ -10,18 +13,9 @@ HEADERS = {
 }
 
 
-async def fetch_coupang_product_specs(url: str, timeout: float = 15.0) -> Dict:
-    """Scrape basic specs from a Coupang product page. Best-effort parser.
-    Returns dict with title, price_text, bullets(list), specs(dict), images(list), source_url.
-    """
-    if not url:
-        return {}
-    async with httpx.AsyncClient(headers=HEADERS, timeout=timeout, follow_redirects=True) as client:
-        r = await client.get(url)
-    if r.status_code != 200:
-        return {"source_url": url}
-    html = r.text
-    soup = BeautifulSoup(html, 'html.parser')
+def parse_coupang_product_html(html: str, source_url: str) -> Dict:
+    # only the subtrees read below are built (see html_extract.PRODUCT_PAGE_STRAINER)
+    soup = BeautifulSoup(html, PARSER, parse_only=PRODUCT_PAGE_STRAINER)
     title = (soup.select_one('h2.prod-buy-header__title') or soup.select_one('#productTitle') or soup.find('title'))
     title_text = title.get_text(strip=True) if title else ''
     price_el = soup.select_one('.total-price') or soup.select_one('.prod-sale-price')
@@ -51,10 +45,46 @@ async def fetch_coupang_product_specs(url: str, timeout: float = 15.0) -> Dict:
         "bullets": bullets,
         "specs": specs,
         "images": images,
-        "source_url": str(r.url),
+        "source_url": source_url,
     }
 
 
+async def fetch_coupang_product_specs(url: str, timeout: float = 15.0, use_cache: bool = True, priority: int = INTERACTIVE) -> Dict:
+    """Scrape basic specs from a Coupang product page. Best-effort parser.
+    Returns dict with title, price_text, bullets(list), specs(dict), images(list), source_url.
+
+    Results are cached per canonical product URL (SPEC_CACHE_TTL; failures for
+    SPEC_CACHE_NEGATIVE_TTL) and stale entries are revalidated with ETag/Last-Modified.
+    """
+    if not url:
+        return {}
+    key = canonical_product_url(url)
+    entry = await spec_cache.get_entry(key) if use_cache else None
+    if entry and spec_cache.is_fresh(entry):
+        return spec_cache.entry_data(entry)
+    headers = dict(HEADERS)
+    if entry and entry.status == "ok":
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    r = await crawl_get(url, headers=headers, timeout=timeout, priority=priority)
+    if r.status_code == 304 and entry:
+        await spec_cache.touch(key)
+        return spec_cache.entry_data(entry)
+    if r.status_code != 200:
+        data = {"source_url": url}
+        # throttling answers say nothing about the page; don't cache them
+        if use_cache and r.status_code not in BLOCK_STATUSES:
+            await spec_cache.store(key, data, ok=False)
+        return data
+    data = await run_parser(parse_coupang_product_html, r.text, str(r.url))
+    if use_cache:
+        await spec_cache.store(key, data, ok=True, etag=r.headers.get("etag"), last_modified=r.headers.get("last-modified"))
+    await catalog.record(data.get("source_url"), source="spec", title=data.get("title"))
+    return data
+
+
 def build_spec_table(products: List[Dict], columns: Optional[List[str]] = None) -> str:
     """Build a markdown comparison table given a list of product spec dicts.
     Each product dict expects: name, specs(dict with normalized keys like 용량, 소음(dB), 전력(W), 무게(kg)), price_text.
@@ -9,19 +9,46 @@ class Settings(BaseSettings):
     OPENAI_MODEL_SMALL: str = "gpt-4o-mini"
     OPENAI_MODEL_WRITER: str = "gpt-4o-mini"
     OPENAI_MONTHLY_MAX_USD: float = 20.0
-    OPENAI_HARD_STOP: bool = True
+    OPENAI_HARD_STOP: bool = True  # refuse (or downgrade to the small model) before a call that would exceed the caps
+    BUDGET_FLUSH_INTERVAL: int = 5  # seconds between writes of accumulated token/usd usage
+    # extra/override USD prices per 1K tokens: {"model-prefix": [prompt, completion]}
+    MODEL_PRICES: dict[str, list[float]] = {}
 
     GEMINI_API_KEY: str | None = None
     GEMINI_MODEL_SMALL: str = "gemini-1.5-flash"
     GEMINI_MODEL_WRITER: str = "gemini-1.5-pro"
     GEMINI_SAFETY: str = "low"  # 'default' | 'low' | 'none'
 
+    # 'single' = configured provider only; 'hedged' = also race the other provider when the
+    # primary exceeds its latency budget or fails transiently
+    AI_ROUTING: str = "single"
+    AI_HEDGE_BUDGET_SMALL: float = 8.0
+    AI_HEDGE_BUDGET_WRITER: float = 45.0
+    AI_HEDGE_MIN_SAMPLES: int = 20
+
+    # seconds an in-process AI config snapshot is trusted before re-checking the version row
+    AI_CONFIG_CACHE_TTL: float = 5.0
+
+    # opt-in LLM response cache (small/low-temperature calls only; writer output is never cached)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.3
+    LLM_CACHE_HIT_FLUSH_INTERVAL: int = 30  # seconds between writes of hit counters
+
     NAVER_CLIENT_ID: str | None = None
     NAVER_CLIENT_SECRET: str | None = None
     NAVER_BLOG_ID: str | None = None
     NAVER_REDIRECT_URI: str | None = None
 
-    RATE_LIMIT_PER_MIN: int = 10
+    RATE_LIMIT_PER_MIN: int = 10  # LLM requests/min per provider+model (0 = unlimited)
+    LLM_TOKENS_PER_MIN: int = 0  # 0 = unlimited
+    LLM_MAX_CONCURRENCY: int = 4
+    # per provider or model overrides, e.g. {"gemini": {"rpm": 60}, "gpt-4o": {"tpm": 30000, "concurrency": 2}}
+    LLM_RATE_LIMITS: dict[str, dict[str, float]] = {}
+    LLM_MAX_RETRIES: int = 4
+    LLM_BACKOFF_BASE: float = 1.0
+    LLM_BACKOFF_MAX: float = 30.0
 
     SLACK_WEBHOOK_URL: str | None = None
 
@@ -33,9 +60,69 @@ class Settings(BaseSettings):
     LANGUAGE: str = "ko-KR"
 
     DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
+    # connection pools (file databases): read/write, overflow, read-only pool for list/metrics endpoints
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_READ_POOL_SIZE: int = 4
+    # SQLite profile applied on every connection
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # OFF | NORMAL | FULL
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_TEMP_STORE: str = "MEMORY"  # DEFAULT | FILE | MEMORY
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"  # NONE | FULL | INCREMENTAL; only takes effect on a new database file
+    # admin purge/dedup jobs (services/maintenance.py): rows per transaction, pause between chunks, pages per vacuum step
+    MAINTENANCE_CHUNK_ROWS: int = 500
+    MAINTENANCE_PAUSE: float = 0.05
+    MAINTENANCE_VACUUM_PAGES: int = 1000
     COUPANG_SCRAPE: bool = True
     COUPANG_SCRAPE_TIMEOUT: float = 12.0
 
+    # shared outbound HTTP pools (services/http_clients.py)
+    HTTP_COUPANG_MAX_CONNECTIONS: int = 6
+    HTTP_MAX_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 20.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP2: bool = False  # needs the optional 'h2' package
+    HTTP_HOST_CONCURRENCY: int = 3  # concurrent scraping requests per host
+
+    # candidate → product URL resolution in recommend_products
+    RESOLVE_CONCURRENCY: int = 4
+    RESOLVE_DEADLINE: float = 20.0  # seconds for the whole stage; unresolved → search URL
+
+    # Coupang crawl scheduler: spacing between requests per host, max adaptive backoff,
+    # consecutive blocking answers that open the circuit breaker, breaker cooldown (seconds)
+    CRAWL_MIN_INTERVAL: float = 1.0
+    CRAWL_BACKOFF_MAX: float = 60.0
+    CRAWL_BREAKER_THRESHOLD: int = 5
+    CRAWL_BREAKER_COOLDOWN: float = 120.0
+
+    # Comparison drafts: max products per table, deadline for all spec pages (seconds)
+    COMPARE_MAX_PRODUCTS: int = 8
+    COMPARE_SPEC_DEADLINE: float = 20.0
+
+    # HTML parsing off the event loop: 'thread' | 'process'
+    HTML_PARSE_EXECUTOR: str = "thread"
+    HTML_PARSE_WORKERS: int = 2
+
+    # Resolve candidates from the local product catalog (FTS5) before searching Coupang
+    CATALOG_LOOKUP: bool = True
+
+    # Coupang search query → product URL cache (seconds)
+    SEARCH_CACHE_TTL: int = 3 * 24 * 3600
+    SEARCH_CACHE_NEGATIVE_TTL: int = 3600
+
+    # parsed product-spec cache (seconds)
+    SPEC_CACHE_TTL: int = 24 * 3600
+    SPEC_CACHE_NEGATIVE_TTL: int = 600
+
+    # bulk recommend: keywords packed per LLM prompt, and parallel calls
+    RECOMMEND_BATCH_SIZE: int = 3
+    RECOMMEND_BATCH_MAX_CHARS: int = 4000
+    RECOMMEND_CONCURRENCY: int = 3
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     @field_validator("POSTING_WINDOW_START", "POSTING_WINDOW_END")
@@ -0,0 +1,49 @@
+import hashlib
+import zlib
+from sqlalchemy.types import Text, TypeDecorator
+
+
+# Stored form of large text columns: values under MIN_COMPRESS_BYTES (or that don't shrink) stay
+# plain TEXT; larger ones are a BLOB whose first byte names the format (b"z" = zlib). Rows written
+# before compression are plain TEXT too, so both read back as str.
+MIN_COMPRESS_BYTES = 256
+ZLIB_LEVEL = 6
+_ZLIB = b"z"
+
+
+def pack_text(value: str | None) -> str | bytes | None:
+    if value is None:
+        return None
+    raw = value.encode("utf-8")
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return value
+    packed = _ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+    return packed if len(packed) < len(raw) else value
+
+
+def unpack_text(value: str | bytes | memoryview | None) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    tag, body = value[:1], value[1:]
+    if tag == _ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    raise ValueError(f"unknown compressed text format {tag!r}")
+
+
+def content_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored via pack_text/unpack_text. Only usable for whole-value reads and
+    writes: SQL string functions and LIKE see the compressed bytes."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return pack_text(value)
+
+    def process_result_value(self, value, dialect):
+        return unpack_text(value)
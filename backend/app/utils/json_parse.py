@@ -76,9 +76,9 @@ def parse_json_items_or_array(text: str) -> list[Any]:
     return []
 
 
-def salvage_json_items_from_truncated(text: str) -> list[Any]:
+def salvage_json_items_from_truncated(text: str, key: str = "items") -> list[Any]:
     """Best-effort recovery: scan for an array of JSON objects and parse complete ones.
-    - Supports either top-level array or object with "items": [ ... ]
+    - Supports either top-level array or object with "<key>": [ ... ] ("items" by default)
     - Ignores the last incomplete object if truncated.
     """
     import json as _json
@@ -86,7 +86,7 @@ def salvage_json_items_from_truncated(text: str) -> list[Any]:
     if not s:
         return []
     # Locate array start
-    idx = s.find('"items"')
+    idx = s.find(f'"{key}"')
     if idx != -1:
         arr_start = s.find('[', idx)
     else:
@@ -114,8 +114,8 @@ def salvage_json_items_from_truncated(text: str) -> list[Any]:
                     except Exception:
                         pass
                     start = -1
-        elif ch == ']':
-            # End of array
+        elif ch == ']' and depth == 0:
+            # End of array (brackets inside objects belong to nested arrays)
             break
         i += 1
     return out
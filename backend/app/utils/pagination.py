@@ -0,0 +1,19 @@
+from fastapi import Response
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+NEXT_CURSOR_HEADER = "X-Next-After-Id"
+
+
+def keyset(q: Select, id_col: InstrumentedAttribute, after_id: int | None, limit: int) -> Select:
+    """Newest-first page of `q`: rows with id below the `after_id` cursor."""
+    if after_id is not None:
+        q = q.where(id_col < after_id)
+    return q.order_by(id_col.desc()).limit(limit)
+
+
+def set_next_cursor(response: Response, ids: list[int], limit: int):
+    """A full page means there may be more; pass the header value back as `after_id`."""
+    if ids and len(ids) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(ids[-1])
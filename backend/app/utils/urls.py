@@ -1,4 +1,5 @@
-from urllib.parse import quote_plus
+import re
+from urllib.parse import quote_plus, urlsplit, parse_qsl, urlencode
 
 
 def build_coupang_search_url(title_guess: str | None = None, brand: str | None = None, model: str | None = None, keyword: str | None = None) -> str:
@@ -12,3 +13,15 @@ def build_coupang_search_url(title_guess: str | None = None, brand: str | None =
     q = quote_plus(base)
     return f"https://www.coupang.com/np/search?q={q}&channel=user"
 
+
+
+def canonical_product_url(url: str) -> str:
+    """Stable cache key for a product page: Coupang product URLs keep only the product id
+    and the itemId/vendorItemId variant params; other URLs drop the fragment only."""
+    parts = urlsplit((url or '').strip())
+    m = re.search(r"/vp/products/(\d+)", parts.path)
+    if 'coupang.com' in parts.netloc and m:
+        keep = [(k, v) for k, v in parse_qsl(parts.query) if k in ('itemId', 'vendorItemId')]
+        query = ('?' + urlencode(sorted(keep))) if keep else ''
+        return f"https://www.coupang.com/vp/products/{m.group(1)}{query}"
+    return parts._replace(fragment='').geturl()
@@ -0,0 +1,138 @@
+"""Shared setup for the benchmark scripts: a throwaway database and local stand-in servers.
+
+Every script calls `use_temp_env()` before importing anything from `app`, because app.settings
+and app.db read the environment at import time. Nothing here touches the network.
+"""
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List
+
+
+def use_temp_env(**defaults: str) -> str:
+    """Point the app at a fresh SQLite file; `defaults` are settings the caller may still override
+    from the environment. Returns the database path."""
+    path = os.path.join(tempfile.mkdtemp(prefix="coupang-partners-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    return path
+
+
+async def migrate():
+    from app.services.migrations import run_migrations
+
+    await run_migrations()
+
+
+@contextmanager
+def serve(handler: type[BaseHTTPRequestHandler]) -> Iterator[str]:
+    """Run `handler` on a threaded HTTP server on localhost; yields its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _Quiet(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def openai_stub(reply: Callable[[dict], str], delay: float, usage: Dict[str, int] | None = None) -> type[BaseHTTPRequestHandler]:
+    """Handler for POST /v1/chat/completions that answers `reply(request_json)` after `delay` seconds.
+
+    Token counts are estimated the way budget.estimate_prompt_tokens does (about 2 chars per token)
+    and summed into `usage` ('calls', 'prompt_tokens', 'completion_tokens').
+    """
+    lock = threading.Lock()
+
+    class Handler(_Quiet):
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            time.sleep(delay)
+            text = reply(req)
+            prompt = sum(len(str(m.get("content") or "")) for m in req.get("messages", [])) // 2 + 8 * len(req.get("messages", []))
+            completion = len(text) // 2
+            if usage is not None:
+                with lock:
+                    usage["calls"] = usage.get("calls", 0) + 1
+                    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + prompt
+                    usage["completion_tokens"] = usage.get("completion_tokens", 0) + completion
+            body = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": req.get("model", "bench"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion},
+            }
+            self.send_body(json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    return Handler
+
+
+def pages_stub(pages: Dict[str, bytes]) -> type[BaseHTTPRequestHandler]:
+    """Handler serving fixed HTML bodies by path (404 for anything else)."""
+
+    class Handler(_Quiet):
+        def do_GET(self):
+            body = pages.get(self.path.split("?", 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_body(body, "text/html; charset=utf-8")
+
+    return Handler
+
+
+def summarize(samples: List[float]) -> str:
+    """'n=.. mean=.. p50=.. p95=.. max=..' in milliseconds."""
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return f"n={len(ms)} mean={statistics.fmean(ms):.1f}ms p50={statistics.median(ms):.1f}ms p95={p95:.1f}ms max={ms[-1]:.1f}ms"
+
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+def run(coro):
+    """asyncio.run that also closes the app's pools and shared clients before the loop ends."""
+
+    async def wrapper():
+        from app.db import engine, read_engine
+        from app.services.http_clients import close_http_clients
+        from app.services.openai_client import close_client
+
+        try:
+            return await coro
+        finally:
+            await close_client()
+            await close_http_clients()
+            await engine.dispose()
+            await read_engine.dispose()
+
+    return asyncio.run(wrapper())
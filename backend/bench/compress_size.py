@@ -0,0 +1,136 @@
+"""Database size before and after migration 0005 (compressed post text, deduplicated affiliate HTML).
+
+Builds a schema at revision 0004 and fills it with synthetic data:
+
+- --posts posts, each with 3-5 KB of mixed Korean/English markdown and an alignment meta_json
+- one affiliate map per post, drawn from --snippets distinct affiliate HTML snippets
+
+It then VACUUMs and measures, runs the 0005 upgrade, VACUUMs and measures again. Sizes come from
+SQLite's dbstat table, with each table's indexes counted toward it, so they match what the file
+shrinks to after a VACUUM.
+
+    cd backend && python -m bench.compress_size --posts 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import time
+
+from bench._support import use_temp_env
+
+DB_PATH = use_temp_env()
+
+KO = "가성비 무선 마우스 배터리 사용감 그립감 클릭감 센서 연결 안정성 디자인 휴대성 소음 가격 배송 포장 만족 추천 비교 장점 단점 기능".split()
+EN = "DPI Bluetooth USB-C polling rate sensor ergonomic lightweight wireless battery firmware".split()
+
+
+def post_body(rng: random.Random) -> str:
+    target = rng.randint(3000, 5000)
+    parts = [f"# {rng.choice(KO)} {rng.choice(EN)} 리뷰\n"]
+    size = len(parts[0].encode("utf-8"))
+    while size < target:
+        if rng.random() < 0.15:
+            chunk = f"\n## {rng.choice(KO)} {rng.choice(KO)}\n"
+        else:
+            words = [rng.choice(KO if rng.random() < 0.8 else EN) for _ in range(rng.randint(8, 20))]
+            chunk = " ".join(words) + ".\n"
+        parts.append(chunk)
+        size += len(chunk.encode("utf-8"))
+    return "".join(parts)
+
+
+def meta_json(rng: random.Random) -> str:
+    name = f"{rng.choice(EN)} {rng.choice(KO)} {rng.randint(1, 999)}"
+    return json.dumps({"alignment": {
+        "enforce_product_name": name,
+        "allowed_names": [name, name.upper()],
+        "category": " ".join(rng.sample(KO, 2)),
+        "spec_keys": rng.sample(KO, 6),
+        "disallowed_brands": rng.sample(EN, 4),
+        "link_anchors": ["자세히 보기", "상세 스펙·최저가 확인", "오늘 가격/재고 확인"],
+    }}, ensure_ascii=False)
+
+
+def snippet(i: int) -> str:
+    return (
+        f'<a href="https://link.coupang.com/a/{i:06d}" target="_blank" referrerpolicy="unsafe-url">'
+        f'<img src="https://image.coupangcdn.com/image/affiliate/banner/{i:06d}@2x.jpg" alt="{KO[i % len(KO)]} 상품 {i}" '
+        f'width="120" height="240"></a>'
+    )
+
+
+def upgrade(revision: str):
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine
+    from app.services.migrations import SCRIPT_LOCATION
+
+    cfg = Config()
+    cfg.set_main_option("script_location", SCRIPT_LOCATION)
+    eng = create_engine(f"sqlite:///{DB_PATH}")
+    with eng.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, revision)
+    eng.dispose()
+
+
+def seed(posts: int, snippets: int, batch: int = 5000):
+    rng = random.Random(25)
+    con = sqlite3.connect(DB_PATH)
+    con.execute("INSERT INTO keyword(id, text, date_range, status, created_at) VALUES (1, '무선 마우스', '2026-01-01', 'collected', '2026-01-01 00:00:00')")
+    for start in range(1, posts + 1, batch):
+        ids = range(start, min(posts, start + batch - 1) + 1)
+        con.executemany(
+            "INSERT INTO product_candidate(id, keyword_id, title_guess, status, created_at) VALUES (?, 1, ?, 'mapped', '2026-01-01 00:00:00')",
+            [(i, f"상품 {i}") for i in ids],
+        )
+        con.executemany(
+            "INSERT INTO affiliate_map(id, product_candidate_id, affiliate_url, affiliate_html, mapped_at) VALUES (?, ?, ?, ?, '2026-01-01 00:00:00')",
+            [(i, i, f"https://link.coupang.com/a/{i % snippets:06d}", snippet(rng.randrange(snippets))) for i in ids],
+        )
+        con.executemany(
+            "INSERT INTO post(id, keyword_id, product_candidate_id, title, body_md, tags, images, status, template_id, created_at, meta_json) "
+            "VALUES (?, 1, ?, ?, ?, '무선마우스,쿠팡파트너스', '제품 패키지 사진,사용 상황 사진', 'published', 'A', '2026-01-01 00:00:00', ?)",
+            [(i, i, f"[광고/제휴] 상품 {i} 리뷰", post_body(rng), meta_json(rng)) for i in ids],
+        )
+        con.commit()
+    con.close()
+
+
+def measure(label: str):
+    con = sqlite3.connect(DB_PATH)
+    con.execute("VACUUM")
+    rows = con.execute(
+        "SELECT COALESCE(s.tbl_name, d.name), SUM(d.pgsize) FROM dbstat d "
+        "LEFT JOIN sqlite_schema s ON s.name = d.name GROUP BY 1 ORDER BY 2 DESC"
+    ).fetchall()
+    con.close()
+    tables = ", ".join(f"{name} {size / 2**20:.1f} MB" for name, size in rows if name in ("post", "affiliate_map", "affiliate_html"))
+    print(f"{label:<8}{os.path.getsize(DB_PATH) / 2**20:>8.1f} MB  ({tables})")
+
+
+def main(posts: int, snippets: int):
+    upgrade("0004")
+    started = time.perf_counter()
+    seed(posts, snippets)
+    print(f"{posts} posts, {snippets} distinct snippets (seeded in {time.perf_counter() - started:.0f}s); sizes after VACUUM")
+    measure("before")
+    started = time.perf_counter()
+    upgrade("head")
+    elapsed = time.perf_counter() - started
+    measure("after")
+    print(f"migration 0005 took {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--posts", type=int, default=100_000)
+    ap.add_argument("--snippets", type=int, default=3000)
+    args = ap.parse_args()
+    try:
+        main(args.posts, args.snippets)
+    finally:
+        shutil.rmtree(os.path.dirname(DB_PATH), ignore_errors=True)  # several hundred MB at the default size
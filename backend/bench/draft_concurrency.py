@@ -0,0 +1,95 @@
+"""Concurrent POST /api/posts/draft calls against a local OpenAI stand-in.
+
+Each draft makes two completions (alignment JSON, then the writer), and the stand-in answers every
+completion after --latency seconds. If the drafts overlap, N of them finish in about the time of
+one, and /api/health stays fast meanwhile. A client that blocked the event loop would need N times
+as long, and health probes would wait behind it.
+
+    cd backend && python -m bench.draft_concurrency --drafts 8 --latency 1.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from bench._support import migrate, openai_stub, run, serve, summarize, timed, use_temp_env
+
+use_temp_env(
+    AI_PROVIDER="gpt",
+    OPENAI_API_KEY="sk-bench",
+    RATE_LIMIT_PER_MIN="0",
+    LLM_MAX_CONCURRENCY="64",
+    LLM_CACHE_ENABLED="false",
+)
+
+PRODUCT = "벤치 무선 마우스"
+
+
+def reply(req: dict) -> str:
+    if req.get("response_format"):
+        return json.dumps({"enforce_product_name": PRODUCT, "allowed_names": [PRODUCT], "disallowed_brands": []}, ensure_ascii=False)
+    return f"# {PRODUCT} 리뷰\n\n{PRODUCT}를 일주일 동안 써 봤습니다.\n\n## 장점\n\n가볍고 배터리가 오래갑니다.\n"
+
+
+async def seed(n: int) -> list[int]:
+    from app.db import AsyncSessionLocal
+    from app.models import AffiliateMap, Keyword, ProductCandidate
+
+    async with AsyncSessionLocal() as session:
+        kw = Keyword(text="무선 마우스", date_range="2026-01-01")
+        session.add(kw)
+        await session.flush()
+        pcs = [ProductCandidate(keyword_id=kw.id, title_guess=PRODUCT, brand="벤치", model=f"M{i}") for i in range(n + 1)]
+        session.add_all(pcs)
+        await session.flush()
+        # not a coupang.com URL, so drafting skips the spec-page fetch
+        session.add_all(AffiliateMap(product_candidate_id=pc.id, affiliate_url=f"https://link.example/{pc.id}") for pc in pcs)
+        await session.commit()
+        return [pc.id for pc in pcs]
+
+
+async def main(drafts: int):
+    import httpx
+    from app.main import app
+
+    await migrate()
+    ids = await seed(drafts)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+
+        async def draft(product_id: int):
+            r = await client.post("/api/posts/draft", json={"product_id": product_id})
+            r.raise_for_status()
+
+        single = await timed(draft(ids[0]))
+
+        done = asyncio.Event()
+        health: list[float] = []
+
+        async def probe():
+            while not done.is_set():
+                health.append(await timed(client.get("/api/health")))
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(draft(i) for i in ids[1:]))
+        wall = time.perf_counter() - started
+        done.set()
+        await prober
+
+    print(f"{'one draft:':<24}{single:.2f}s")
+    print(f"{f'{drafts} drafts at once:':<24}{wall:.2f}s (one after another: ~{single * drafts:.2f}s, overlap x{single * drafts / wall:.1f})")
+    print(f"{'/api/health meanwhile:':<24}{summarize(health)}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--drafts", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=1.0, help="seconds the stand-in takes per completion")
+    args = ap.parse_args()
+    usage: dict[str, int] = {}
+    with serve(openai_stub(reply, args.latency, usage)) as base:
+        os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+        run(main(args.drafts))
+    print(f"{'completions served:':<24}{usage.get('calls', 0)}")
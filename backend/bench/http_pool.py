@@ -0,0 +1,69 @@
+"""Sequential page fetches against a local fixture server: a new client per request vs the shared pool.
+
+The "per-request client" run opens and closes an httpx.AsyncClient for every fetch, the way
+coupang/specs/naver did before services/http_clients.py. The "shared pool" run goes through
+crawler.crawl_get, which uses the application-lifetime 'coupang' client. CRAWL_MIN_INTERVAL is
+0 here, so the scheduler's pacing stays out of the numbers. The fixture server is plain HTTP on
+localhost. Against coupang.com, every new connection also pays DNS, network round trips and a TLS
+handshake, so the real gap is larger than the one shown here.
+
+    cd backend && python -m bench.http_pool --requests 200
+"""
+import argparse
+import time
+
+from bench._support import pages_stub, run, serve, summarize, use_temp_env
+
+use_temp_env(CRAWL_MIN_INTERVAL="0")
+
+PAGE = (
+    "<html><head><title>벤치 상품</title></head><body>"
+    + "".join(f"<div class='prod-item'><span>항목 {i}</span><img src='//img.example/{i}.jpg'></div>" for i in range(800))
+    + "</body></html>"
+).encode("utf-8")
+HEADERS = {"User-Agent": "Mozilla/5.0 (bench)"}
+
+
+async def per_request_client(url: str, n: int) -> list[float]:
+    import httpx
+    from app.settings import settings
+
+    out = []
+    for _ in range(n):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(follow_redirects=True, timeout=settings.HTTP_TIMEOUT) as client:
+            r = await client.get(url, headers=HEADERS)
+        r.raise_for_status()
+        out.append(time.perf_counter() - started)
+    return out
+
+
+async def shared_pool(url: str, n: int) -> list[float]:
+    from app.services.crawler import crawl_get
+    from app.settings import settings
+
+    out = []
+    for _ in range(n):
+        started = time.perf_counter()
+        r = await crawl_get(url, headers=HEADERS, timeout=settings.HTTP_TIMEOUT)
+        r.raise_for_status()
+        out.append(time.perf_counter() - started)
+    return out
+
+
+async def main(base: str, n: int):
+    url = f"{base}/vp/products/1"
+    await per_request_client(url, 5)  # warm-up: imports, first-use costs
+    before = await per_request_client(url, n)
+    after = await shared_pool(url, n)
+    print(f"{len(PAGE) // 1024} KiB page, {n} sequential fetches")
+    print(f"{'per-request client:':<21}{summarize(before)}")
+    print(f"{'shared pool:':<21}{summarize(after)}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--requests", type=int, default=200)
+    args = ap.parse_args()
+    with serve(pages_stub({"/vp/products/1": PAGE})) as base:
+        run(main(base, args.requests))
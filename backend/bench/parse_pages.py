@@ -0,0 +1,102 @@
+"""Parse time and peak memory per product page: full html.parser tree vs the targeted extraction.
+
+"full" is how specs.parse_coupang_product_html worked before html_extract, with a whole
+BeautifulSoup(html, 'html.parser') tree. "targeted" is the current code, which builds only
+PRODUCT_PAGE_STRAINER subtrees and uses lxml when it is installed. Both runs must return the
+same dict. Pass saved product pages as arguments, e.g. pages fetched with
+`curl -A Mozilla/5.0 https://www.coupang.com/vp/products/<id>`. With no arguments, the script
+generates a page of a few hundred KB with the same structure.
+
+    cd backend && python -m bench.parse_pages [page.html ...] --repeat 5
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from bench._support import use_temp_env
+
+use_temp_env()
+
+from app.services import specs  # noqa: E402
+from app.services.html_extract import PARSER  # noqa: E402
+
+
+def synthetic_page() -> str:
+    scripts = "".join(f"<script>window.__s{i} = {{'k': '{'x' * 400}'}};</script>" for i in range(60))
+    nav = "".join(f"<li><a href='/np/categories/{i}'>카테고리 {i}</a></li>" for i in range(300))
+    bullets = "".join(f"<li>특징 {i}: 가볍고 튼튼한 소재</li>" for i in range(10))
+    table = "".join(f"<tr><th>항목 {i}</th><td>값 {i}</td></tr>" for i in range(20))
+    detail = "".join(f"<img src='https://thumbnail.example/detail/{i}.jpg'>" for i in range(10))
+    reviews = "".join(
+        f"<article class='sdp-review__article'><div class='rating'><span>5</span></div>"
+        f"<p class='review-text'>{'정말 만족스러운 제품입니다. ' * 12}</p>"
+        f"<img data-src='//img.example/review/{i}.jpg'></article>"
+        for i in range(400)
+    )
+    carousel = "".join(
+        f"<li class='recommend-item'><a href='/vp/products/{i}'><img src='//img.example/{i}.jpg'>"
+        f"<div class='name'>추천 상품 {i}</div><em class='price'>{i * 100}원</em></a></li>"
+        for i in range(300)
+    )
+    return (
+        f"<html><head><title>벤치 무선 마우스 - 쿠팡</title>{scripts}</head><body>"
+        f"<header><ul class='nav'>{nav}</ul></header>"
+        "<div class='prod-atf'><h2 class='prod-buy-header__title'>벤치 무선 마우스 M1</h2>"
+        "<div class='prod-price'><span class='total-price'><strong>39,900</strong>원</span></div>"
+        f"<ul class='prod-description-attribute'>{bullets}</ul></div>"
+        f"<div class='prod-image__detail'>{detail}</div>"
+        f"<table class='prod-description-table'>{table}</table>"
+        f"<section class='sdp-review'>{reviews}</section>"
+        f"<ul class='recommend-carousel'>{carousel}</ul>"
+        "</body></html>"
+    )
+
+
+@contextmanager
+def full_parse():
+    """specs.parse_coupang_product_html as it was: the stdlib parser on the whole document."""
+    saved = specs.PARSER, specs.PRODUCT_PAGE_STRAINER
+    specs.PARSER, specs.PRODUCT_PAGE_STRAINER = "html.parser", None
+    try:
+        yield
+    finally:
+        specs.PARSER, specs.PRODUCT_PAGE_STRAINER = saved
+
+
+def measure(html: str, repeat: int) -> tuple[float, int, dict]:
+    """(median seconds, peak traced bytes, result) for one parse_coupang_product_html call."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = specs.parse_coupang_product_html(html, "https://www.coupang.com/vp/products/1")
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    specs.parse_coupang_product_html(html, "https://www.coupang.com/vp/products/1")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak, result
+
+
+def main(paths: list[str], repeat: int):
+    pages = [(os.path.basename(p), open(p, encoding="utf-8", errors="replace").read()) for p in paths] or [("synthetic", synthetic_page())]
+    print(f"targeted parser: {PARSER}; times are the median of {repeat} runs, memory is the tracemalloc peak")
+    print(f"{'page':<24}{'size':>9}{'full':>10}{'targeted':>10}{'full peak':>12}{'targeted peak':>15}  same")
+    for name, html in pages:
+        with full_parse():
+            full_t, full_mem, full_res = measure(html, repeat)
+        t, mem, res = measure(html, repeat)
+        print(
+            f"{name[:23]:<24}{len(html.encode('utf-8')) / 1024:>7.0f}KB{full_t * 1000:>8.1f}ms{t * 1000:>8.1f}ms"
+            f"{full_mem / 2**20:>10.1f}MB{mem / 2**20:>13.1f}MB  {'yes' if res == full_res else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("pages", nargs="*", help="saved product page HTML files")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    main(args.pages, args.repeat)
@@ -0,0 +1,118 @@
+"""Bulk product recommendation against the per-keyword loop, with a local OpenAI stand-in.
+
+Runs the same keywords twice on a fresh database. The first run calls
+POST /api/products/recommend/{keyword_id} once per keyword, one after another. The second
+sends them all in one POST /api/products/recommend. For each run it reports wall time,
+completion calls and tokens per keyword. Tokens are the stand-in's estimate of about
+2 chars per token, the same one the budget uses. The stand-in answers after --latency
+seconds, plus --per-item seconds for every candidate it returns.
+
+    cd backend && python -m bench.recommend_bulk --keywords 24
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from bench._support import migrate, openai_stub, run, serve, use_temp_env
+
+use_temp_env(
+    AI_PROVIDER="gpt",
+    OPENAI_API_KEY="sk-bench",
+    RATE_LIMIT_PER_MIN="0",
+    LLM_MAX_CONCURRENCY="64",
+    LLM_CACHE_ENABLED="false",
+    COUPANG_SCRAPE="false",
+)
+
+ITEMS = 6
+
+
+def _items(keyword: str) -> list[dict]:
+    return [
+        {
+            "title_guess": f"{keyword} 추천 상품 {i}",
+            "brand": f"브랜드{i}",
+            "model": f"{keyword}-{i}",
+            "price_band": "3~5만원",
+            "why": f"{keyword} 검색 의도에 맞는 인기 상품",
+            "image_hint": "제품 정면",
+            "coupang_url": f"https://www.coupang.com/vp/products/{abs(hash((keyword, i))) % 10**9}",
+        }
+        for i in range(ITEMS)
+    ]
+
+
+def reply(req: dict) -> str:
+    user = req["messages"][-1]["content"]
+    if "results" in req["messages"][0]["content"]:
+        asked = json.loads(user.split("\n", 1)[1])
+        return json.dumps({"results": [{"keyword": a["keyword"], "items": _items(a["keyword"])} for a in asked]}, ensure_ascii=False)
+    keyword = re.search(r'키워드: "(.*)"', user).group(1)
+    return json.dumps({"items": _items(keyword)}, ensure_ascii=False)
+
+
+async def seed(n: int, day: str) -> list[int]:
+    from app.db import AsyncSessionLocal
+    from app.models import Keyword
+
+    async with AsyncSessionLocal() as session:
+        kws = [Keyword(text=f"벤치 키워드 {i}", date_range=day) for i in range(n)]
+        session.add_all(kws)
+        await session.commit()
+        return [k.id for k in kws]
+
+
+async def main(n: int, usage: dict[str, int]):
+    import httpx
+    from app.main import app
+
+    await migrate()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+
+        async def loop(ids):
+            for kid in ids:
+                (await client.post(f"/api/products/recommend/{kid}")).raise_for_status()
+
+        async def bulk(ids):
+            r = await client.post("/api/products/recommend", json={"keyword_ids": ids})
+            r.raise_for_status()
+            assert all(row["candidates"] for row in r.json()), r.json()
+
+        rows = []
+        for label, day, call in (("per-keyword loop", "2026-01-01", loop), ("bulk endpoint", "2026-01-02", bulk)):
+            ids = await seed(n, day)
+            before = dict(usage)
+            started = time.perf_counter()
+            await call(ids)
+            wall = time.perf_counter() - started
+            calls = usage.get("calls", 0) - before.get("calls", 0)
+            prompt = usage.get("prompt_tokens", 0) - before.get("prompt_tokens", 0)
+            completion = usage.get("completion_tokens", 0) - before.get("completion_tokens", 0)
+            rows.append((label, wall, calls, prompt / n, completion / n))
+
+    from app.settings import settings
+
+    print(f"{n} keywords, RECOMMEND_BATCH_SIZE={settings.RECOMMEND_BATCH_SIZE}, RECOMMEND_CONCURRENCY={settings.RECOMMEND_CONCURRENCY}")
+    print(f"{'':<18}{'wall':>8}{'calls':>7}{'prompt tok/kw':>15}{'completion tok/kw':>19}")
+    for label, wall, calls, prompt, completion in rows:
+        print(f"{label:<18}{wall:>7.2f}s{calls:>7}{prompt:>15.0f}{completion:>19.0f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--keywords", type=int, default=24)
+    ap.add_argument("--latency", type=float, default=0.5, help="seconds the stand-in takes per completion")
+    ap.add_argument("--per-item", type=float, default=0.05, help="extra seconds per returned candidate (generation time)")
+    args = ap.parse_args()
+    usage: dict[str, int] = {}
+
+    def timed_reply(req: dict) -> str:
+        text = reply(req)
+        time.sleep(args.per_item * text.count('"title_guess"'))
+        return text
+
+    with serve(openai_stub(timed_reply, args.latency, usage)) as base:
+        os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+        run(main(args.keywords, usage))
@@ -0,0 +1,120 @@
+"""Mixed read/write concurrency on SQLite: the tuned profile vs SQLite defaults.
+
+Writer tasks insert posts one transaction at a time on the read/write pool, and reader tasks run
+the /api/posts list query on the read-only pool, all for --seconds. Settings are read at import
+time, so each profile runs in its own process on its own fresh database file:
+
+- tuned: the current SQLITE_* defaults (WAL, busy_timeout, synchronous=NORMAL, mmap, cache, temp_store)
+- defaults: rollback journal, no busy_timeout, synchronous=FULL, no mmap, SQLite's default cache
+
+For each profile it reports operations per second, per-operation latency and failed operations
+("database is locked").
+
+    cd backend && python -m bench.sqlite_mixed --readers 16 --writers 4 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    "tuned": {},
+    "defaults": {
+        "SQLITE_WAL": "false",
+        "SQLITE_BUSY_TIMEOUT_MS": "0",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+    },
+}
+SEED_POSTS = 2000
+
+
+async def workload(readers: int, writers: int, seconds: float) -> dict:
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+    from app.db import AsyncSessionLocal, ReadSessionLocal
+    from app.models import Post
+    from bench._support import migrate
+
+    await migrate()
+    async with AsyncSessionLocal() as session:
+        session.add_all(Post(title=f"seed {i}", status="draft", body_md="본문 " * 200) for i in range(SEED_POSTS))
+        await session.commit()
+
+    stats = {"read": [], "write": [], "read_errors": 0, "write_errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with ReadSessionLocal() as session:
+                    q = select(Post.id, Post.title, Post.status).where(Post.status == "draft").order_by(Post.id.desc()).limit(50)
+                    (await session.execute(q)).all()
+                stats["read"].append(time.perf_counter() - started)
+            except OperationalError:
+                stats["read_errors"] += 1
+            await asyncio.sleep(0)
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    session.add(Post(title="bench", status="draft", body_md="본문 " * 200))
+                    await session.commit()
+                stats["write"].append(time.perf_counter() - started)
+            except OperationalError:
+                stats["write_errors"] += 1
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(reader() for _ in range(readers)), *(writer() for _ in range(writers)))
+    return stats
+
+
+def child(args):
+    from bench._support import run, summarize, use_temp_env
+
+    use_temp_env(**PROFILES[args.profile])
+    stats = run(workload(args.readers, args.writers, args.seconds))
+    print(json.dumps({
+        "reads_per_s": len(stats["read"]) / args.seconds,
+        "writes_per_s": len(stats["write"]) / args.seconds,
+        "read": summarize(stats["read"]) if stats["read"] else "-",
+        "write": summarize(stats["write"]) if stats["write"] else "-",
+        "read_errors": stats["read_errors"],
+        "write_errors": stats["write_errors"],
+    }))
+
+
+def main(args):
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile, {SEED_POSTS} seeded posts")
+    for name in PROFILES:
+        cmd = [sys.executable, "-m", "bench.sqlite_mixed", "--profile", name,
+               "--readers", str(args.readers), "--writers", str(args.writers), "--seconds", str(args.seconds)]
+        # the child sets only the settings its profile names; drop inherited SQLITE_* so profiles stay comparable
+        env = {k: v for k, v in os.environ.items() if not k.startswith("SQLITE_")}
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"\n{name}: {r['reads_per_s']:.0f} reads/s, {r['writes_per_s']:.0f} writes/s, "
+              f"{r['read_errors']} failed reads, {r['write_errors']} failed writes")
+        print(f"  read:  {r['read']}")
+        print(f"  write: {r['write']}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--readers", type=int, default=16)
+    ap.add_argument("--writers", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--profile", choices=sorted(PROFILES), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.profile:
+        child(args)
+    else:
+        main(args)
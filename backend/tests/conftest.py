@@ -0,0 +1,38 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# point the app at a throwaway database before app.db builds its engines
+_tmp = tempfile.mkdtemp(prefix="coupang-partners-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+DB_PATH = os.path.join(_tmp, "test.db")
+
+
+def _run(coro):
+    """Run a coroutine on a fresh loop; pooled connections are dropped afterwards so the
+    next loop doesn't inherit them."""
+    from app.db import engine, read_engine
+
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+            await read_engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    from app.services.migrations import run_migrations
+
+    _run(run_migrations())
+    return DB_PATH
+
+
+@pytest.fixture(scope="session")
+def run():
+    return _run
@@ -0,0 +1,78 @@
+import asyncio
+import datetime as dt
+import random
+
+from sqlalchemy import select
+
+from app.models import Budget
+from app.services import budget
+
+
+CALLERS = 100
+CALLS_PER_CALLER = 20
+
+
+async def _stored_tokens(day: str) -> int:
+    async with budget.AsyncSessionLocal() as session:
+        row = (await session.execute(select(Budget).where(Budget.date == day))).scalars().first()
+        return row.token_used if row else 0
+
+
+async def _stress(fail_every: int | None):
+    day = dt.date.today().isoformat()
+    await budget.flush_usage()
+    start = await _stored_tokens(day)
+    rng = random.Random(7)
+    amounts = [[rng.randint(1, 5000) for _ in range(CALLS_PER_CALLER)] for _ in range(CALLERS)]
+    expected = sum(map(sum, amounts))
+
+    real_session = budget.AsyncSessionLocal
+    flushes = 0
+
+    def flaky_session():
+        # every `fail_every`-th flush loses its connection mid-way and must be retried
+        nonlocal flushes
+        flushes += 1
+        if fail_every and flushes % fail_every == 0:
+            raise OSError("simulated connection failure")
+        return real_session()
+
+    async def caller(i: int):
+        for n, tokens in enumerate(amounts[i]):
+            if n % 2:
+                res = budget.Reservation(model="gpt-4o-mini", prompt_tokens=tokens, completion_tokens=100, usd=0.0, day=day)
+                await budget.settle(res, tokens)
+            else:
+                await budget.add_usage(None, tokens, model="gpt-4o-mini")
+            await asyncio.sleep(0)
+
+    async def flusher(stop: asyncio.Event):
+        while not stop.is_set():
+            await budget.flush_usage()
+            await asyncio.sleep(0)
+
+    budget.AsyncSessionLocal = flaky_session
+    try:
+        stop = asyncio.Event()
+        flushers = [asyncio.create_task(flusher(stop)) for _ in range(3)]
+        await asyncio.gather(*(caller(i) for i in range(CALLERS)))
+        stop.set()
+        await asyncio.gather(*flushers)
+    finally:
+        budget.AsyncSessionLocal = real_session
+
+    unflushed = budget.unflushed_usage().get(day, {}).get("token_used", 0)
+    stored = await _stored_tokens(day)
+    assert stored - start + unflushed == expected
+    await budget.flush_usage()
+    assert budget.unflushed_usage() == {}
+    assert await _stored_tokens(day) - start == expected
+
+
+def test_no_tokens_lost_under_concurrent_callers(migrated_db, run):
+    # one loop for both rounds: the module's asyncio locks bind to the loop that first uses them
+    async def rounds():
+        await _stress(fail_every=None)
+        await _stress(fail_every=3)
+
+    run(rounds())
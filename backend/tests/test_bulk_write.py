@@ -0,0 +1,33 @@
+from sqlalchemy import select
+
+from app.db import AsyncSessionLocal
+from app.models import Keyword
+from app.services.bulk_write import upsert_keywords
+
+
+async def _upsert_twice(day):
+    async with AsyncSessionLocal() as session:
+        await upsert_keywords(session, [{"text": f"upsert {day}", "score": 0.7, "category": "가전"}], day)
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        # a later pull without score/category must not wipe the stored values
+        kws = await upsert_keywords(session, [{"text": f"upsert {day}"}, {"text": f"upsert {day} new", "score": 0.1}], day)
+        await session.commit()
+        assert [k.text for k in kws] == [f"upsert {day}", f"upsert {day} new"]
+    async with AsyncSessionLocal() as session:
+        res = await session.scalars(select(Keyword).where(Keyword.text.like(f"upsert {day}%"), Keyword.date_range == day).order_by(Keyword.id))
+        return [(k.text, k.score, k.category, k.status) for k in res]
+
+
+def test_upsert_keeps_stored_score_and_category(migrated_db, run):
+    assert run(_upsert_twice("2026-03-01")) == [
+        ("upsert 2026-03-01", 0.7, "가전", "collected"),
+        ("upsert 2026-03-01 new", 0.1, None, "collected"),
+    ]
+
+
+def test_upsert_without_day_does_not_duplicate(migrated_db, run):
+    assert run(_upsert_twice(None)) == [
+        ("upsert None", 0.7, "가전", "collected"),
+        ("upsert None new", 0.1, None, "collected"),
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.services import hedging
+from app.settings import settings
+
+
+class FakeProvider:
+    """Stands in for one provider call: answers `text` after `delay` seconds, or raises `error`."""
+
+    def __init__(self, text: str, delay: float = 0.0, error: Exception | None = None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.started = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.text, 10
+
+
+def test_slow_primary_is_hedged_and_cancelled(run):
+    primary, secondary = FakeProvider("primary", delay=5), FakeProvider("secondary", delay=0.01)
+    assert run(hedging.hedged(primary, secondary, 0.05)) == ("secondary", 10)
+    assert primary.cancelled
+
+
+def test_primary_within_budget_wins_without_hedging(run):
+    primary, secondary = FakeProvider("primary", delay=0.01), FakeProvider("secondary")
+    assert run(hedging.hedged(primary, secondary, 1.0)) == ("primary", 10)
+    assert secondary.started == 0
+
+
+def test_transient_error_fails_over_immediately(run):
+    primary = FakeProvider("primary", error=RuntimeError("429 rate limit"))
+    secondary = FakeProvider("secondary")
+
+    async def timed():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await hedging.hedged(primary, secondary, 10.0)
+        return result, loop.time() - started
+
+    result, elapsed = run(timed())
+    assert result == ("secondary", 10)
+    assert elapsed < 1.0  # did not wait out the budget
+
+
+def test_non_transient_error_is_raised_without_secondary(run):
+    primary = FakeProvider("primary", error=RuntimeError("OPENAI_API_KEY not configured"))
+    secondary = FakeProvider("secondary")
+    with pytest.raises(RuntimeError, match="not configured"):
+        run(hedging.hedged(primary, secondary, 10.0))
+    assert secondary.started == 0
+
+
+def test_budget_follows_p95_within_clamp(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGE_BUDGET_SMALL", 8.0)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 20)
+
+    def budget_after(seconds: float, n: int) -> float:
+        monkeypatch.setattr(hedging, "latency", hedging.LatencyTracker())
+        for _ in range(n):
+            hedging.latency.record("fake", "small", seconds)
+        return hedging.hedge_budget("fake", "small")
+
+    assert budget_after(5.0, 19) == 8.0  # too few samples: static budget
+    assert budget_after(5.0, 20) == pytest.approx(5.5)  # p95 plus 10%
+    assert budget_after(1.0, 20) == 4.0  # clamped to 0.5x
+    assert budget_after(30.0, 20) == 16.0  # clamped to 2x
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.services import ai_client, llm_cache
+from app.settings import settings
+
+
+def test_hedged_answer_is_cached_under_the_provider_that_answered(migrated_db, run, monkeypatch):
+    for name, value in {
+        "LLM_CACHE_ENABLED": True,
+        "AI_ROUTING": "hedged",
+        "AI_PROVIDER": "gpt",
+        "OPENAI_API_KEY": "sk-test",
+        "GEMINI_API_KEY": "test",
+        "AI_HEDGE_BUDGET_SMALL": 0.05,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    def raw_call(cfg, provider, model, messages, temperature, max_tokens, force_json):
+        async def call():
+            if provider == "gpt":
+                await asyncio.sleep(5)  # past the hedge budget: gemini answers first
+            return f"from {provider}", 10
+        return call
+
+    monkeypatch.setattr(ai_client, "_raw_call", raw_call)
+    messages = [{"role": "user", "content": "cache me"}]
+
+    def key(provider, model):
+        return llm_cache.cache_key(provider=provider, model=model, messages=messages, temperature=0.0, force_json=False)
+
+    async def scenario():
+        text, _ = await ai_client.complete_chat(messages=messages, temperature=0.0, purpose="small")
+        return text, await llm_cache.get_cached(key("gpt", settings.OPENAI_MODEL_SMALL)), await llm_cache.get_cached(key("gemini", settings.GEMINI_MODEL_SMALL))
+
+    text, under_primary, under_winner = run(scenario())
+    assert text == "from gemini"
+    assert under_primary is None
+    assert under_winner is not None and under_winner[0] == "from gemini"
@@ -0,0 +1,37 @@
+import sqlite3
+
+from sqlalchemy import event
+
+from app.db import engine
+from app.services import maintenance
+
+
+def test_snippet_cleanup_rechecks_references_in_the_delete(migrated_db, run):
+    con = sqlite3.connect(migrated_db)
+    con.execute("INSERT INTO affiliate_html(hash, html) VALUES ('h-orphan', 'a'), ('h-late', 'b')")
+    con.commit()
+
+    def store_map_after_select(conn, cursor, statement, parameters, context, executemany):
+        # /api/affiliate/map stores a map for one of the snippets right after the cleanup's
+        # SELECT has picked it as unreferenced
+        if statement.startswith("SELECT hash FROM affiliate_html"):
+            con.execute(
+                "INSERT OR IGNORE INTO affiliate_map(id, product_candidate_id, affiliate_url, html_hash, mapped_at) "
+                "VALUES (999, 1, 'u', 'h-late', '2026-01-01 00:00:00')"
+            )
+            con.commit()
+
+    job = maintenance.Job("test", {})
+    event.listen(engine.sync_engine, "after_cursor_execute", store_map_after_select)
+    try:
+        run(maintenance._delete_chunks(
+            job, "affiliate_html", f"SELECT hash FROM affiliate_html WHERE {maintenance._UNREFERENCED_HTML}",
+            key="hash", recheck=maintenance._UNREFERENCED_HTML,
+        ))
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", store_map_after_select)
+
+    left = [h for (h,) in con.execute("SELECT hash FROM affiliate_html ORDER BY hash")]
+    con.close()
+    assert left == ["h-late"]
+    assert job.deleted["affiliate_html"] == 1
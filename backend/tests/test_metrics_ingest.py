@@ -0,0 +1,26 @@
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+
+def test_ingest_skips_unknown_posts(migrated_db):
+    from app.main import app
+
+    con = sqlite3.connect(migrated_db)
+    post_id = con.execute("INSERT INTO post(title, status, created_at) VALUES ('t', 'draft', '2026-01-01 00:00:00')").lastrowid
+    con.commit()
+    con.close()
+    missing = post_id + 1000
+
+    with TestClient(app) as client:
+        r = client.post("/api/metrics/ingest", json={"items": [
+            {"post_id": post_id, "day": "2026-01-02", "impressions": 100, "clicks": 4, "revenue": 1.5},
+            {"post_id": missing, "day": "2026-01-02", "impressions": 900, "clicks": 90},
+        ]})
+        assert r.status_code == 200
+        assert r.json()["upserted"] == 1
+        assert r.json()["unknown_post_ids"] == [missing]
+
+        daily = client.get("/api/metrics/daily", params={"from": "2026-01-02", "to": "2026-01-02"}).json()["daily"]
+        assert [(d["impressions"], d["clicks"], d["posts"]) for d in daily] == [(100, 4, 1)]
+        assert client.get("/api/metrics/daily", params={"post_id": missing}).json()["daily"] == []
@@ -0,0 +1,10 @@
+from fastapi.testclient import TestClient
+
+
+def test_cursor_header_is_exposed_to_cross_origin_clients(migrated_db):
+    from app.main import app
+
+    with TestClient(app) as client:
+        r = client.get("/api/posts", params={"limit": 1}, headers={"Origin": "http://localhost:5173"})
+    assert r.status_code == 200
+    assert "x-next-after-id" in r.headers.get("access-control-expose-headers", "").lower()
@@ -0,0 +1,51 @@
+import json
+
+from app.services import product_scout
+from app.services.json_repair import REPAIR_RESULTS_SYSTEM
+
+GROUP = [("마우스", []), ("키보드", []), ("모니터", [])]
+
+
+def _item(name: str) -> dict:
+    return {"title_guess": name, "brand": "b", "model": name, "coupang_url": f"https://www.coupang.com/vp/products/{len(name)}"}
+
+
+def _result(keyword: str) -> dict:
+    return {"keyword": keyword, "items": [_item(f"{keyword} 1"), _item(f"{keyword} 2")]}
+
+
+def _packed(monkeypatch, run, text: str, repaired: str = "") -> tuple[dict, list]:
+    repairs = []
+
+    async def complete_chat(**kwargs):
+        return text, 100
+
+    async def repair(raw, system=None, max_tokens=None):
+        repairs.append(system)
+        return repaired
+
+    monkeypatch.setattr(product_scout, "complete_chat", complete_chat)
+    monkeypatch.setattr(product_scout, "attempt_repair_to_items_array", repair)
+    return run(product_scout._recommend_packed(GROUP)), repairs
+
+
+def test_packed_response_in_fences_with_trailing_comma(monkeypatch, run):
+    body = json.dumps({"results": [_result(k) for k, _ in GROUP]}, ensure_ascii=False)
+    out, repairs = _packed(monkeypatch, run, "```json\n" + body[:-1] + ",}\n```")
+    assert sorted(out) == sorted(k for k, _ in GROUP)
+    assert repairs == []
+
+
+def test_truncated_packed_response_keeps_complete_keywords(monkeypatch, run):
+    body = json.dumps({"results": [_result(k) for k, _ in GROUP]}, ensure_ascii=False)
+    out, repairs = _packed(monkeypatch, run, body[: body.index("모니터 2")])
+    assert sorted(out) == ["마우스", "키보드"]
+    assert out["키보드"][1]["title_guess"] == "키보드 2"
+    assert repairs == []
+
+
+def test_unparseable_packed_response_goes_through_repair(monkeypatch, run):
+    fixed = json.dumps({"results": [_result("마우스")]}, ensure_ascii=False)
+    out, repairs = _packed(monkeypatch, run, "결과: 마우스 — 1번, 2번 ...", repaired=fixed)
+    assert list(out) == ["마우스"]
+    assert repairs == [REPAIR_RESULTS_SYSTEM]
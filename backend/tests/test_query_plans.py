@@ -0,0 +1,82 @@
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+@contextmanager
+def captured_statements():
+    """SQL the app sends to SQLite (both pools), with its bound parameters."""
+    from app.db import engine, read_engine
+
+    seen = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        seen.append((statement, parameters))
+
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    for e in engines:
+        event.listen(e, "before_cursor_execute", capture)
+    try:
+        yield seen
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", capture)
+
+
+def query_plan(db_path: str, statement: str, parameters) -> str:
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    finally:
+        con.close()
+    return "\n".join(r[-1] for r in rows)
+
+
+def select_on(seen, table: str) -> tuple:
+    for statement, parameters in reversed(seen):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(rf"\bFROM {table}\b", statement):
+            return statement, parameters
+    raise AssertionError(f"no SELECT on {table} captured")
+
+
+@pytest.fixture(scope="module")
+def client(migrated_db):
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.mark.parametrize(
+    "path, params, table, index",
+    [
+        ("/api/posts", {"status": "draft"}, "post", "ix_post_status"),
+        ("/api/posts", {"keyword_id": 1}, "post", "ix_post_keyword_id"),
+        ("/api/products", {"status": "pending"}, "product_candidate", "ix_product_candidate_status"),
+        ("/api/products", {"keyword_id": 1}, "product_candidate", "ix_product_candidate_keyword_id_dedupe_key"),
+        ("/api/products", {"date": "2026-01-01"}, "keyword", "ix_keyword_date_range_text"),
+        ("/api/keywords", {"date": "2026-01-01"}, "keyword", "ix_keyword_date_range_text"),
+        ("/api/keywords", {"status": "collected"}, "keyword", "ix_keyword_status"),
+    ],
+)
+def test_list_queries_use_indexes(client, migrated_db, path, params, table, index):
+    with captured_statements() as seen:
+        assert client.get(path, params=params).status_code == 200
+    statement, parameters = select_on(seen, table)
+    plan = query_plan(migrated_db, statement, parameters)
+    assert re.search(rf"USING (COVERING )?INDEX {index}\b", plan), plan
+
+
+def test_scheduler_due_posts_use_index(migrated_db, run):
+    from app.services.scheduler import _tick_publish_due
+
+    with captured_statements() as seen:
+        run(_tick_publish_due())
+    statement, parameters = select_on(seen, "post")
+    assert "scheduled_at <=" in statement
+    plan = query_plan(migrated_db, statement, parameters)
+    assert re.search(r"USING (COVERING )?INDEX ix_post_status_scheduled_at\b", plan), plan
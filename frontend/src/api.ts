@@ -34,6 +34,7 @@ export const Posts = {
     api.post('/posts/draft/compare', { product_ids: productIds, template_input: templateInput }).then(r => r.data),
   publish: (postId: number, schedule?: string) => api.post('/posts/publish', { post_id: postId, schedule }).then(r => r.data),
   list: () => api.get('/posts').then(r => r.data as any[]),
+  get: (postId: number) => api.get(`/posts/${postId}`).then(r => r.data),
 }
 
 export const Metrics = {
@@ -50,6 +51,16 @@ export const Admin = {
   resetDb: () => api.post('/admin/reset-db').then(r => r.data),
   deleteKeywords: (date?: string) => api.delete('/admin/keywords', { params: date ? { date } : {} }).then(r => r.data),
   dedupKeywords: (date: string) => api.post('/admin/dedup-keywords', null, { params: { date } }).then(r => r.data),
+  job: (id: number) => api.get(`/admin/jobs/${id}`).then(r => r.data),
+  cancelJob: (id: number) => api.post(`/admin/jobs/${id}/cancel`).then(r => r.data),
+  // purge/dedup run as background jobs; resolves with the finished job
+  waitJob: async (id: number, intervalMs = 1000) => {
+    for (;;) {
+      const job = await api.get(`/admin/jobs/${id}`).then(r => r.data)
+      if (job.status !== 'queued' && job.status !== 'running') return job
+      await new Promise(res => setTimeout(res, intervalMs))
+    }
+  },
   getAIConfig: () => api.get('/admin/ai-config').then(r => r.data),
   setAIConfig: (data: any) => api.post('/admin/ai-config', data).then(r => r.data),
 }
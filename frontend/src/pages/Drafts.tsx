@@ -103,7 +103,7 @@ export default function Drafts(){
                 <td>{p.status}</td>
                 <td>
                   <button className="btn" onClick={()=>publish(p.id)}>{schedule? '예약' : '즉시 게시'}</button>{' '}
-                  <button className="btn secondary" onClick={()=>setMd(p.body_md||'')}>미리보기</button>
+                  <button className="btn secondary" onClick={()=>Posts.get(p.id).then(full=>setMd(full.body_md||''))}>미리보기</button>
                 </td>
               </tr>
             ))}
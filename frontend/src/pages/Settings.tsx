@@ -100,13 +100,15 @@ export default function Settings(){
           <input className="input" type="date" value={date} onChange={e=>setDate(e.target.value)} style={{maxWidth:220}} />
           <button className="btn secondary" onClick={async()=>{
             if(!confirm(`[${date}] 키워드 및 관련 데이터 삭제?`)) return
-            await Admin.deleteKeywords(date)
-            alert('삭제 완료')
+            const r = await Admin.deleteKeywords(date)
+            const job = await Admin.waitJob(r.job.id)
+            alert(job.status === 'done' ? '삭제 완료' : `삭제 ${job.status}: ${job.error || ''}`)
           }}>해당 날짜 키워드 삭제</button>
           <button className="btn secondary" onClick={async()=>{
             if(!confirm('모든 키워드/후보/초안 데이터를 삭제하시겠습니까? (되돌릴 수 없음)')) return
-            await Admin.deleteKeywords()
-            alert('전체 키워드 관련 삭제 완료')
+            const r = await Admin.deleteKeywords()
+            const job = await Admin.waitJob(r.job.id)
+            alert(job.status === 'done' ? '전체 키워드 관련 삭제 완료' : `삭제 ${job.status}: ${job.error || ''}`)
           }}>키워드 전체 삭제</button>
           <button className="btn" style={{background:'#7a2626'}} onClick={async()=>{
             if(!confirm('DB 초기화(drop & create) 진행합니까? (모든 데이터 삭제)')) return
@@ -117,8 +119,9 @@ export default function Settings(){
         <div>
           <button className="btn secondary" onClick={async()=>{
             if(!confirm(`[${date}] 키워드 중복 정리(동일 text는 최신만 유지) 진행합니까?`)) return
-            await Admin.dedupKeywords(date)
-            alert('중복 정리 완료')
+            const r = await Admin.dedupKeywords(date)
+            const job = await Admin.waitJob(r.job.id)
+            alert(job.status === 'done' ? '중복 정리 완료' : `중복 정리 ${job.status}: ${job.error || ''}`)
           }}>해당 날짜 키워드 중복 정리</button>
         </div>
       </div>